@@ -130,18 +130,10 @@ try:
             print("✓ Proof was generated successfully")
 
             try:
-                proof_path = os.path.join("proof_of_portfolio/circuits/proof", "proof")
-                public_inputs_path = os.path.join(
-                    "proof_of_portfolio/circuits/proof", "public_inputs"
-                )
-
-                if os.path.exists(proof_path) and os.path.exists(public_inputs_path):
-                    with open(proof_path, "rb") as f:
-                        proof_hex = f.read().hex()
-
-                    with open(public_inputs_path, "rb") as f:
-                        public_inputs_hex = f.read().hex()
+                # Proofs are produced in a per-job workspace, so read them from the results
+                proof, public_inputs = proof_of_portfolio.load_proof(proof_results)
 
+                if proof and public_inputs:
                     vk_path = os.path.join(
                         os.path.dirname(verifier_module.__file__),
                         "circuits",
@@ -157,9 +149,9 @@ try:
                     else:
                         print(f"VK file NOT found at {vk_path}")
 
-                    # Verify the proof using hex data
+                    # Verify the proof using its binary data
                     verification_result = proof_of_portfolio.verify(
-                        proof_hex, public_inputs_hex
+                        proof, public_inputs
                     )
 
                     if verification_result:
@@ -167,9 +159,7 @@ try:
                     else:
                         print("✗ CRITICAL: Proof verification failed")
                 else:
-                    print("✗ Proof files not found at expected paths")
-                    print(f"  Expected: {proof_path}")
-                    print(f"  Expected: {public_inputs_path}")
+                    print("✗ Proof data missing from proof_results")
                     exit(1)
 
             except Exception as ve:
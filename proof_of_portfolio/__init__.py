@@ -3,13 +3,14 @@
 import os
 import shutil
 import asyncio
-from concurrent.futures import ProcessPoolExecutor
 from functools import wraps
 import subprocess
 from pathlib import Path
 import json
+import sqlite3
 import time
 import traceback
+from concurrent.futures import CancelledError
 import bittensor as bt
 
 BB_PATH = os.path.expanduser("~/.bb/bb")
@@ -17,8 +18,23 @@ NARGO_PATH = os.path.expanduser("~/.nargo/bin/nargo")
 
 # ruff: noqa
 from .post_install import main as post_install_main
+from .abi import read_circuit_output
+from .artifacts import ArtifactManager
+from .tiers import TIER_SIZES, prepare as prepare_tier, select_tier, variant_dir
 from .proof_generator import generate_proof
-from .verifier import verify as verify
+from .inputs_store import load_circuit_inputs
+from .blobs import load_proof
+from .verifier import verify as verify, verify_many
+from .workspace import Workspace
+from .pipeline import ProofPipeline
+from .results_index import ResultsIndex, get_results_index, hotkey_rows, latest_row
+from .retention import RetentionPolicy, ResultsCompactor, compact, start_compactor
+from .prover_pool import (
+    ProverPool,
+    configure_prover_pool,
+    get_prover_pool,
+    shutdown_prover_pool,
+)
 
 
 _dependencies_checked = False
@@ -84,6 +100,7 @@ def _prove_worker(
     witness_only=False,
     wallet=None,
     augmented_scores=None,
+    bb_threads=None,
 ):
     """
     Worker function to run proof generation in a separate process.
@@ -102,37 +119,48 @@ def _prove_worker(
             witness_only=witness_only,
             wallet=wallet,
             augmented_scores=augmented_scores,
+            bb_threads=bb_threads,
         )
 
-        proof_results = result.get("proof_results", {})
-        proof_generated = proof_results.get("proof_generated", False)
+        return _status_result(result)
 
-        if proof_generated:
-            status = "success"
-        else:
-            status = "proof_generation_failed"
+    except Exception as e:
+        return _error_result(e, hotkey)
 
-        return {
-            "status": status,
-            "portfolio_metrics": result.get("portfolio_metrics", {}),
-            "merkle_roots": result.get("merkle_roots", {}),
-            "data_summary": result.get("data_summary", {}),
-            "proof_results": proof_results,
-            "proof_generated": proof_generated,
-        }
 
-    except Exception as e:
-        bt.logging.error(
-            f"Exception in _prove_worker for hotkey {hotkey[:8] if hotkey else 'unknown'}: {type(e).__name__}: {e}"
-        )
-        bt.logging.error(f"Full traceback: {traceback.format_exc()}")
+def _status_result(result):
+    """Summarize a generate_proof result the way prove() reports it."""
+    proof_results = result.get("proof_results", {})
+    proof_generated = proof_results.get("proof_generated", False)
 
-        return {
-            "status": "error",
-            "message": str(e),
-            "proof_generated": False,
-            "traceback": traceback.format_exc(),
-        }
+    if proof_generated:
+        status = "success"
+    else:
+        status = "proof_generation_failed"
+
+    return {
+        "status": status,
+        "portfolio_metrics": result.get("portfolio_metrics", {}),
+        "merkle_roots": result.get("merkle_roots", {}),
+        "data_summary": result.get("data_summary", {}),
+        "proof_results": proof_results,
+        "proof_generated": proof_generated,
+    }
+
+
+def _error_result(e, hotkey):
+    formatted = "".join(traceback.format_exception(type(e), e, e.__traceback__))
+    bt.logging.error(
+        f"Exception proving hotkey {hotkey[:8] if hotkey else 'unknown'}: {type(e).__name__}: {e}"
+    )
+    bt.logging.error(f"Full traceback: {formatted}")
+
+    return {
+        "status": "error",
+        "message": str(e),
+        "proof_generated": False,
+        "traceback": formatted,
+    }
 
 
 @requires_dependencies
@@ -149,10 +177,14 @@ async def prove(
     witness_only=False,
     wallet=None,
     augmented_scores=None,
+    bb_threads=None,
 ):
     """
     Generate zero-knowledge proof for miner portfolio data asynchronously.
 
+    Runs on the shared, pre-warmed worker pool (see configure_prover_pool and
+    shutdown_prover_pool); waits for a free slot when the pool is saturated.
+
     Args:
         miner_data: Dictionary containing perf_ledgers and positions for the miner
         hotkey: Miner's hotkey
@@ -161,12 +193,14 @@ async def prove(
     Returns:
         Dictionary with proof results including status, portfolio_metrics, etc.
     """
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
+    start_compactor()
 
-    with ProcessPoolExecutor(max_workers=1) as executor:
-        try:
-            result = await loop.run_in_executor(
-                executor,
+    try:
+        # Waiting for the pool (and for a free submission slot) blocks, so do it off the loop
+        future = await loop.run_in_executor(
+            None,
+            lambda: get_prover_pool().submit(
                 _prove_worker,
                 miner_data,
                 daily_pnl,
@@ -179,14 +213,288 @@ async def prove(
                 account_size,
                 witness_only,
                 wallet,
+                augmented_scores,
+                bb_threads,
+            ),
+        )
+        return await asyncio.wrap_future(future)
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e),
+            "proof_generated": False,
+        }
+
+
+def _miner_slice(miner_data, hotkey):
+    """
+    Input dict for a single miner: its own ledger and positions plus the shared
+    top-level keys, so a batch job only pickles one miner's data.
+    """
+    job_data = {
+        key: value
+        for key, value in miner_data.items()
+        if key not in ("perf_ledgers", "positions")
+    }
+    job_data["perf_ledgers"] = {hotkey: miner_data["perf_ledgers"][hotkey]}
+    job_data["positions"] = {hotkey: miner_data["positions"][hotkey]}
+    return job_data
+
+
+def _has_miner_data(miner_data, hotkey):
+    return all(
+        hotkey in (miner_data.get(key) or {}) for key in ("perf_ledgers", "positions")
+    )
+
+
+def _order_count(miner_data, hotkey):
+    """Orders of a miner, used only to schedule big proofs first; 0 if unknown."""
+    positions = (miner_data.get("positions") or {}).get(hotkey)
+    positions = (
+        positions.get("positions", [])
+        if isinstance(positions, dict)
+        else getattr(positions, "positions", None) or []
+    )
+    count = 0
+    for pos in positions:
+        orders = (
+            pos.get("orders", [])
+            if isinstance(pos, dict)
+            else getattr(pos, "orders", [])
+        )
+        count += len(orders or [])
+    return count
+
+
+def _batch_layout(max_workers=None, bb_threads=None):
+    """
+    Split the available cores between concurrent jobs and bb threads per job.
+
+    Either value may be given; the other is derived so workers * bb_threads
+    does not exceed the core count. POP_BB_THREADS sets the default per-job budget.
+    """
+    cores = os.cpu_count() or 1
+    if bb_threads is None and os.environ.get("POP_BB_THREADS"):
+        bb_threads = int(os.environ["POP_BB_THREADS"])
+
+    if max_workers is None and bb_threads is None:
+        bb_threads = min(cores, 4)
+    if max_workers is None:
+        max_workers = max(1, cores // bb_threads)
+    if bb_threads is None:
+        bb_threads = max(1, cores // max_workers)
+    return max_workers, bb_threads
+
+
+@requires_dependencies
+async def prove_many(
+    miner_data,
+    hotkeys=None,
+    daily_pnl=None,
+    verbose=False,
+    vali_config=None,
+    use_weighting=False,
+    bypass_confidence=False,
+    daily_checkpoints=2,
+    account_size=None,
+    witness_only=False,
+    wallet=None,
+    augmented_scores=None,
+    max_workers=None,
+    bb_threads=None,
+    pool=None,
+    on_result=None,
+    pipeline=False,
+    witness_workers=None,
+    buffer_size=2,
+):
+    """
+    Generate proofs for many miners of one checkpoint concurrently.
+
+    Jobs are spread across the CPU cores: each runs bb with `bb_threads` threads
+    and up to `max_workers` jobs run at once. Miners with the most orders are
+    scheduled first so the slowest proofs don't end up last in the batch.
+
+    With pipeline=True, witness generation and bb prove run as separate stages
+    (see ProofPipeline): `witness_workers` jobs solve witnesses ahead of the
+    `max_workers` provers, with at most `buffer_size` solved witnesses waiting.
+
+    Args:
+        miner_data: Dictionary containing perf_ledgers and positions for all miners
+        hotkeys: Hotkeys to prove (defaults to every hotkey in perf_ledgers)
+        daily_pnl: Dictionary of hotkey -> daily PnL list
+        augmented_scores: Optional dictionary of hotkey -> subnet scores
+        max_workers: Concurrent proof jobs (derived from the core count if unset)
+        bb_threads: bb threads per job (derived from the core count if unset)
+        pool: ProverPool to run on; defaults to the shared get_prover_pool(),
+            or to a batch pool of `max_workers` workers when that is given
+        on_result: Optional callback(hotkey, result) called as each proof finishes
+        pipeline: Overlap witness generation with bb prove instead of running
+            whole proofs on the pool
+        witness_workers: Concurrent witness jobs in pipeline mode (defaults to
+            max_workers)
+        buffer_size: Solved witnesses allowed to wait for a prover
+
+    Returns:
+        Dictionary with per-hotkey "results" and a "summary" with throughput stats.
+        Hotkeys missing from miner_data get an error result; the rest of the batch
+        still runs.
+    """
+    if hotkeys is None:
+        hotkeys = list(miner_data["perf_ledgers"].keys())
+    daily_pnl = daily_pnl or {}
+    start_compactor()
+    augmented_scores = augmented_scores or {}
+
+    if pool is None and not pipeline and max_workers is None:
+        pool = get_prover_pool()
+    owns_pool = pool is None and not pipeline
+    if pool is not None and not pipeline:
+        max_workers = pool.max_workers
+    max_workers, bb_threads = _batch_layout(max_workers, bb_threads)
+    if owns_pool:
+        pool = ProverPool(max_workers=max_workers, max_pending=max(1, len(hotkeys)))
+
+    results = {}
+    queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    def finished(hotkey, future):
+        try:
+            result = future.result()
+        except (Exception, CancelledError) as e:
+            result = {"status": "error", "message": str(e), "proof_generated": False}
+        loop.call_soon_threadsafe(queue.put_nowait, (hotkey, result))
+
+    async def submit_all(jobs):
+        for hotkey in jobs:
+            try:
+                future = await loop.run_in_executor(
+                    None,
+                    lambda hotkey=hotkey: pool.submit(
+                        _prove_worker,
+                        _miner_slice(miner_data, hotkey),
+                        daily_pnl.get(hotkey),
+                        hotkey,
+                        verbose,
+                        vali_config,
+                        use_weighting,
+                        bypass_confidence,
+                        daily_checkpoints,
+                        account_size,
+                        witness_only,
+                        wallet,
+                        augmented_scores.get(hotkey),
+                        bb_threads,
+                    ),
+                )
+            except Exception as e:
+                queue.put_nowait(
+                    (
+                        hotkey,
+                        {
+                            "status": "error",
+                            "message": str(e),
+                            "proof_generated": False,
+                        },
+                    )
+                )
+                continue
+            future.add_done_callback(lambda f, hotkey=hotkey: finished(hotkey, f))
+
+    def run_pipeline(jobs):
+        proof_pipeline = ProofPipeline(
+            witness_workers=witness_workers or max_workers,
+            prove_workers=max_workers,
+            buffer_size=buffer_size,
+            bb_threads=bb_threads,
+        )
+        pipeline_jobs = [
+            (
+                hotkey,
+                {
+                    "data": _miner_slice(miner_data, hotkey),
+                    "daily_pnl": daily_pnl.get(hotkey),
+                    "miner_hotkey": hotkey,
+                    "verbose": verbose,
+                    "vali_config": vali_config,
+                    "use_weighting": use_weighting,
+                    "bypass_confidence": bypass_confidence,
+                    "daily_checkpoints": daily_checkpoints,
+                    "witness_only": witness_only,
+                    "account_size": account_size,
+                    "wallet": wallet,
+                    "augmented_scores": augmented_scores.get(hotkey),
+                },
             )
-            return result
-        except Exception as e:
-            return {
-                "status": "error",
-                "message": str(e),
-                "proof_generated": False,
-            }
+            for hotkey in jobs
+        ]
+        for hotkey, result in proof_pipeline.run(pipeline_jobs):
+            if isinstance(result, Exception):
+                result = _error_result(result, hotkey)
+            else:
+                result = _status_result(result)
+            loop.call_soon_threadsafe(queue.put_nowait, (hotkey, result))
+        return proof_pipeline.stats
+
+    def record(hotkey, result):
+        results[hotkey] = result
+        if on_result is not None:
+            try:
+                on_result(hotkey, result)
+            except Exception as e:
+                bt.logging.error(f"on_result callback failed for {hotkey[:8]}: {e}")
+
+    start = time.time()
+    try:
+        for hotkey in hotkeys:
+            if not _has_miner_data(miner_data, hotkey):
+                record(
+                    hotkey,
+                    {
+                        "status": "error",
+                        "message": f"No miner data for hotkey {hotkey}",
+                        "proof_generated": False,
+                    },
+                )
+        jobs = sorted(
+            (hk for hk in hotkeys if _has_miner_data(miner_data, hk)),
+            key=lambda hk: _order_count(miner_data, hk),
+            reverse=True,
+        )
+        if pipeline:
+            submitter = loop.run_in_executor(None, run_pipeline, jobs)
+        else:
+            submitter = asyncio.ensure_future(submit_all(jobs))
+
+        for _ in range(len(jobs)):
+            record(*await queue.get())
+
+        pipeline_stats = await submitter
+    finally:
+        if owns_pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = time.time() - start
+    succeeded = sum(1 for r in results.values() if r.get("status") == "success")
+    summary = {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "elapsed_seconds": elapsed,
+        "proofs_per_second": len(results) / elapsed if elapsed > 0 else 0.0,
+        "max_workers": max_workers,
+        "bb_threads": bb_threads,
+    }
+    if pipeline:
+        summary["pipeline"] = pipeline_stats
+    bt.logging.info(
+        f"prove_many: {succeeded}/{len(results)} proofs in {elapsed:.2f}s "
+        f"({summary['proofs_per_second']:.3f} proofs/s, "
+        f"{summary['max_workers']} workers x {bb_threads} bb threads)"
+    )
+
+    return {"results": results, "summary": summary}
 
 
 def save_instant_mdd_results(results, hotkey):
@@ -209,6 +517,12 @@ def save_instant_mdd_results(results, hotkey):
             json.dump(results, f, indent=2, default=str)
 
         print(f"Instant MDD results saved to {filepath}")
+        index = get_results_index()
+        if index is not None:
+            try:
+                index.record("instant_mdd", hotkey, filepath, results, timestamp)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Failed to index instant MDD results: {str(e)}")
         return str(filepath)
 
     except Exception as e:
@@ -228,6 +542,12 @@ def get_latest_instant_mdd_for_miner(hotkey):
     """
     try:
         pop_dir = Path.home() / ".pop" / "instant_mdd"
+        index = get_results_index()
+        if index is not None:
+            # The index keeps the whole (small) instant MDD result
+            latest = latest_row(index, "instant_mdd", pop_dir, hotkey)
+            return latest["summary"] if latest else None
+
         if not pop_dir.exists():
             return None
 
@@ -259,6 +579,20 @@ def get_all_instant_mdd_for_miner(hotkey):
     """
     try:
         pop_dir = Path.home() / ".pop" / "instant_mdd"
+        index = get_results_index()
+        if index is not None:
+            results = []
+            for row in hotkey_rows(index, "instant_mdd", pop_dir, hotkey):
+                try:
+                    with open(row["path"], "r") as f:
+                        result = json.load(f)
+                    result["_filepath"] = row["path"]
+                    result["_timestamp"] = row["timestamp"]
+                    results.append(result)
+                except Exception as e:
+                    print(f"Error reading {row['path']}: {str(e)}")
+            return results
+
         if not pop_dir.exists():
             return []
 
@@ -299,7 +633,8 @@ def prove_instant_mdd(hotkey, ledger_element):
     """
 
     SCALE = 10_000_000
-    MAX_ARRAY_SIZE = 1024
+    MAX_ARRAY_SIZE = TIER_SIZES["instant_mdd"]["large"]["ARRAY_SIZE"]
+    start_compactor()
 
     # Extract MDD values from ledger checkpoints
     if (
@@ -321,65 +656,73 @@ def prove_instant_mdd(hotkey, ledger_element):
             scaled_mdd = int(cp.mdd * SCALE)
             mdd_values.append(scaled_mdd)
 
-    # Pad array to MAX_ARRAY_SIZE
-    while len(mdd_values) < MAX_ARRAY_SIZE:
-        mdd_values.append(0)
-
     n_checkpoints = min(len(ledger_element.cps), MAX_ARRAY_SIZE)
 
+    # Pad array to the smallest circuit tier that fits
+    tier = select_tier("instant_mdd", ARRAY_SIZE=len(mdd_values))
+    array_size = TIER_SIZES["instant_mdd"][tier]["ARRAY_SIZE"]
+    while len(mdd_values) < array_size:
+        mdd_values.append(0)
+
     # 10% threshold (from ValiConfig.DRAWDOWN_MAXVALUE_PERCENTAGE)
     max_drawdown_threshold = 10  # 10% as integer
 
     try:
-        # Get the instant_mdd circuit path
-        circuit_path = Path(__file__).parent.parent / "instant_mdd"
-
-        # Create Prover.toml with input data
-        prover_toml_path = circuit_path / "Prover.toml"
-        with open(prover_toml_path, "w") as f:
-            f.write(f'hotkey = "{hotkey}"\n')
-            f.write(f"mdd_values = {mdd_values}\n")
-            f.write(f'n_checkpoints = "{n_checkpoints}"\n')
-            f.write(f'max_drawdown_threshold = "{max_drawdown_threshold}"\n')
-
-        # Execute nargo
-        result = subprocess.run(
-            ["nargo", "execute"], capture_output=True, text=True, cwd=str(circuit_path)
-        )
+        # Get the instant_mdd circuit path for the tier
+        artifacts = ArtifactManager.from_env()
+        circuit_name = prepare_tier("instant_mdd", tier, artifacts, with_vk=False)
+        circuit_path = variant_dir("instant_mdd", tier)
+
+        # Run in an isolated workspace so concurrent calls don't share inputs
+        if artifacts is not None:
+            artifacts.check_vk(circuit_name)
+        with Workspace(circuit_path, prefix="pop-mdd-") as workspace:
+            if artifacts is not None:
+                artifacts.install(circuit_name, workspace.target_dir)
+            with open(workspace.prover_toml, "w") as f:
+                f.write(f'hotkey = "{hotkey}"\n')
+                f.write(f"mdd_values = {mdd_values}\n")
+                f.write(f'n_checkpoints = "{n_checkpoints}"\n')
+                f.write(f'max_drawdown_threshold = "{max_drawdown_threshold}"\n')
+
+            # Execute nargo
+            result = subprocess.run(
+                ["nargo", "execute"],
+                capture_output=True,
+                text=True,
+                cwd=workspace.path,
+            )
 
-        if result.returncode != 0:
-            return {
-                "status": "execution_failed",
-                "hotkey": hotkey,
-                "error": result.stderr,
-            }
-
-        # Parse output
-        if "Circuit output:" in result.stdout:
-            output_line = result.stdout.split("Circuit output: ")[1].strip()
-
-            # Parse tuple output (exceeds_threshold, drawdown_percentage)
-            if output_line.startswith("(") and output_line.endswith(")"):
-                output_line = output_line[1:-1]  # Remove parentheses
-                parts = output_line.split(", ")
-                if len(parts) == 2:
-                    exceeds_threshold = parts[0].strip() == "true"
-                    drawdown_percentage = int(
-                        parts[1].strip()
-                    )  # Already unscaled from circuit
-
-                    results = {
-                        "status": "success",
-                        "hotkey": hotkey,
-                        "exceeds_threshold": exceeds_threshold,
-                        "drawdown_percentage": drawdown_percentage,
-                        "n_checkpoints": n_checkpoints,
-                    }
-
-                    save_instant_mdd_results(results, hotkey)
-                    return results
-
-        return {"status": "parse_failed", "hotkey": hotkey, "raw_output": result.stdout}
+            if result.returncode != 0:
+                return {
+                    "status": "execution_failed",
+                    "hotkey": hotkey,
+                    "error": result.stderr,
+                }
+
+            # Decode the (exceeds_threshold, drawdown_percentage) return tuple
+            try:
+                output = read_circuit_output(workspace.path)
+            except (OSError, ValueError, KeyError) as e:
+                return {
+                    "status": "parse_failed",
+                    "hotkey": hotkey,
+                    "raw_output": result.stdout,
+                    "error": str(e),
+                }
+
+        exceeds_threshold, drawdown_percentage = output
+        results = {
+            "status": "success",
+            "hotkey": hotkey,
+            "exceeds_threshold": exceeds_threshold,
+            "drawdown_percentage": drawdown_percentage,  # Already unscaled from circuit
+            "n_checkpoints": n_checkpoints,
+            "circuit_tier": tier,
+        }
+
+        save_instant_mdd_results(results, hotkey)
+        return results
 
     except Exception as e:
         return {"status": "error", "hotkey": hotkey, "message": str(e)}
@@ -411,6 +754,7 @@ def prove_sync(
     Returns:
         Dictionary with proof results including status, portfolio_metrics, etc.
     """
+    start_compactor()
     return _prove_worker(
         miner_data,
         daily_pnl=daily_pnl,
@@ -0,0 +1,188 @@
+"""
+Decoding of circuit values from nargo's compiled artifact and witness files.
+
+`nargo execute <name>` writes the solved witness to target/<name>.gz and the
+compiled program, including its ABI, to target/<package>.json. Parameters take
+the first witness indices in ABI order with their values flattened, and the
+return value takes the indices right after them, so the return value can be
+read from the witness using the ABI alone instead of parsing nargo's stdout.
+"""
+
+import gzip
+import json
+import os
+import struct
+
+import toml
+
+
+def field_to_signed_int(value, bits=64):
+    """
+    Convert a field value holding a two's complement integer (such as an i64
+    cast to a Field) back to a signed int.
+    """
+    if isinstance(value, str):
+        value = int(value, 16) if value.startswith("0x") else int(value)
+    if value >= 1 << (bits - 1) and value < 1 << bits:
+        return value - (1 << bits)
+    return value
+
+
+def _read_u32(data, offset):
+    return struct.unpack_from("<I", data, offset)[0], offset + 4
+
+
+def _read_u64(data, offset):
+    return struct.unpack_from("<Q", data, offset)[0], offset + 8
+
+
+def decode_witness_stack(data):
+    """
+    Decode a bincode-serialized ACVM WitnessStack.
+
+    Returns:
+        list: (function index, {witness index: int}) per stack item
+    """
+    stack = []
+    try:
+        items, offset = _read_u64(data, 0)
+        for _ in range(items):
+            function_index, offset = _read_u32(data, offset)
+            entries, offset = _read_u64(data, offset)
+            witness = {}
+            for _ in range(entries):
+                index, offset = _read_u32(data, offset)
+                length, offset = _read_u64(data, offset)
+                witness[index] = int(data[offset : offset + length], 16)
+                offset += length
+            stack.append((function_index, witness))
+    except (struct.error, ValueError) as e:
+        raise ValueError(f"Unsupported or corrupt witness data: {e}") from e
+
+    if offset != len(data):
+        raise ValueError(
+            f"Unsupported witness data: {len(data) - offset} trailing bytes"
+        )
+    return stack
+
+
+def read_witness(witness_path):
+    """Witness values of the main function from a nargo witness file (.gz)."""
+    with gzip.open(witness_path, "rb") as f:
+        stack = decode_witness_stack(f.read())
+    for function_index, witness in stack:
+        if function_index == 0:
+            return witness
+    raise ValueError(f"No main function witness in {witness_path}")
+
+
+def load_abi(artifact_path):
+    with open(artifact_path, "r") as f:
+        return json.load(f)["abi"]
+
+
+def abi_type_size(abi_type):
+    """Number of field elements a value of this ABI type flattens to."""
+    kind = abi_type["kind"]
+    if kind in ("field", "integer", "boolean"):
+        return 1
+    if kind == "string":
+        return abi_type["length"]
+    if kind == "array":
+        return abi_type["length"] * abi_type_size(abi_type["type"])
+    if kind == "struct":
+        return sum(abi_type_size(field["type"]) for field in abi_type["fields"])
+    if kind == "tuple":
+        return sum(abi_type_size(field) for field in abi_type["fields"])
+    raise ValueError(f"Unsupported ABI type: {kind}")
+
+
+def decode_value(abi_type, values, offset=0):
+    """
+    Decode one ABI value from a flat list of field elements.
+
+    Fields become ints, signed integers are converted from two's complement,
+    booleans become bools, strings become str, arrays and tuples become lists
+    and structs become dicts.
+
+    Returns:
+        tuple: (decoded value, offset after the value)
+    """
+    kind = abi_type["kind"]
+    if kind == "field":
+        return values[offset], offset + 1
+    if kind == "integer":
+        value = values[offset]
+        if abi_type.get("sign") == "signed":
+            value = field_to_signed_int(value, abi_type["width"])
+        return value, offset + 1
+    if kind == "boolean":
+        return bool(values[offset]), offset + 1
+    if kind == "string":
+        end = offset + abi_type["length"]
+        return "".join(chr(c) for c in values[offset:end]), end
+    if kind == "array":
+        items = []
+        for _ in range(abi_type["length"]):
+            item, offset = decode_value(abi_type["type"], values, offset)
+            items.append(item)
+        return items, offset
+    if kind == "struct":
+        result = {}
+        for field in abi_type["fields"]:
+            result[field["name"]], offset = decode_value(field["type"], values, offset)
+        return result, offset
+    if kind == "tuple":
+        items = []
+        for field in abi_type["fields"]:
+            item, offset = decode_value(field, values, offset)
+            items.append(item)
+        return items, offset
+    raise ValueError(f"Unsupported ABI type: {kind}")
+
+
+def decode_return_value(abi, witness):
+    """
+    Return value of a program from its ABI and solved witness.
+
+    Args:
+        abi: The "abi" object of a compiled nargo artifact
+        witness: Mapping of witness index to value, as returned by read_witness
+
+    Returns:
+        The decoded return value, or None if the program returns nothing
+    """
+    return_type = abi.get("return_type")
+    if not return_type:
+        return None
+
+    start = sum(abi_type_size(param["type"]) for param in abi["parameters"])
+    size = abi_type_size(return_type["abi_type"])
+    try:
+        values = [witness[index] for index in range(start, start + size)]
+    except KeyError as e:
+        raise ValueError(f"Return witness {e} missing from witness") from e
+    return decode_value(return_type["abi_type"], values)[0]
+
+
+def package_name(circuit_dir):
+    with open(os.path.join(circuit_dir, "Nargo.toml"), "r") as f:
+        return toml.load(f)["package"]["name"]
+
+
+def read_circuit_output(circuit_dir, witness_name=None, target_dir=None):
+    """
+    Decode the return value of the last `nargo execute` run in `circuit_dir`.
+
+    Args:
+        circuit_dir: Noir package directory the program was executed in
+        witness_name: Witness name passed to nargo (defaults to the package name,
+            like nargo itself)
+        target_dir: Directory holding the artifact and witness (defaults to
+            circuit_dir/target)
+    """
+    name = package_name(circuit_dir)
+    target_dir = target_dir or os.path.join(circuit_dir, "target")
+    abi = load_abi(os.path.join(target_dir, f"{name}.json"))
+    witness = read_witness(os.path.join(target_dir, f"{witness_name or name}.gz"))
+    return decode_return_value(abi, witness)
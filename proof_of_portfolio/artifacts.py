@@ -0,0 +1,218 @@
+"""
+Precompiled circuit artifacts.
+
+Each Noir program is compiled once per (source digest, nargo version) and the
+artifact is kept under ~/.pop/artifacts/<name>/<key>/. Jobs copy it into their
+workspace target/ directory, where `nargo execute` finds an artifact whose hash
+matches the sources and reuses it instead of generating the program again.
+
+When a program ships a verification key, the key bb derives from the compiled
+artifact is recorded at compile time, and every proof checks the shipped key
+against it so a stale key fails before any witness or proof is generated.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from . import BB_PATH, NARGO_PATH
+from .abi import package_name
+from .proof_store import file_digest
+from .witness_cache import circuit_digest
+from .workspace import Workspace
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+CIRCUIT_DIRS = {
+    "circuits": os.path.join(PACKAGE_DIR, "circuits"),
+    "tree_generator": os.path.join(PACKAGE_DIR, "tree_generator"),
+    "returns_generator": os.path.join(PACKAGE_DIR, "returns_generator"),
+    "instant_mdd": os.path.join(os.path.dirname(PACKAGE_DIR), "instant_mdd"),
+}
+MANIFEST = "manifest.json"
+
+
+class ArtifactMismatchError(RuntimeError):
+    """Raised when a verification key does not belong to the compiled circuit."""
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ["true", "1", "yes"]
+
+
+@functools.lru_cache(maxsize=None)
+def nargo_version():
+    result = subprocess.run(
+        [NARGO_PATH, "--version"], capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+def nargo_version_tag():
+    """Short digest of the installed nargo version, used in cache keys."""
+    return hashlib.sha256(nargo_version().encode()).hexdigest()[:12]
+
+
+def write_vk(artifact_path, out_dir):
+    """
+    Write the verification key of a compiled artifact to out_dir/vk.
+
+    Returns:
+        str: Path of the key, or None if bb failed
+    """
+    result = subprocess.run(
+        [BB_PATH, "write_vk", "-b", artifact_path, "-o", out_dir],
+        capture_output=True,
+        text=True,
+    )
+    vk_path = os.path.join(out_dir, "vk")
+    if result.returncode != 0 or not os.path.exists(vk_path):
+        return None
+    return vk_path
+
+
+def _derive_vk_digest(artifact_path):
+    """Digest of the verification key bb writes for a compiled artifact."""
+    with tempfile.TemporaryDirectory(prefix="pop-vk-") as out_dir:
+        vk_path = write_vk(artifact_path, out_dir)
+        return file_digest(vk_path) if vk_path else None
+
+
+class ArtifactManager:
+    """
+    Args:
+        cache_dir: Artifact cache location (defaults to ~/.pop/artifacts)
+        circuit_dirs: Program name to Noir package directory
+    """
+
+    def __init__(self, cache_dir=None, circuit_dirs=None):
+        self.cache_dir = Path(cache_dir or Path.home() / ".pop" / "artifacts")
+        self.circuit_dirs = dict(circuit_dirs or CIRCUIT_DIRS)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """
+        Manager using POP_ARTIFACT_DIR, or None when POP_ARTIFACTS_DISABLE is
+        set (nargo then compiles inside every job as before).
+        """
+        if _env_flag("POP_ARTIFACTS_DISABLE"):
+            return None
+        return cls(os.environ.get("POP_ARTIFACT_DIR"))
+
+    def key(self, name):
+        return f"{circuit_digest(self.circuit_dirs[name])[:32]}-{nargo_version_tag()}"
+
+    def _entry(self, name):
+        return self.cache_dir / name / self.key(name)
+
+    def manifest(self, name):
+        """Manifest of the up-to-date artifact, or None if it must be compiled."""
+        try:
+            with open(self._entry(name) / MANIFEST, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def compile(self, name, force=False):
+        """
+        Compile a program unless an artifact for its current sources and the
+        installed nargo already exists.
+
+        Returns:
+            dict: The artifact manifest
+        """
+        manifest = None if force else self.manifest(name)
+        if manifest is not None:
+            return manifest
+
+        circuit_dir = self.circuit_dirs[name]
+        package = package_name(circuit_dir)
+        with Workspace(circuit_dir, prefix="pop-compile-") as workspace:
+            result = subprocess.run(
+                [NARGO_PATH, "compile", "--silence-warnings"],
+                capture_output=True,
+                text=True,
+                cwd=workspace.path,
+            )
+            if result.returncode != 0:
+                raise RuntimeError(
+                    f"nargo compile failed for {name}: {result.stderr.strip()}"
+                )
+            compiled = os.path.join(workspace.target_dir, f"{package}.json")
+
+            manifest = {
+                "name": name,
+                "package": package,
+                "source_digest": circuit_digest(circuit_dir),
+                "nargo_version": nargo_version(),
+                "artifact_digest": file_digest(compiled),
+                "vk_digest": None,
+                "compiled_at": time.time(),
+            }
+            if os.path.isdir(os.path.join(circuit_dir, "vk")):
+                manifest["vk_digest"] = _derive_vk_digest(compiled)
+
+            # Build the entry next to its final location and rename it into place
+            entry = self._entry(name)
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=entry.parent))
+            shutil.copyfile(compiled, staging / f"{package}.json")
+            with open(staging / MANIFEST, "w") as f:
+                json.dump(manifest, f, indent=2)
+
+        if entry.exists() and not force:
+            shutil.rmtree(staging, ignore_errors=True)
+            return self.manifest(name)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(staging, entry)
+        return manifest
+
+    def compile_all(self, force=False):
+        """Compile every registered program that has sources on disk."""
+        return {
+            name: self.compile(name, force=force)
+            for name, circuit_dir in self.circuit_dirs.items()
+            if os.path.isdir(circuit_dir)
+        }
+
+    def check_vk(self, name, vk_path=None):
+        """
+        Raise ArtifactMismatchError if the shipped verification key does not
+        belong to the compiled program.
+        """
+        manifest = self.compile(name)
+        expected = manifest.get("vk_digest")
+        if expected is None:
+            return
+        vk_path = vk_path or os.path.join(self.circuit_dirs[name], "vk", "vk")
+        actual = file_digest(vk_path)
+        if actual != expected:
+            raise ArtifactMismatchError(
+                f"Verification key {vk_path} does not match the compiled {name} "
+                f"circuit (sources {manifest['source_digest'][:12]}, "
+                f"{manifest['nargo_version'].splitlines()[0]}). Regenerate it with "
+                f"`bb write_vk` or reinstall the matching nargo version."
+            )
+
+    def install(self, name, target_dir):
+        """
+        Copy the compiled program into a workspace target directory.
+
+        Returns:
+            str: Path of the installed artifact
+        """
+        artifact = self.artifact_path(name)
+        destination = os.path.join(target_dir, os.path.basename(artifact))
+        shutil.copyfile(artifact, destination)
+        return destination
+
+    def artifact_path(self, name):
+        """Path of the up-to-date compiled program, compiling it if needed."""
+        manifest = self.compile(name)
+        return str(self._entry(name) / f"{manifest['package']}.json")
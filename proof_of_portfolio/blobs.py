@@ -0,0 +1,193 @@
+"""
+Binary proof data in memory, on disk and on the wire.
+
+Proofs and public inputs stay `bytes` from the moment bb writes them until
+they are verified or uploaded; every function taking proof data also accepts
+a `memoryview` or, for older callers, a hex string. Saved results and the
+upload spool keep them in blob files next to their JSON, compressed with
+POP_BLOB_CODEC (none, gzip or zstd; zstd needs the zstandard package), and
+the JSON only holds a reference:
+
+    {"file": ..., "codec": "gzip", "size": 14244, "sha256": ...}
+
+Hex is produced on request only: generate_proof(proof_hex=True) or
+POP_PROOF_HEX adds the proof_hex and public_inputs_hex entries of old, and
+load_proof(results, hex=True) returns hex from any result.
+"""
+
+import gzip
+import hashlib
+import os
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODECS = ("none", "gzip", "zstd")
+SUFFIXES = {"none": ".bin", "gzip": ".bin.gz", "zstd": ".bin.zst"}
+PROOF_FIELDS = ("proof", "public_inputs")
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ["true", "1", "yes"]
+
+
+def as_bytes(data):
+    """
+    Proof data as a bytes-like object without copying bytes or memoryviews.
+
+    Args:
+        data: bytes, bytearray, memoryview or hex string (or None)
+
+    Raises:
+        ValueError: If a string is not valid hex
+    """
+    if data is None or isinstance(data, (bytes, bytearray, memoryview)):
+        return data
+    if isinstance(data, str):
+        return bytes.fromhex(data)
+    raise TypeError(f"Unsupported proof data type: {type(data).__name__}")
+
+
+def to_hex(data):
+    """Hex string of proof data, for callers that explicitly need text."""
+    if data is None or isinstance(data, str):
+        return data
+    return bytes(data).hex()
+
+
+def want_hex(proof_hex=None):
+    """Whether results should carry hex proof data (POP_PROOF_HEX by default)."""
+    return _env_flag("POP_PROOF_HEX") if proof_hex is None else bool(proof_hex)
+
+
+def default_codec():
+    """Blob codec from POP_BLOB_CODEC, falling back to gzip without zstandard."""
+    codec = os.environ.get("POP_BLOB_CODEC", "none").lower()
+    if codec not in CODECS:
+        raise ValueError(f"Unknown POP_BLOB_CODEC {codec!r}, expected one of {CODECS}")
+    if codec == "zstd" and zstandard is None:
+        return "gzip"
+    return codec
+
+
+def encode(data, codec):
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if codec == "zstd":
+        return zstandard.ZstdCompressor().compress(data)
+    return data
+
+
+def decode(data, codec):
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd blobs need the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def blob_path(base, name, codec):
+    """Blob file `<base>.<name>.bin[.gz|.zst]`, e.g. next to a result file."""
+    base = Path(base)
+    return base.with_name(f"{base.name}.{name}{SUFFIXES[codec]}")
+
+
+def write_blob(path, data, codec=None):
+    """
+    Atomically write proof data to a blob file.
+
+    Returns:
+        dict: Reference to the blob (file, codec, size and sha256 of the data)
+    """
+    data = as_bytes(data)
+    codec = codec or default_codec()
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(encode(data, codec))
+    os.replace(tmp_path, path)
+    return {
+        "file": str(path),
+        "codec": codec,
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+def read_blob(ref):
+    """
+    Proof data of a blob reference.
+
+    Raises:
+        FileNotFoundError: If the blob file is gone
+        ValueError: If its content does not match the reference
+    """
+    with open(ref["file"], "rb") as f:
+        data = decode(f.read(), ref.get("codec", "none"))
+    if "sha256" in ref and hashlib.sha256(data).hexdigest() != ref["sha256"]:
+        raise ValueError(f"Corrupt proof blob {ref['file']}")
+    return data
+
+
+def is_blob_ref(value):
+    return isinstance(value, dict) and "file" in value and "codec" in value
+
+
+def load_proof(results, hex=False):
+    """
+    Proof and public inputs of a generate_proof result, whether it holds
+    bytes, blob references (saved results) or hex (older results).
+
+    Args:
+        results: A generate_proof result, or its proof_results block
+        hex: Return hex strings instead of bytes
+
+    Returns:
+        tuple: (proof, public_inputs), None where missing
+    """
+    proof_results = results.get("proof_results", results)
+    values = []
+    for name in PROOF_FIELDS:
+        value = proof_results.get(name)
+        if is_blob_ref(value):
+            value = read_blob(value)
+        elif value is None:
+            value = proof_results.get(f"{name}_hex")
+        value = as_bytes(value)
+        values.append(to_hex(value) if hex else value)
+    return tuple(values)
+
+
+def store_proof_blobs(proof_results, base, codec=None):
+    """
+    Copy of a proof_results block with its proof data moved to blob files
+    named after `base`. Hex entries are dropped when the bytes are stored.
+    """
+    stored = dict(proof_results)
+    for name in PROOF_FIELDS:
+        value = stored.get(name)
+        if value is None:
+            value = stored.get(f"{name}_hex")
+        if value is None or is_blob_ref(value):
+            continue
+        codec = codec or default_codec()
+        stored[name] = write_blob(blob_path(base, name, codec), value, codec)
+        stored.pop(f"{name}_hex", None)
+    return stored
+
+
+def result_blob_files(result_path):
+    """Blob files saved next to a result file, whichever codec they use."""
+    base = Path(result_path).with_suffix("")
+    return [
+        path
+        for name in PROOF_FIELDS
+        for codec in CODECS
+        for path in [blob_path(base, name, codec)]
+        if path.exists()
+    ]
@@ -0,0 +1,109 @@
+import io
+import random
+import time
+
+import toml
+
+from ..prover_toml import write_prover_toml
+from ..pedersen import PRIME
+
+MAX_SIGNALS = 512
+MERKLE_DEPTH = 8
+ARRAY_SIZE = 256
+
+
+def full_size_inputs(seed=0):
+    """Main circuit inputs at their full padded sizes, with values kept as ints."""
+    rng = random.Random(seed)
+    signals = [
+        {
+            "trade_pair": str(rng.randrange(30)),
+            "order_type": str(rng.randrange(3)),
+            "leverage": str(rng.randrange(10**8)),
+            "price": str(rng.randrange(10**14)),
+            "processed_ms": str(rng.randrange(10**13)),
+            "order_uuid": f"0x{rng.getrandbits(128):032x}",
+            "bid": str(rng.randrange(10**14)),
+            "ask": str(rng.randrange(10**14)),
+        }
+        for _ in range(MAX_SIGNALS)
+    ]
+    return {
+        "hotkey": "5" + "A" * 47,
+        "log_returns": [rng.randrange(-(10**7), 10**7) for _ in range(ARRAY_SIZE)],
+        "n_returns": ARRAY_SIZE,
+        "checkpoint_mdds": [rng.randrange(10**8) for _ in range(MAX_SIGNALS)],
+        "daily_pnl": [rng.randrange(-(10**9), 10**9) for _ in range(ARRAY_SIZE)],
+        "signals": signals,
+        "signals_count": MAX_SIGNALS,
+        "path_elements": [
+            [rng.randrange(PRIME) for _ in range(MERKLE_DEPTH)]
+            for _ in range(MAX_SIGNALS)
+        ],
+        "path_indices": [
+            [(i >> d) & 1 for d in range(MERKLE_DEPTH)] for i in range(MAX_SIGNALS)
+        ],
+        "signals_merkle_root": f"0x{rng.randrange(PRIME):x}",
+        "weights": [rng.randrange(10**8) for _ in range(ARRAY_SIZE)],
+        "use_weighting": 0,
+    }
+
+
+def _stringified(inputs):
+    """The dict of strings generate_proof used to build for toml.dump."""
+    result = {}
+    for name, value in inputs.items():
+        if name == "signals":
+            result[name] = value
+        elif isinstance(value, list):
+            result[name] = [
+                [str(x) for x in v] if isinstance(v, list) else str(v) for v in value
+            ]
+        else:
+            result[name] = str(value)
+    return result
+
+
+def _best_of(fn, iterations):
+    best = float("inf")
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(args):
+    """Benchmark the streaming Prover.toml writer against toml.dump."""
+    iterations = getattr(args, "iterations", None) or 20
+    inputs = full_size_inputs()
+
+    def with_toml():
+        toml.dump(_stringified(inputs), io.StringIO())
+
+    def with_writer():
+        write_prover_toml(io.StringIO(), inputs)
+
+    streamed = io.StringIO()
+    write_prover_toml(streamed, inputs)
+    if toml.loads(streamed.getvalue()) != toml.loads(toml.dumps(_stringified(inputs))):
+        print("Error: streamed Prover.toml does not match toml.dump output")
+        return 1
+
+    toml_time = _best_of(with_toml, iterations)
+    writer_time = _best_of(with_writer, iterations)
+    print(f"Prover.toml size: {len(streamed.getvalue()) / 1024:.1f} KiB")
+    print(f"toml.dump (incl. stringifying): {toml_time * 1000:.2f} ms")
+    print(f"write_prover_toml:              {writer_time * 1000:.2f} ms")
+    print(f"Speedup: {toml_time / writer_time:.1f}x (best of {iterations})")
+    return 0
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the streaming Prover.toml writer against toml.dump."
+    )
+    parser.add_argument("--iterations", type=int, default=20)
+    exit(main(parser.parse_args()))
@@ -2,6 +2,8 @@ import json
 import subprocess
 from datetime import datetime, timezone, date
 
+from ..abi import field_to_signed_int, read_circuit_output
+
 SCALE = 10_000_000
 DAILY_CHECKPOINTS = 2
 
@@ -129,11 +131,12 @@ def run_nargo(
         f.write(f"accum_times = {accum_times}\n")
         f.write(f'target_duration = "{target_duration}"\n')
 
+    circuit_dir = prover_path.rsplit("/", 1)[0]
     result = subprocess.run(
         ["nargo", "execute"],
         capture_output=True,
         text=True,
-        cwd=prover_path.rsplit("/", 1)[0],
+        cwd=circuit_dir,
     )
 
     if result.returncode != 0:
@@ -141,59 +144,31 @@ def run_nargo(
         print(result.stderr)
         raise RuntimeError("nargo execute failed")
 
-    if "Circuit output:" in result.stdout:
-        output_line = result.stdout.split("Circuit output: ")[1].strip()
-
-        try:
-            if output_format == "tuple":
-                if output_line.startswith("Vec([Vec([") and output_line.endswith("])"):
-                    # Find the end of the inner Vec array
-                    inner_vec_end = output_line.rfind("]), Field(")
-                    if inner_vec_end != -1:
-                        array_part = output_line[
-                            10:inner_vec_end
-                        ]  # Remove 'Vec([Vec([' at start
-                        count_part = output_line[
-                            inner_vec_end + 9 : -2
-                        ]  # Get number after '), Field(' and before '])'
-
-                        # Remove parentheses from count part if present
-                        if count_part.startswith("(") and count_part.endswith(")"):
-                            count_part = count_part[1:-1]
-
-                        valid_days = int(count_part)
-
-                        field_values = []
-                        if array_part:
-                            field_strings = array_part.split(", ")
-                            for field_str in field_strings:
-                                if field_str.startswith(
-                                    "Field("
-                                ) and field_str.endswith(")"):
-                                    val = int(field_str[6:-1])
-                                    if val >= 2**63:
-                                        val = val - 2**64
-                                    field_values.append(val / SCALE)
-                                else:
-                                    field_values.append(0.0)
-
-                        return field_values[:valid_days], valid_days
-            elif output_format == "flat_vec":
-                import re
-
-                str_numbers = re.findall(r"Field\((.*?)\)", output_line)
-                all_returns = []
-                for s_num in str_numbers:
-                    unsigned_i = int(s_num, 0)  # Handles hex and decimal
-                    if unsigned_i >= 2**63:
-                        i = unsigned_i - 2**64
-                    else:
-                        i = unsigned_i
-                    all_returns.append(float(i) / SCALE)
-                return all_returns, len(all_returns)
-
-        except (ValueError, IndexError) as e:
-            print(f"Error parsing circuit output: {e}")
-            print(f"Raw output: {output_line}")
+    try:
+        output = read_circuit_output(circuit_dir)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error decoding circuit output: {e}")
+        return [], 0
+
+    if output_format == "tuple":
+        # (returns, valid_days)
+        values, valid_days = output
+        valid_days = int(valid_days)
+        return [field_to_signed_int(v) / SCALE for v in values][:valid_days], valid_days
+    elif output_format == "flat_vec":
+        all_returns = [
+            field_to_signed_int(v) / SCALE
+            for v in _flatten(output)
+            if not isinstance(v, bool)
+        ]
+        return all_returns, len(all_returns)
 
     return [], 0
+
+
+def _flatten(value):
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return [item for v in value for item in _flatten(v)]
+    return [value]
@@ -0,0 +1,568 @@
+"""
+Differential testing of the main circuit against MinMetrics.
+
+Generates randomized and adversarial daily return series, runs the main
+circuit on each in its own job workspace across a ProverPool, and compares
+the decoded outputs with MinMetrics on the same series. The reference is
+evaluated vectorized over all series of equal length (and checked against
+the scalar MinMetrics methods once per length). The report gives the
+distribution of absolute errors per metric and the worst error per kind of
+series, so a change that costs precision shows up across thousands of
+portfolios instead of in a single miner's verbose log.
+
+The "preview" backend evaluates the circuit with preview.circuit_outputs
+instead of `nargo execute`: bit-identical, and it needs no Noir toolchain.
+"""
+
+import math
+import shutil
+import subprocess
+from collections import defaultdict
+
+import numpy as np
+
+from . import NARGO_PATH
+from .abi import field_to_signed_int, read_circuit_output
+from .artifacts import ArtifactManager
+from .merkle import MERKLE_DEPTH
+from .min_metrics import MinMetrics
+from .preview import OMEGA_SCALE_FACTOR, CircuitAssertionError, circuit_outputs
+from .proof_generator import SCALE, scale_array
+from .prover_pool import ProverPool
+from .prover_toml import dump_prover_toml
+from .tiers import TIER_SIZES, prepare as prepare_tier, select_tier, variant_dir
+from .workspace import Workspace
+
+# Circuit outputs in return order (the eighth, the returns root, has no reference)
+METRICS = (
+    "avg_daily_pnl",
+    "sharpe",
+    "max_drawdown",
+    "calmar",
+    "omega",
+    "sortino",
+    "stat_confidence",
+)
+KINDS = (
+    "gaussian",
+    "heavy_tail",
+    "all_positive",
+    "all_negative",
+    "constant",
+    "zeros",
+    "crash",
+    "tiny",
+    "large",
+    "short",
+    "threshold",
+)
+BACKENDS = ("nargo", "preview")
+COMPARED_STATS = ("p95", "max")
+
+MAX_DAYS = TIER_SIZES["circuits"]["large"]["MAX_DAYS"]
+HOTKEY = "5" + "0" * 47
+_PADDING_SIGNAL = {
+    "trade_pair": "0",
+    "order_type": "0",
+    "leverage": "0",
+    "price": "0",
+    "processed_ms": "0",
+    "order_uuid": "0x0",
+    "bid": "0",
+    "ask": "0",
+}
+
+
+def _series(rng, kind, max_days):
+    min_n = MinMetrics.STATISTICAL_CONFIDENCE_MINIMUM_N
+    if kind == "short":
+        n = int(rng.integers(1, 6))
+    elif kind == "threshold":
+        n = min_n + int(rng.integers(-1, 2))
+    elif kind == "gaussian":
+        n = int(rng.integers(2, max_days + 1))
+    else:
+        n = int(rng.integers(min(min_n, max_days), max_days + 1))
+
+    mu = rng.uniform(-0.002, 0.003)
+    sigma = rng.uniform(0.001, 0.03)
+    if kind == "heavy_tail":
+        returns = mu + sigma * rng.standard_t(3, n) / math.sqrt(3)
+    elif kind == "all_positive":
+        returns = np.abs(rng.normal(mu, sigma, n))
+    elif kind == "all_negative":
+        returns = -np.abs(rng.normal(mu, sigma, n))
+    elif kind == "constant":
+        returns = np.full(n, mu)
+    elif kind == "zeros":
+        returns = np.zeros(n)
+    elif kind == "tiny":
+        returns = rng.normal(0, 1e-8, n)
+    elif kind == "large":
+        returns = rng.uniform(-0.5, 0.5, n)
+    else:
+        returns = rng.normal(mu, sigma, n)
+        if kind == "crash":
+            returns[int(rng.integers(0, n))] = rng.uniform(-2.0, -0.1)
+    return np.clip(returns, -5.0, 5.0)
+
+
+def generate_cases(count, seed=0, kinds=KINDS, max_days=MAX_DAYS):
+    """
+    Deterministic mix of return series, cycling through `kinds`.
+
+    Returns:
+        list: {"id", "kind", "returns"} dicts, returns as a list of floats
+    """
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "id": i,
+            "kind": kinds[i % len(kinds)],
+            "returns": _series(rng, kinds[i % len(kinds)], max_days).tolist(),
+        }
+        for i in range(count)
+    ]
+
+
+def case_tier(returns):
+    return select_tier(
+        "circuits",
+        MAX_SIGNALS=0,
+        MAX_DAYS=len(returns),
+        MAX_CHECKPOINTS=1,
+        ARRAY_SIZE=len(returns),
+    )
+
+
+def circuit_inputs(returns, sizes, use_weighting=False, bypass_confidence=False):
+    """
+    Main circuit inputs for a bare return series, with the MinMetrics
+    configuration.
+
+    The series doubles as daily PnL, weights are MinMetrics'
+    weighting_distribution, and a single checkpoint carries the series'
+    daily max drawdown, the value MinMetrics.calmar normalises by. There are
+    no signals.
+    """
+    n = len(returns)
+    days_in_year = MinMetrics.DAYS_IN_YEAR_CRYPTO
+    risk_free = MinMetrics.ANNUAL_RISK_FREE_DECIMAL
+    max_signals = sizes["MAX_SIGNALS"]
+    mdd = [MinMetrics.daily_max_drawdown(returns)] if n else []
+    return {
+        "hotkey": HOTKEY,
+        "log_returns": scale_array(returns, sizes["MAX_DAYS"], name="returns"),
+        "n_returns": n,
+        "checkpoint_returns": [0] * sizes["MAX_CHECKPOINTS"],
+        "checkpoint_count": len(mdd),
+        "checkpoint_mdds": scale_array(
+            mdd, sizes["MAX_CHECKPOINTS"], fill=SCALE, name="checkpoint_mdds"
+        ),
+        "daily_pnl": scale_array(returns, sizes["ARRAY_SIZE"], name="daily_pnl"),
+        "n_pnl": n,
+        "signals": [_PADDING_SIGNAL] * max_signals,
+        "signals_count": 0,
+        "path_elements": [[0] * MERKLE_DEPTH] * max_signals,
+        "path_indices": [[0] * MERKLE_DEPTH] * max_signals,
+        "signals_merkle_root": "0x0",
+        "risk_free_rate": int(risk_free * SCALE),
+        "daily_rf": int(math.log(1 + risk_free) / days_in_year * SCALE),
+        "use_weighting": int(use_weighting),
+        "weights": scale_array(
+            MinMetrics.weighting_distribution(returns) if use_weighting else [],
+            sizes["ARRAY_SIZE"],
+            name="weights",
+        ),
+        "bypass_confidence": int(bypass_confidence),
+        "account_size": 250000,
+        "days_in_year": days_in_year,
+        "weighted_decay_max": int(MinMetrics.WEIGHTED_AVERAGE_DECAY_MAX * SCALE),
+        "weighted_decay_min": int(MinMetrics.WEIGHTED_AVERAGE_DECAY_MIN * SCALE),
+        "weighted_decay_rate": int(MinMetrics.WEIGHTED_AVERAGE_DECAY_RATE * SCALE),
+        "omega_loss_min": int(MinMetrics.OMEGA_LOSS_MINIMUM * SCALE),
+        "sharpe_stddev_min": int(MinMetrics.SHARPE_STDDEV_MINIMUM * SCALE),
+        "sortino_downside_min": int(MinMetrics.SORTINO_DOWNSIDE_MINIMUM * SCALE),
+        "stat_conf_min_n": MinMetrics.STATISTICAL_CONFIDENCE_MINIMUM_N,
+        "annual_risk_free": int(risk_free * SCALE),
+        "omega_noconfidence": int(MinMetrics.OMEGA_NOCONFIDENCE_VALUE * SCALE),
+        "sharpe_noconfidence": int(MinMetrics.SHARPE_NOCONFIDENCE_VALUE * SCALE),
+        "sortino_noconfidence": int(MinMetrics.SORTINO_NOCONFIDENCE_VALUE * SCALE),
+        "calmar_noconfidence": int(MinMetrics.CALMAR_NOCONFIDENCE_VALUE * SCALE),
+        "stat_confidence_noconfidence": int(
+            MinMetrics.STATISTICAL_CONFIDENCE_NOCONFIDENCE_VALUE * SCALE
+        ),
+    }
+
+
+def decode_outputs(fields, use_weighting=False):
+    """
+    Circuit output fields as floats in MinMetrics units.
+
+    Every metric is scaled by SCALE except the weighted omega, which the
+    circuit returns scaled by SCALE * OMEGA_SCALE_FACTOR.
+    """
+    values = {}
+    for metric, field in zip(METRICS, fields):
+        scale = SCALE
+        if metric == "omega" and use_weighting:
+            scale *= OMEGA_SCALE_FACTOR
+        values[metric] = field_to_signed_int(field) / scale
+    return values
+
+
+def _evaluate_case(
+    backend,
+    returns,
+    sizes,
+    use_weighting,
+    bypass_confidence,
+    circuit_dir=None,
+    artifact_path=None,
+):
+    """Worker job: the circuit's output fields for one series, or its error."""
+    try:
+        inputs = circuit_inputs(returns, sizes, use_weighting, bypass_confidence)
+        if backend == "preview":
+            return {"fields": circuit_outputs(inputs)}
+
+        with Workspace(circuit_dir, prefix="pop-difftest-") as workspace:
+            shutil.copy(artifact_path, workspace.target_dir)
+            dump_prover_toml(inputs, workspace.prover_toml)
+            result = subprocess.run(
+                [NARGO_PATH, "execute", "witness", "--silence-warnings"],
+                capture_output=True,
+                text=True,
+                cwd=workspace.path,
+            )
+            if result.returncode != 0:
+                lines = result.stderr.strip().splitlines()
+                return {"error": lines[-1] if lines else "nargo execute failed"}
+            return {
+                "fields": read_circuit_output(
+                    workspace.path, "witness", target_dir=workspace.target_dir
+                )
+            }
+    except (CircuitAssertionError, ValueError) as e:
+        return {"error": str(e)}
+
+
+def run_circuit(
+    cases,
+    backend="nargo",
+    workers=None,
+    use_weighting=False,
+    bypass_confidence=False,
+    manager=None,
+):
+    """
+    Evaluate the circuit on every case in parallel, one workspace per job.
+
+    Returns:
+        list: Per case, {"fields": [...]} or {"error": str}
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+
+    tiers = [case_tier(case["returns"]) for case in cases]
+    artifacts = {}
+    if backend == "nargo":
+        manager = manager or ArtifactManager()
+        for tier in sorted(set(tiers)):
+            name = prepare_tier("circuits", tier, manager, with_vk=False)
+            artifacts[tier] = manager.artifact_path(name)
+
+    with ProverPool(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                _evaluate_case,
+                backend,
+                case["returns"],
+                TIER_SIZES["circuits"][tier],
+                use_weighting,
+                bypass_confidence,
+                variant_dir("circuits", tier),
+                artifacts.get(tier),
+            )
+            for case, tier in zip(cases, tiers)
+        ]
+        return [future.result() for future in futures]
+
+
+def reference_metrics(
+    returns,
+    use_weighting=False,
+    bypass_confidence=False,
+    days_in_year=MinMetrics.DAYS_IN_YEAR_CRYPTO,
+):
+    """
+    MinMetrics evaluated over a batch of series of equal length.
+
+    Args:
+        returns: 2-D array, one series per row
+
+    Returns:
+        dict: Metric name to a 1-D array with one value per row
+    """
+    r = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+    rows, n = r.shape
+    weights = MinMetrics.weighting_distribution(r[0]) if use_weighting else np.ones(n)
+    confident = bypass_confidence or n >= MinMetrics.STATISTICAL_CONFIDENCE_MINIMUM_N
+
+    def confidence(values, noconfidence):
+        return values if confident else np.full(rows, float(noconfidence))
+
+    avg = r @ weights / weights.sum()
+    variance = ((r - avg[:, None]) ** 2) @ weights / weights.sum()
+    excess = avg * days_in_year - MinMetrics.ANNUAL_RISK_FREE_DECIMAL
+    volatility = np.sqrt(variance * days_in_year) if n >= 2 else np.full(rows, np.inf)
+
+    # Downside volatility over the returns below the daily risk-free rate
+    below = r < MinMetrics.log_risk_free_rate(days_in_year)
+    below_weights = below * weights
+    with np.errstate(divide="ignore", invalid="ignore"):
+        below_sum = below_weights.sum(axis=1)
+        below_avg = (r * below_weights).sum(axis=1) / below_sum
+        below_variance = ((r - below_avg[:, None]) ** 2 * below_weights).sum(
+            axis=1
+        ) / below_sum
+    downside = np.where(
+        below.sum(axis=1) < 2, np.inf, np.sqrt(below_variance * days_in_year)
+    )
+
+    cumulative = np.cumsum(r, axis=1)
+    drawdown = (1 - np.exp(cumulative - np.maximum.accumulate(cumulative, axis=1))).max(
+        axis=1
+    )
+
+    in_range = (drawdown > 0) & (drawdown <= 1)
+    drawdown_percentage = np.maximum((1 - drawdown) * 100, 0.01)
+    normalization = np.where(
+        in_range & (drawdown_percentage < 10), 1.0 / drawdown_percentage, 0.0
+    )
+    calmar = np.minimum(
+        avg * days_in_year * 100 * normalization, MinMetrics.CALMAR_RATIO_CAP
+    )
+
+    positive = r > 0
+    if use_weighting:
+        loss_minimum = MinMetrics.OMEGA_LOSS_MINIMUM
+        weights_positive = np.maximum((positive * weights).sum(axis=1), loss_minimum)
+        weights_negative = np.maximum((~positive * weights).sum(axis=1), loss_minimum)
+        gains = (r * positive * weights).sum(axis=1) * weights_negative
+        losses = (r * ~positive * weights).sum(axis=1) * weights_positive
+    else:
+        gains = np.where(positive, r, 0).sum(axis=1)
+        losses = np.where(positive, 0, r).sum(axis=1)
+    omega = gains / np.maximum(np.abs(losses), MinMetrics.OMEGA_LOSS_MINIMUM)
+
+    no_confidence = MinMetrics.STATISTICAL_CONFIDENCE_NOCONFIDENCE_VALUE
+    if n < 2 or (
+        n < MinMetrics.STATISTICAL_CONFIDENCE_MINIMUM_N and not bypass_confidence
+    ):
+        t_stat = np.full(rows, float(no_confidence))
+    else:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_stat = r.mean(axis=1) / (r.std(axis=1, ddof=1) / math.sqrt(n))
+        t_stat = np.where(np.isclose(r.var(axis=1), 0), no_confidence, t_stat)
+
+    return {
+        "avg_daily_pnl": avg,
+        "sharpe": confidence(
+            excess / np.maximum(volatility, MinMetrics.SHARPE_STDDEV_MINIMUM),
+            MinMetrics.SHARPE_NOCONFIDENCE_VALUE,
+        ),
+        "max_drawdown": drawdown,
+        "calmar": confidence(calmar, MinMetrics.CALMAR_NOCONFIDENCE_VALUE),
+        "omega": confidence(omega, MinMetrics.OMEGA_NOCONFIDENCE_VALUE),
+        "sortino": confidence(
+            excess / np.maximum(downside, MinMetrics.SORTINO_DOWNSIDE_MINIMUM),
+            MinMetrics.SORTINO_NOCONFIDENCE_VALUE,
+        ),
+        "stat_confidence": t_stat,
+    }
+
+
+def scalar_reference(returns, use_weighting=False, bypass_confidence=False):
+    """MinMetrics on a single series, one method call per metric."""
+    options = {"weighting": use_weighting, "bypass_confidence": bypass_confidence}
+    return {
+        "avg_daily_pnl": MinMetrics.average(returns, weighting=use_weighting),
+        "sharpe": MinMetrics.sharpe(returns, **options),
+        "max_drawdown": MinMetrics.daily_max_drawdown(returns),
+        "calmar": MinMetrics.calmar(returns, **options),
+        "omega": MinMetrics.omega(returns, **options),
+        "sortino": MinMetrics.sortino(returns, **options),
+        "stat_confidence": MinMetrics.statistical_confidence(
+            returns, bypass_confidence=bypass_confidence
+        ),
+    }
+
+
+def reference_values(cases, use_weighting=False, bypass_confidence=False):
+    """
+    MinMetrics values of every case, batched by series length.
+
+    The first series of each length is also run through the scalar MinMetrics
+    methods, so the vectorized reference cannot drift from them unnoticed.
+
+    Returns:
+        list: Per case, a dict of metric name to float
+    """
+    by_length = defaultdict(list)
+    for index, case in enumerate(cases):
+        by_length[len(case["returns"])].append(index)
+
+    values = [None] * len(cases)
+    for indices in by_length.values():
+        batch = np.array([cases[i]["returns"] for i in indices])
+        metrics = reference_metrics(batch, use_weighting, bypass_confidence)
+
+        expected = scalar_reference(batch[0], use_weighting, bypass_confidence)
+        for metric, value in expected.items():
+            if not np.isclose(metrics[metric][0], value, rtol=1e-9, atol=1e-12):
+                raise RuntimeError(
+                    f"Vectorized {metric} disagrees with MinMetrics on case "
+                    f"{cases[indices[0]]['id']}: {metrics[metric][0]} != {value}"
+                )
+
+        for row, i in enumerate(indices):
+            values[i] = {metric: float(metrics[metric][row]) for metric in METRICS}
+    return values
+
+
+def _distribution(errors):
+    errors = np.asarray(errors, dtype=np.float64)
+    if errors.size == 0:
+        return {"count": 0}
+    return {
+        "count": int(errors.size),
+        "mean": float(errors.mean()),
+        "p50": float(np.percentile(errors, 50)),
+        "p95": float(np.percentile(errors, 95)),
+        "p99": float(np.percentile(errors, 99)),
+        "max": float(errors.max()),
+    }
+
+
+def build_report(cases, outputs, references, use_weighting=False):
+    """
+    Error distributions of the circuit against MinMetrics.
+
+    Errors are absolute, in MinMetrics units. Cases the circuit rejects are
+    counted as failures per kind and left out of the distributions.
+
+    Returns:
+        dict: The report
+    """
+    errors = {metric: [] for metric in METRICS}
+    worst = {metric: None for metric in METRICS}
+    kinds = {}
+    failures = []
+
+    for case, output, reference in zip(cases, outputs, references):
+        kind = kinds.setdefault(
+            case["kind"],
+            {"cases": 0, "failures": 0, "max_error": dict.fromkeys(METRICS, 0.0)},
+        )
+        kind["cases"] += 1
+        if "error" in output:
+            kind["failures"] += 1
+            failures.append(
+                {
+                    "id": case["id"],
+                    "kind": case["kind"],
+                    "n": len(case["returns"]),
+                    "error": output["error"],
+                }
+            )
+            continue
+
+        circuit = decode_outputs(output["fields"], use_weighting)
+        for metric in METRICS:
+            error = abs(circuit[metric] - reference[metric])
+            if not math.isfinite(error):
+                continue
+            errors[metric].append(error)
+            kind["max_error"][metric] = max(kind["max_error"][metric], error)
+            if worst[metric] is None or error > worst[metric]["error"]:
+                worst[metric] = {
+                    "id": case["id"],
+                    "kind": case["kind"],
+                    "error": error,
+                    "circuit": circuit[metric],
+                    "reference": reference[metric],
+                }
+
+    return {
+        "cases": len(cases),
+        "failures": len(failures),
+        "use_weighting": use_weighting,
+        "metrics": {
+            metric: dict(_distribution(errors[metric]), worst=worst[metric])
+            for metric in METRICS
+        },
+        "kinds": kinds,
+        "failed_cases": failures,
+    }
+
+
+def run_difftest(
+    count=1000,
+    seed=0,
+    backend="nargo",
+    workers=None,
+    use_weighting=False,
+    bypass_confidence=False,
+    kinds=KINDS,
+):
+    """
+    Generate `count` series, evaluate the circuit and MinMetrics on each, and
+    report the error distributions.
+
+    Returns:
+        dict: build_report() result plus the run settings
+    """
+    cases = generate_cases(count, seed, kinds)
+    outputs = run_circuit(cases, backend, workers, use_weighting, bypass_confidence)
+    references = reference_values(cases, use_weighting, bypass_confidence)
+    report = build_report(cases, outputs, references, use_weighting)
+    report.update(
+        {"seed": seed, "backend": backend, "bypass_confidence": bypass_confidence}
+    )
+    return report
+
+
+def compare_reports(baseline, current, max_regression=1.0):
+    """
+    Compare each metric's error statistics against a baseline report.
+
+    Args:
+        max_regression: Allowed growth in percent before a change counts as a
+            regression
+
+    Returns:
+        tuple: (changes, regressions), lists of
+            (metric, statistic, baseline value, current value, percent change)
+    """
+    changes, regressions = [], []
+    for metric in METRICS:
+        old = baseline["metrics"].get(metric, {})
+        new = current["metrics"].get(metric, {})
+        for stat in COMPARED_STATS:
+            before, after = old.get(stat, 0.0), new.get(stat, 0.0)
+            if before == after:
+                continue
+            percent = (after - before) / before * 100 if before else float("inf")
+            change = (metric, stat, before, after, percent)
+            changes.append(change)
+            if percent > max_regression:
+                regressions.append(change)
+
+    if current["failures"] > baseline["failures"]:
+        before, after = baseline["failures"], current["failures"]
+        percent = (after - before) / before * 100 if before else float("inf")
+        change = ("<circuit>", "failures", before, after, percent)
+        changes.append(change)
+        regressions.append(change)
+    return changes, regressions
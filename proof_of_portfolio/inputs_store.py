@@ -0,0 +1,130 @@
+"""
+Side files for the circuit inputs recorded in proof results.
+
+Every result carries a circuit_inputs block with the scaled input arrays. In
+compact mode (POP_COMPACT_RESULTS) the arrays are written once to
+~/.pop/inputs/<digest>.npz (or POP_INPUTS_DIR) and the block keeps only their
+digest, the side file and the counts, so results stay small in memory, when
+pickled between processes and on disk. load_circuit_inputs() reads the arrays
+back when a caller asks for them. Side files are content-addressed, so runs
+on unchanged inputs share one file.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+# circuit_inputs entries moved to the side file, with their stored dtype
+ARRAY_DTYPES = {
+    "daily_log_returns": np.float64,
+    "weights_float": np.float64,
+    "scaled_weights": np.int64,
+    "scaled_daily_pnl": np.int64,
+    "scaled_daily_returns": np.int64,
+    "scaled_checkpoint_returns": np.int64,
+    "scaled_checkpoint_mdds": np.int64,
+}
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ["true", "1", "yes"]
+
+
+def inputs_digest(arrays):
+    """Digest of named arrays: their names, dtypes, shapes and contents."""
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(f"{name}:{array.dtype.str}:{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class InputStore:
+    """
+    Args:
+        store_dir: Side file location (defaults to ~/.pop/inputs)
+    """
+
+    def __init__(self, store_dir=None):
+        self.store_dir = Path(store_dir or Path.home() / ".pop" / "inputs")
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """
+        Store using POP_INPUTS_DIR when POP_COMPACT_RESULTS is set, otherwise
+        None (results embed the full inputs as before).
+        """
+        if not _env_flag("POP_COMPACT_RESULTS"):
+            return None
+        return cls(os.environ.get("POP_INPUTS_DIR"))
+
+    def path(self, digest):
+        return self.store_dir / f"{digest}.npz"
+
+    def put(self, circuit_inputs):
+        """
+        Move the arrays of a circuit_inputs block into a side file.
+
+        Returns:
+            dict: The compact block: the scalar entries plus inputs_digest and
+                inputs_file
+        """
+        arrays = {
+            name: np.asarray(
+                [] if circuit_inputs.get(name) is None else circuit_inputs[name],
+                dtype=dtype,
+            )
+            for name, dtype in ARRAY_DTYPES.items()
+        }
+        digest = inputs_digest(arrays)
+        path = self.path(digest)
+        try:
+            # Reused side files count as fresh for retention (see retention.py)
+            os.utime(path)
+        except FileNotFoundError:
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, path)
+
+        compact = {
+            key: value
+            for key, value in circuit_inputs.items()
+            if key not in ARRAY_DTYPES
+        }
+        compact["inputs_digest"] = digest
+        compact["inputs_file"] = str(path)
+        return compact
+
+
+def load_circuit_inputs(results):
+    """
+    Full circuit_inputs block of a result, reading the side file of a compact
+    one.
+
+    Args:
+        results: A generate_proof result, or its circuit_inputs block
+
+    Returns:
+        dict: circuit_inputs with every array as a list
+
+    Raises:
+        FileNotFoundError: If the side file of a compact block is gone
+    """
+    circuit_inputs = results.get("circuit_inputs", results)
+    if "inputs_file" not in circuit_inputs:
+        return circuit_inputs
+
+    with np.load(circuit_inputs["inputs_file"], allow_pickle=False) as stored:
+        arrays = {name: stored[name].tolist() for name in stored.files}
+    full = {
+        key: value
+        for key, value in circuit_inputs.items()
+        if key not in ("inputs_digest", "inputs_file")
+    }
+    full.update(arrays)
+    return full
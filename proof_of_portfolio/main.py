@@ -17,6 +17,11 @@ Validator Commands:
 Utility Commands:
   - generate-test-data: Create a randomized test data file for validation.
   - save-tree: Save a generated Merkle tree to a specified output file.
+  - upload-drain: Upload proofs left in the upload spool and report the backlog.
+  - compile-circuits: Precompile the Noir programs and check their verification keys.
+  - profile-circuit: Report opcode and gate counts per circuit component.
+  - difftest: Compare circuit outputs with MinMetrics across generated portfolios.
+  - prune-results: Evict saved results beyond a retention policy.
   - demo: Run demonstration scripts for various system components.
 """
 
@@ -29,7 +34,7 @@ from typing import Tuple, Optional
 from .miner import Miner
 from .validator import score_child, score_all
 from .analyze_data import split_input_json
-from .demos import main as demo_main, generate_input_data
+from .demos import main as demo_main, generate_input_data, bench_prover_toml
 
 
 def _handle_data_file_path(
@@ -371,6 +376,292 @@ def save_tree(args):
         return 1
 
 
+def upload_drain(args):
+    """
+    Upload every spooled proof of a wallet's hotkey and report the backlog.
+
+    Args:
+        args: Command line arguments containing the wallet name, hotkey and path,
+              the spool directory and whether to only print the status
+    """
+    try:
+        import time
+
+        import bittensor as bt
+
+        from .spool import UploadSpool
+        from .uploader import get_uploader
+
+        spool = UploadSpool(spool_dir=getattr(args, "spool_dir", None))
+        recovered = spool.recover()
+        counts = spool.counts()
+        print(
+            f"Spool {spool.spool_dir}: {counts['pending']} pending, "
+            f"{counts['inflight']} in flight, {counts['sent']} sent, "
+            f"{counts['failed']} failed"
+        )
+        if recovered:
+            print(f"Recovered {recovered} uploads abandoned by dead processes")
+        if getattr(args, "status", False):
+            return 0
+
+        wallet = bt.Wallet(
+            name=args.wallet_name, hotkey=args.wallet_hotkey, path=args.wallet_path
+        )
+        hotkey = wallet.hotkey.ss58_address
+        backlog = spool.pending(hotkey)
+        print(f"Backlog for {hotkey}: {len(backlog)} proofs")
+        if not backlog:
+            return 0
+
+        start = time.monotonic()
+        futures = spool.drain(get_uploader(), wallet)
+        uploaded = 0
+        for future in futures.values():
+            if future.result() is not None:
+                uploaded += 1
+        elapsed = time.monotonic() - start
+
+        failed = len(futures) - uploaded
+        print(
+            f"Uploaded {uploaded}/{len(futures)} proofs in {elapsed:.2f}s "
+            f"({uploaded / elapsed if elapsed > 0 else 0:.2f} proofs/s)"
+        )
+        print(f"Remaining backlog: {len(spool.pending(hotkey))} proofs")
+        return 1 if failed else 0
+    except Exception as e:
+        print(f"Error draining upload spool: {str(e)}")
+        return 1
+
+
+def compile_circuits(args):
+    """
+    Precompile the Noir programs into the artifact cache.
+
+    Args:
+        args: Command line arguments containing the program names, whether to
+              force recompilation and whether to build the size tiers
+    """
+    try:
+        from .artifacts import ArtifactManager, ArtifactMismatchError
+        from . import tiers
+
+        manager = ArtifactManager(getattr(args, "artifact_dir", None))
+        if getattr(args, "tiers", False) or getattr(args, "ship_vk", False):
+            # Generates the variant packages and their verification keys
+            tiers.prepare_all(manager)
+        names = getattr(args, "names", None) or [
+            name
+            for name, circuit_dir in manager.circuit_dirs.items()
+            if Path(circuit_dir).is_dir()
+        ]
+
+        failed = False
+        for name in names:
+            if name not in manager.circuit_dirs:
+                print(f"Error: Unknown circuit {name}")
+                failed = True
+                continue
+            manifest = manager.compile(name, force=getattr(args, "force", False))
+            print(
+                f"{name}: sources {manifest['source_digest'][:12]}, "
+                f"artifact {manifest['artifact_digest'][:12]}"
+            )
+            try:
+                manager.check_vk(name)
+            except ArtifactMismatchError as e:
+                print(f"Error: {e}")
+                failed = True
+
+        if getattr(args, "ship_vk", False):
+            for program in tiers.TIER_SIZES:
+                for tier in tiers.TIERS:
+                    if tier != "large":
+                        print(f"Shipped {tiers.ship_vk(program, tier)}")
+
+        return 1 if failed else 0
+    except Exception as e:
+        print(f"Error compiling circuits: {str(e)}")
+        return 1
+
+
+def profile_circuit(args):
+    """
+    Profile the constraint cost of a circuit per source file and function.
+
+    Args:
+        args: Command line arguments containing the circuit name, optional
+              Prover.toml to time execution with, output path and baseline
+    """
+    try:
+        from .profiler import compare_profiles, profile_circuit as build_profile
+
+        profile = build_profile(
+            args.circuit,
+            prover_toml=getattr(args, "prover_toml", None),
+            iterations=getattr(args, "iterations", 3),
+        )
+
+        totals = profile["totals"]
+        print(
+            f"{profile['circuit']}: {totals['acir_opcodes']} ACIR opcodes, "
+            f"{totals['gates']} gates, {totals['brillig_opcodes']} Brillig opcodes"
+        )
+        if profile["execution_seconds"] is not None:
+            print(f"Execution time: {profile['execution_seconds']:.3f}s")
+
+        print(f"\n{'Component':<50} {'Opcodes':>10} {'Gates':>12} {'Share':>7}")
+        ranked = sorted(
+            profile["components"].items(),
+            key=lambda item: item[1]["inclusive"]["gates"],
+            reverse=True,
+        )
+        for component, costs in ranked[: getattr(args, "top", 20)]:
+            inclusive = costs["inclusive"]
+            share = inclusive["gates"] / totals["gates"] * 100 if totals["gates"] else 0
+            print(
+                f"{component:<50} {inclusive['acir_opcodes']:>10} "
+                f"{inclusive['gates']:>12} {share:>6.1f}%"
+            )
+
+        output_path = getattr(args, "output_path", None)
+        if output_path:
+            with open(output_path, "w") as f:
+                json.dump(profile, f, indent=2, sort_keys=True)
+            print(f"\nProfile saved to {output_path}")
+
+        baseline_path = getattr(args, "baseline", None)
+        if baseline_path:
+            with open(baseline_path, "r") as f:
+                baseline = json.load(f)
+            changes, regressions = compare_profiles(
+                baseline, profile, args.max_regression
+            )
+            print(f"\nChanges against {baseline_path}:")
+            for component, metric, before, after, percent in changes:
+                print(f"  {component} {metric}: {before} -> {after} ({percent:+.2f}%)")
+            if regressions:
+                print(
+                    f"Error: {len(regressions)} costs grew by more than {args.max_regression}%"
+                )
+                return 1
+
+        return 0
+    except Exception as e:
+        print(f"Error profiling circuit: {str(e)}")
+        return 1
+
+
+def difftest(args):
+    """
+    Run the circuit and MinMetrics on generated return series and report the
+    error distribution of every metric.
+
+    Args:
+        args: Command line arguments containing the case count, seed, backend,
+              worker count, output path and baseline
+    """
+    try:
+        from .difftest import compare_reports, run_difftest
+
+        report = run_difftest(
+            count=args.count,
+            seed=args.seed,
+            backend=args.backend,
+            workers=args.workers,
+            use_weighting=args.weighting,
+            bypass_confidence=args.bypass_confidence,
+        )
+
+        print(
+            f"{report['cases']} cases ({report['backend']} backend), "
+            f"{report['failures']} rejected by the circuit"
+        )
+        print(
+            f"\n{'Metric':<16} {'Mean':>12} {'p50':>12} {'p95':>12} {'Max':>12}  Worst"
+        )
+        for metric, stats in report["metrics"].items():
+            if not stats["count"]:
+                print(f"{metric:<16} {'-':>12}")
+                continue
+            worst = stats["worst"]
+            print(
+                f"{metric:<16} {stats['mean']:>12.3e} {stats['p50']:>12.3e} "
+                f"{stats['p95']:>12.3e} {stats['max']:>12.3e}  "
+                f"#{worst['id']} ({worst['kind']})"
+            )
+
+        print(f"\n{'Kind':<14} {'Cases':>6} {'Failed':>7}  Largest error")
+        for kind, stats in report["kinds"].items():
+            metric, error = max(stats["max_error"].items(), key=lambda item: item[1])
+            print(
+                f"{kind:<14} {stats['cases']:>6} {stats['failures']:>7}  "
+                f"{error:.3e} ({metric})"
+            )
+
+        output_path = getattr(args, "output_path", None)
+        if output_path:
+            with open(output_path, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nReport saved to {output_path}")
+
+        baseline_path = getattr(args, "baseline", None)
+        if baseline_path:
+            with open(baseline_path, "r") as f:
+                baseline = json.load(f)
+            changes, regressions = compare_reports(
+                baseline, report, args.max_regression
+            )
+            print(f"\nChanges against {baseline_path}:")
+            for metric, stat, before, after, percent in changes:
+                print(
+                    f"  {metric} {stat}: {before:.3e} -> {after:.3e} ({percent:+.2f}%)"
+                )
+            if regressions:
+                print(
+                    f"Error: {len(regressions)} error statistics grew by more than {args.max_regression}%"
+                )
+                return 1
+        return 0
+    except Exception as e:
+        print(f"Error running difftest: {str(e)}")
+        return 1
+
+
+def prune_results(args):
+    """
+    Apply a retention policy to the results, upload spool entries and input
+    side files saved under ~/.pop once.
+
+    Args:
+        args: Command line arguments containing the policy limits (falling
+              back to the POP_RETAIN_* variables) and the dry-run flag
+    """
+    try:
+        from .retention import RetentionPolicy, compact
+
+        policy = RetentionPolicy.from_env() or RetentionPolicy()
+        if args.keep_last is not None:
+            policy.keep_last = max(1, args.keep_last)
+        if args.max_age_hours is not None:
+            policy.max_age = args.max_age_hours * 3600
+        if args.max_mb is not None:
+            policy.max_bytes = int(args.max_mb * 1024 * 1024)
+
+        stats = compact(policy, dry_run=args.dry_run)
+        action = "Would evict" if args.dry_run else "Evicted"
+        print(
+            f"{action} {stats['evicted']} files ({stats['evicted_bytes']} bytes), "
+            f"kept {stats['kept']} ({stats['kept_bytes']} bytes)"
+        )
+        for kind, counts in stats["kinds"].items():
+            print(f"  {kind}: {counts['evicted']} evicted, {counts['kept']} kept")
+        return 0
+    except Exception as e:
+        print(f"Error pruning results: {str(e)}")
+        return 1
+
+
 def print_header():
     """
     Prints the ASCII art header for the CLI.
@@ -622,6 +913,166 @@ def main():
         )
         generate_test_data_parser.set_defaults(func=generate_input_data.main)
 
+        # Upload-drain command
+        upload_drain_parser = subparsers.add_parser(
+            "upload-drain",
+            help="Upload proofs left in the upload spool and report the backlog",
+            description="Retry every spooled proof of a wallet's hotkey that has not been uploaded yet",
+        )
+        upload_drain_parser.add_argument(
+            "--wallet-name", default="default", help="Bittensor wallet name"
+        )
+        upload_drain_parser.add_argument(
+            "--wallet-hotkey", default="default", help="Bittensor wallet hotkey"
+        )
+        upload_drain_parser.add_argument(
+            "--wallet-path", default="~/.bittensor/wallets", help="Wallets directory"
+        )
+        upload_drain_parser.add_argument(
+            "--spool-dir",
+            help="Upload spool directory (default: ~/.pop/upload_spool)",
+        )
+        upload_drain_parser.add_argument(
+            "--status",
+            action="store_true",
+            help="Only print the spool status, do not upload",
+        )
+        upload_drain_parser.set_defaults(func=upload_drain)
+
+        # Compile-circuits command
+        compile_parser = subparsers.add_parser(
+            "compile-circuits",
+            help="Precompile the Noir programs and check their verification keys",
+            description="Compile each Noir program once per source digest and nargo version into the artifact cache",
+        )
+        compile_parser.add_argument(
+            "names",
+            nargs="*",
+            help="Programs to compile (default: circuits, tree_generator, returns_generator, instant_mdd, plus their tiers with --tiers)",
+        )
+        compile_parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Recompile even if an up-to-date artifact exists",
+        )
+        compile_parser.add_argument(
+            "--artifact-dir",
+            help="Artifact cache directory (default: ~/.pop/artifacts)",
+        )
+        compile_parser.add_argument(
+            "--tiers",
+            action="store_true",
+            help="Also build the small and medium circuit tiers and their verification keys",
+        )
+        compile_parser.add_argument(
+            "--ship-vk",
+            action="store_true",
+            help="Build the tiers and copy their verification keys into the package",
+        )
+        compile_parser.set_defaults(func=compile_circuits)
+
+        # Profile-circuit command
+        profile_parser = subparsers.add_parser(
+            "profile-circuit",
+            help="Report opcode and gate counts per circuit component",
+            description="Attribute ACIR opcodes and bb gates to each source file and function of a circuit",
+        )
+        profile_parser.add_argument(
+            "--circuit",
+            default="circuits",
+            help="Circuit to profile (default: circuits)",
+        )
+        profile_parser.add_argument(
+            "--prover-toml",
+            help="Prover.toml with valid inputs, to also time nargo execute",
+        )
+        profile_parser.add_argument(
+            "--iterations", type=int, default=3, help="Timed executions."
+        )
+        profile_parser.add_argument(
+            "--output", dest="output_path", help="Path to save the JSON profile"
+        )
+        profile_parser.add_argument(
+            "--baseline", help="Earlier JSON profile to compare against"
+        )
+        profile_parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=1.0,
+            help="Allowed cost growth against the baseline, in percent (default: 1.0)",
+        )
+        profile_parser.add_argument(
+            "--top", type=int, default=20, help="Components to print."
+        )
+        profile_parser.set_defaults(func=profile_circuit)
+
+        # Difftest command
+        difftest_parser = subparsers.add_parser(
+            "difftest",
+            help="Compare circuit outputs with MinMetrics across generated portfolios",
+            description="Run the main circuit and MinMetrics on randomized and adversarial return series and report per-metric error distributions",
+        )
+        difftest_parser.add_argument(
+            "--count", type=int, default=1000, help="Return series to generate."
+        )
+        difftest_parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the series generator."
+        )
+        difftest_parser.add_argument(
+            "--backend",
+            choices=["nargo", "preview"],
+            default="nargo",
+            help="Solve the circuit with nargo, or evaluate it in Python (default: nargo)",
+        )
+        difftest_parser.add_argument(
+            "--workers", type=int, help="Worker processes (default: min(4, CPUs))"
+        )
+        difftest_parser.add_argument(
+            "--weighting", action="store_true", help="Use weighted metrics."
+        )
+        difftest_parser.add_argument(
+            "--bypass-confidence",
+            action="store_true",
+            help="Compute ratios below the minimum number of days.",
+        )
+        difftest_parser.add_argument(
+            "--output", dest="output_path", help="Path to save the JSON report"
+        )
+        difftest_parser.add_argument(
+            "--baseline", help="Earlier JSON report to compare against"
+        )
+        difftest_parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=1.0,
+            help="Allowed growth of the p95 and max errors, in percent (default: 1.0)",
+        )
+        difftest_parser.set_defaults(func=difftest)
+
+        # Prune-results command
+        prune_parser = subparsers.add_parser(
+            "prune-results",
+            help="Evict saved results beyond a retention policy",
+            description="Delete saved proof and instant MDD results and sent or failed upload spool entries beyond the given limits, and input side files no kept result uses; the newest file of every hotkey is always kept",
+        )
+        prune_parser.add_argument(
+            "--keep-last", type=int, help="Results kept per hotkey (POP_RETAIN_LAST)"
+        )
+        prune_parser.add_argument(
+            "--max-age-hours",
+            type=float,
+            help="Maximum result age in hours (POP_RETAIN_MAX_AGE_HOURS)",
+        )
+        prune_parser.add_argument(
+            "--max-mb",
+            type=float,
+            help="Total size budget of all results in MB (POP_RETAIN_MAX_MB)",
+        )
+        prune_parser.add_argument(
+            "--dry-run", action="store_true", help="Report without deleting."
+        )
+        prune_parser.set_defaults(func=prune_results)
+
         # Demo command
         demo_parser = subparsers.add_parser(
             "demo",
@@ -641,6 +1092,16 @@ def main():
         )
         main_demo_parser.set_defaults(func=demo_main.main)
 
+        # Prover.toml writer benchmark
+        bench_toml_parser = demo_subparsers.add_parser(
+            "bench-prover-toml",
+            help="Benchmark the streaming Prover.toml writer against toml.dump on full-size inputs",
+        )
+        bench_toml_parser.add_argument(
+            "--iterations", type=int, default=20, help="Timed runs per writer."
+        )
+        bench_toml_parser.set_defaults(func=bench_prover_toml.main)
+
         # Parse arguments
         args = parser.parse_args()
 
@@ -0,0 +1,242 @@
+"""
+In-process signals Merkle tree builder.
+
+Produces the same tree as the `tree_generator` circuit (and the inclusion checks
+in `circuits/components/src/core/merkle.nr`) without running nargo, either from
+scratch (build_merkle_tree) or incrementally from a previous state
+(IncrementalMerkleTree).
+"""
+
+import hashlib
+from functools import lru_cache
+
+from .pedersen import pedersen_hash, to_field
+
+MAX_SIGNALS = 512
+MERKLE_DEPTH = 8
+
+SIGNAL_FIELDS = (
+    "trade_pair",
+    "order_type",
+    "leverage",
+    "price",
+    "processed_ms",
+    "order_uuid",
+    "bid",
+    "ask",
+)
+
+
+def hash_signal(signal):
+    """
+    Hash a TradingSignal exactly like `hash_signal` in core/merkle.nr.
+
+    Args:
+        signal: Dict with the TradingSignal fields as ints or field strings
+
+    Returns:
+        int: Leaf hash
+    """
+    return pedersen_hash([to_field(signal[name]) for name in SIGNAL_FIELDS])
+
+
+def hash_pair(left, right):
+    return pedersen_hash([left, right])
+
+
+@lru_cache(maxsize=None)
+def zero_subtree_hashes(depth=MERKLE_DEPTH):
+    """
+    Roots of all-padding subtrees per level. Padding leaves are 0, so level 0 is 0
+    and every level above is the hash of two copies of the level below.
+    """
+    zeros = [0]
+    for _ in range(depth):
+        zeros.append(hash_pair(zeros[-1], zeros[-1]))
+    return tuple(zeros)
+
+
+def build_tree_levels(leaf_hashes, actual_len, depth=MERKLE_DEPTH):
+    """
+    Build every level of the tree bottom-up, substituting precomputed zero
+    subtrees for nodes that only cover padding.
+
+    Like the circuit, each level is as wide as the leaf layer but only its first
+    2**(depth - d) nodes are populated; the rest stay 0, so only the first
+    2**depth leaves feed into the root.
+
+    Returns:
+        list: levels[d][i] is node i at level d, levels[depth][0] is the root
+    """
+    zeros = zero_subtree_hashes(depth)
+    levels = [list(leaf_hashes)]
+    for d in range(depth):
+        below = levels[d]
+        span = 1 << (d + 1)
+        level = [0] * len(below)
+        for i in range(1 << (depth - d - 1)):
+            if i * span >= actual_len:
+                level[i] = zeros[d + 1]
+            else:
+                level[i] = hash_pair(below[2 * i], below[2 * i + 1])
+        levels.append(level)
+    return levels
+
+
+def authentication_path(levels, index):
+    """Sibling hashes and left/right indices from leaf `index` up to the root."""
+    elements = []
+    indices = []
+    for d in range(len(levels) - 1):
+        elements.append(levels[d][index ^ 1])
+        indices.append(index % 2)
+        index //= 2
+    return elements, indices
+
+
+def build_merkle_tree(signals, actual_len, max_signals=MAX_SIGNALS, depth=MERKLE_DEPTH):
+    """
+    Build the signals Merkle tree natively, mirroring the `tree_generator` circuit.
+
+    Args:
+        signals: TradingSignal dicts (padding entries beyond actual_len are ignored)
+        actual_len: Number of real signals; remaining leaves are zero
+        max_signals: Number of leaves in the tree
+        depth: Tree depth
+
+    Returns:
+        dict: root, path_elements, path_indices and leaf_hashes as ints
+    """
+    actual_len = max(0, min(int(actual_len), max_signals))
+    leaf_hashes = [hash_signal(signals[i]) for i in range(actual_len)]
+    leaf_hashes += [0] * (max_signals - actual_len)
+
+    levels = build_tree_levels(leaf_hashes, actual_len, depth)
+
+    path_elements = []
+    path_indices = []
+    for i in range(max_signals):
+        elements, indices = authentication_path(levels, i)
+        path_elements.append(elements)
+        path_indices.append(indices)
+
+    return {
+        "root": levels[depth][0],
+        "path_elements": path_elements,
+        "path_indices": path_indices,
+        "leaf_hashes": leaf_hashes,
+    }
+
+
+def signal_key(signal):
+    """Cheap fingerprint of a signal's field values, used to skip re-hashing."""
+    values = ",".join(str(to_field(signal[name])) for name in SIGNAL_FIELDS)
+    return hashlib.sha256(values.encode()).hexdigest()[:32]
+
+
+class IncrementalMerkleTree:
+    """
+    Signals Merkle tree that keeps its leaf hashes and internal nodes, so
+    changing or appending signals only rehashes the changed leaves and the
+    nodes on their paths to the root.
+
+    The levels have the same shape as build_tree_levels() produces, so roots
+    and authentication paths are identical to a full rebuild (and therefore to
+    the `tree_generator` circuit).
+    """
+
+    def __init__(self, max_signals=MAX_SIGNALS, depth=MERKLE_DEPTH):
+        self.max_signals = max_signals
+        self.depth = depth
+        self.actual_len = 0
+        self.leaf_keys = [None] * max_signals
+        self.levels = build_tree_levels([0] * max_signals, 0, depth)
+
+    @property
+    def root(self):
+        return self.levels[self.depth][0]
+
+    def _width(self, d):
+        """Number of populated nodes at level d."""
+        return self.max_signals if d == 0 else 1 << (self.depth - d)
+
+    def update(self, signals, actual_len):
+        """
+        Bring the tree in line with `signals`.
+
+        Args:
+            signals: TradingSignal dicts (entries beyond actual_len are ignored)
+            actual_len: Number of real signals
+
+        Returns:
+            list: Indices of the leaves that changed
+        """
+        actual_len = max(0, min(int(actual_len), self.max_signals))
+        changed = []
+        for i in range(max(actual_len, self.actual_len)):
+            key = signal_key(signals[i]) if i < actual_len else None
+            if key == self.leaf_keys[i]:
+                continue
+            self.leaf_keys[i] = key
+            self.levels[0][i] = hash_signal(signals[i]) if key is not None else 0
+            changed.append(i)
+
+        self.actual_len = actual_len
+        self._rehash(changed)
+        return changed
+
+    def _rehash(self, changed):
+        # Leaves entering or leaving the padding region are always among the
+        # changed leaves, so rehashing their ancestors covers length changes
+        zeros = zero_subtree_hashes(self.depth)
+        dirty = set(changed)
+        for d in range(self.depth):
+            span = 1 << (d + 1)
+            below = self.levels[d]
+            level = self.levels[d + 1]
+            parents = {i >> 1 for i in dirty if (i >> 1) < self._width(d + 1)}
+            for i in parents:
+                if i * span >= self.actual_len:
+                    level[i] = zeros[d + 1]
+                else:
+                    level[i] = hash_pair(below[2 * i], below[2 * i + 1])
+            dirty = parents
+
+    def path(self, index):
+        return authentication_path(self.levels, index)
+
+    def to_result(self):
+        """The build_merkle_tree() result for the current state."""
+        path_elements = []
+        path_indices = []
+        for i in range(self.max_signals):
+            elements, indices = self.path(i)
+            path_elements.append(elements)
+            path_indices.append(indices)
+        return {
+            "root": self.root,
+            "path_elements": path_elements,
+            "path_indices": path_indices,
+            "leaf_hashes": list(self.levels[0]),
+        }
+
+    def to_dict(self):
+        return {
+            "max_signals": self.max_signals,
+            "depth": self.depth,
+            "actual_len": self.actual_len,
+            "leaf_keys": self.leaf_keys[: self.actual_len],
+            "levels": [
+                [f"{node:x}" for node in self.levels[d][: self._width(d)]]
+                for d in range(self.depth + 1)
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        tree = cls(state["max_signals"], state["depth"])
+        tree.actual_len = state["actual_len"]
+        tree.leaf_keys[: tree.actual_len] = state["leaf_keys"]
+        for d, nodes in enumerate(state["levels"]):
+            tree.levels[d][: len(nodes)] = [int(node, 16) for node in nodes]
+        return tree
@@ -0,0 +1,169 @@
+"""
+Per-stage latency measurement and export.
+
+StageTimer measures proof pipeline stages with a monotonic clock. Finished
+timings can be appended to a JSON-lines file (POP_METRICS_FILE) and/or folded
+into Prometheus histograms in a node-exporter textfile (POP_METRICS_TEXTFILE).
+Both files are updated under a file lock, so concurrent prover processes can
+share them.
+"""
+
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+
+HISTOGRAM_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+METRIC_NAME = "pop_stage_duration_seconds"
+
+
+class StageTimer:
+    """
+    Accumulates wall time per named stage.
+
+    Use `with timer.stage(name):` around a block, or `timer.mark(name)` to
+    charge everything since the previous stage or mark to `name`.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._last = time.monotonic()
+
+    def _add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._last = time.monotonic()
+            self._add(name, self._last - start)
+
+    def mark(self, name):
+        now = time.monotonic()
+        self._add(name, now - self._last)
+        self._last = now
+
+    def skip(self):
+        """Restart the clock for mark() without charging the elapsed time."""
+        self._last = time.monotonic()
+
+    def total(self):
+        return sum(self.stages.values())
+
+
+@contextmanager
+def _locked(path):
+    with open(f"{path}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def append_jsonl(path, stages, labels=None):
+    record = {"timestamp": time.time(), **(labels or {}), "stages": stages}
+    record["total"] = sum(stages.values())
+    line = json.dumps(record) + "\n"
+    with _locked(path):
+        with open(path, "a") as f:
+            f.write(line)
+
+
+def export_event(event, values, labels=None):
+    """Append a record of named counts (e.g. a retention run) to POP_METRICS_FILE."""
+    jsonl_path = os.environ.get("POP_METRICS_FILE")
+    if not jsonl_path:
+        return
+    record = {"timestamp": time.time(), "event": event, **(labels or {}), **values}
+    with _locked(jsonl_path):
+        with open(jsonl_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def _render_histograms(state):
+    lines = [
+        f"# HELP {METRIC_NAME} Time spent in each proof generation stage.",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    for stage in sorted(state):
+        hist = state[stage]
+        cumulative = 0
+        for bound, count in zip(HISTOGRAM_BUCKETS, hist["buckets"]):
+            cumulative += count
+            lines.append(
+                f'{METRIC_NAME}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}'
+            )
+        lines.append(
+            f'{METRIC_NAME}_bucket{{stage="{stage}",le="+Inf"}} {hist["count"]}'
+        )
+        lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {hist["sum"]}')
+        lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {hist["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def update_textfile(path, stages):
+    """
+    Add one observation per stage to the histograms in a Prometheus textfile.
+
+    Bucket counts are kept in a JSON sidecar next to the textfile, which is
+    rewritten atomically on every update.
+    """
+    state_path = f"{path}.state.json"
+    with _locked(path):
+        try:
+            with open(state_path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+
+        for stage, seconds in stages.items():
+            hist = state.setdefault(
+                stage, {"buckets": [0] * len(HISTOGRAM_BUCKETS), "sum": 0.0, "count": 0}
+            )
+            for i, bound in enumerate(HISTOGRAM_BUCKETS):
+                if seconds <= bound:
+                    hist["buckets"][i] += 1
+                    break
+            hist["sum"] += seconds
+            hist["count"] += 1
+
+        for target, content in (
+            (state_path, json.dumps(state)),
+            (path, _render_histograms(state)),
+        ):
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(content)
+            os.replace(tmp_path, target)
+
+
+def export_stages(stages, labels=None):
+    """Export stage timings to the metrics files configured in the environment."""
+    jsonl_path = os.environ.get("POP_METRICS_FILE")
+    if jsonl_path:
+        append_jsonl(jsonl_path, stages, labels)
+
+    textfile_path = os.environ.get("POP_METRICS_TEXTFILE")
+    if textfile_path:
+        update_textfile(textfile_path, stages)
@@ -1,32 +1,12 @@
 import json
 import os
-import subprocess
-import toml
-import re
-from . import requires_dependencies
+from .tree_state import update_signals_tree
 
 
 class Miner:
     def __init__(self, ss58_address, name):
         self.name = name
         self.ss58_address = ss58_address
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-
-        package_tree_dir = os.path.join(current_dir, "tree_generator")
-        dev_tree_dir = os.path.abspath(
-            os.path.join(current_dir, "..", "tree_generator")
-        )
-
-        if os.path.exists(package_tree_dir):
-            self.TREE_GEN_DIR = package_tree_dir
-        elif os.path.exists(dev_tree_dir):
-            self.TREE_GEN_DIR = dev_tree_dir
-        else:
-            raise FileNotFoundError(
-                f"tree_generator directory not found. Tried: {package_tree_dir}, {dev_tree_dir}"
-            )
-
-        self.TREE_GEN_PROVER_TOML = os.path.join(self.TREE_GEN_DIR, "Prover.toml")
         self.MAX_SIGNALS = 512
 
     def prepare_signals_from_data(self, data_json_path):
@@ -40,20 +20,70 @@ class Miner:
         Returns:
             tuple: (padded_signals, actual_len)
         """
+        signals = self.prepare_signal_history(data_json_path)
+        if signals is None:
+            return None, 0
+        if not signals:
+            return [], 0
+        return self.signal_window(signals)
+
+    def signal_window(self, signals):
+        """
+        Pads (or truncates) a signal history to the MAX_SIGNALS the circuits take.
+
+        Returns:
+            tuple: (padded_signals, actual_len)
+        """
+        if len(signals) > self.MAX_SIGNALS:
+            print(
+                f"Warning: {len(signals)} signals exceed the circuit limit, "
+                f"using the first {self.MAX_SIGNALS}"
+            )
+        signals = signals[: self.MAX_SIGNALS]
+        actual_len = len(signals)
+
+        padded_signals = signals + [
+            {
+                "trade_pair": "0",
+                "order_type": "0",
+                "leverage": "0",
+                "price": "0",
+                "processed_ms": "0",
+                "order_uuid": "0x0",
+                "bid": "0",
+                "ask": "0",
+            }
+        ] * (self.MAX_SIGNALS - actual_len)
+
+        print(f"Successfully prepared {actual_len} signals.")
+        return padded_signals, actual_len
+
+    def prepare_signal_history(self, data_json_path):
+        """
+        Reads the data.json file for a hotkey and transforms every open/close
+        order pair into TradingSignal dicts, oldest first and without the
+        circuit's MAX_SIGNALS limit.
+
+        Args:
+            data_json_path (str): Path to the data.json file
+
+        Returns:
+            list: TradingSignal dicts, or None if the file could not be read
+        """
         print(f"Preparing signals from {data_json_path}...")
         try:
             with open(data_json_path, "r") as f:
                 positions = json.load(f)
         except FileNotFoundError:
             print(f"ERROR: Data file not found at {data_json_path}")
-            return None, 0
+            return None
         except json.JSONDecodeError:
             print(f"ERROR: Could not decode JSON from {data_json_path}")
-            return None, 0
+            return None
 
         if not positions:
             print(f"Warning: No positions found in {data_json_path}")
-            return [], 0
+            return []
 
         orders = []
 
@@ -62,7 +92,7 @@ class Miner:
                 position_list = positions["positions"]
             else:
                 print(f"Warning: Unexpected data structure for {data_json_path}")
-                return [], 0
+                return []
         else:
             position_list = positions
 
@@ -75,7 +105,7 @@ class Miner:
         signals = []
 
         for i in range(0, len(orders), 2):
-            if (i + 1) >= len(orders) or len(signals) >= self.MAX_SIGNALS:
+            if (i + 1) >= len(orders):
                 break
 
             open_order = orders[i]
@@ -113,30 +143,15 @@ class Miner:
                 }
             )
 
-        actual_len = len(signals)
-        if actual_len == 0:
+        if not signals:
             print(f"Warning: No valid order pairs found in {data_json_path}")
-            return [], 0
-
-        padded_signals = signals + [
-            {
-                "trade_pair": "0",
-                "order_type": "0",
-                "leverage": "0",
-                "price": "0",
-                "processed_ms": "0",
-                "order_uuid": "0x0",
-                "bid": "0",
-                "ask": "0",
-            }
-        ] * (self.MAX_SIGNALS - actual_len)
-
-        print(f"Successfully prepared {actual_len} signals.")
-        return padded_signals, actual_len
+        return signals
 
     def run_merkle_generator(self, signals, actual_len):
         """
-        Runs the merkle_generator circuit and parses the witness file to get the output.
+        Builds the signals Merkle tree in-process, updating the hotkey's stored
+        tree so only changed signals are rehashed. The result is identical to
+        the tree_generator circuit output.
 
         Args:
             signals (list): List of trading signals
@@ -145,117 +160,23 @@ class Miner:
         Returns:
             tuple: (merkle_root, path_elements, path_indices) or None if failed
         """
-        print("Running Merkle Generator circuit...")
-
-        merkle_input = {"signals": signals, "actual_len": actual_len}
-
-        witness_name = "merkle_witness"
-        witness_path = os.path.join(self.TREE_GEN_DIR, "target", f"{witness_name}.gz")
-
-        with open(self.TREE_GEN_PROVER_TOML, "w") as f:
-            toml.dump(merkle_input, f)
-
-        nargo_cmd = "nargo"
-
-        nargo_paths = [
-            os.path.expanduser("~/.nargo/bin/nargo"),
-            os.path.expanduser("~/.noir/bin/nargo"),
-            os.path.expanduser("~/.cargo/bin/nargo"),
-            os.path.expanduser("~/.noirup/bin/nargo"),
-        ]
-
-        for path in nargo_paths:
-            if os.path.isfile(path) and os.access(path, os.X_OK):
-                nargo_cmd = path
-                print(f"Found nargo at: {nargo_cmd}")
-                break
-
-        print("Executing nargo... (This might take a moment)")
-        result = subprocess.run(
-            [nargo_cmd, "execute", witness_name, "--silence-warnings"],
-            cwd=self.TREE_GEN_DIR,
-            capture_output=True,
-            text=True,
-        )
-
-        if result.returncode != 0:
-            print("Merkle generator execution failed!")
-            print(result.stderr)
-            return None
-
-        print(
-            f"Merkle generator executed successfully. Witness saved to {witness_path}"
-        )
+        print("Building signals Merkle tree...")
 
         try:
-            output_str = result.stdout
-
-            def parse_array_from_output(array_name, s):
-                hex_array_pattern = re.compile(
-                    rf"{array_name}: \[\[(0x[0-9a-fA-F, ]+)\]\]", re.DOTALL
-                )
-                hex_match = hex_array_pattern.search(s)
-
-                if hex_match:
-                    hex_values = re.findall(r"0x([0-9a-fA-F]+)", hex_match.group(1))
-                    values = [str(int(hex_val, 16)) for hex_val in hex_values]
-                    return values
-
-                pattern = re.compile(rf'"{array_name}": Vec\((.*?)\), "', re.DOTALL)
-                match = pattern.search(s)
-                if not match:
-                    raise ValueError(f"Could not find {array_name} in output")
-
-                array_content = match.group(1)
-
-                field_strs = re.findall(r"Field\(([^)]+)\)", array_content)
-
-                PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495617
-                values = []
-                for field_str in field_strs:
-                    val = int(field_str)
-                    if val < 0:
-                        val = PRIME + val
-                    values.append(str(val))
-                return values
-
-            root_match = re.search(r"root: (0x[0-9a-fA-F]+)", output_str)
-            if root_match:
-                merkle_root = str(int(root_match.group(1), 16))
-            else:
-                root_match = re.search(r'"root": Field\(([^)]+)\)', output_str)
-                if not root_match:
-                    raise ValueError("Could not parse Merkle root from output.")
-
-                PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495617
-                root_val = int(root_match.group(1))
-                if root_val < 0:
-                    root_val = PRIME + root_val
-                merkle_root = str(root_val)
-
-            path_elements_flat = parse_array_from_output("path_elements", output_str)
-            path_indices_flat = parse_array_from_output("path_indices", output_str)
-
-            merkle_depth = 8
-
-            path_elements = [
-                path_elements_flat[i : i + merkle_depth]
-                for i in range(0, len(path_elements_flat), merkle_depth)
-            ]
-            path_indices = [
-                path_indices_flat[i : i + merkle_depth]
-                for i in range(0, len(path_indices_flat), merkle_depth)
-            ]
-
-            print("Successfully parsed Merkle tree data from circuit output.")
-            return merkle_root, path_elements, path_indices
-
+            tree = update_signals_tree(
+                self.ss58_address, signals, actual_len, kind="miner"
+            )
         except Exception as e:
-            print(f"Failed to parse Merkle generator output: {e}")
-            print("Raw output:", result.stdout)
+            print(f"Failed to build Merkle tree: {e}")
             return None
 
-    @requires_dependencies
+        merkle_root = str(tree["root"])
+        path_elements = [[str(x) for x in p] for p in tree["path_elements"]]
+        path_indices = [[str(x) for x in p] for p in tree["path_indices"]]
+
+        print("Successfully built Merkle tree.")
+        return merkle_root, path_elements, path_indices
+
     def generate_tree(self, input_json_path: str, output_path: str = None):
         """
         Generates a Merkle tree from a child hotkey data.json file and saves it to the specified path.
@@ -269,10 +190,11 @@ class Miner:
             dict: Tree data containing merkle_root, path_elements, and path_indices, or None if failed
         """
 
-        signals, actual_len = self.prepare_signals_from_data(input_json_path)
-        if not signals or actual_len == 0:
+        history = self.prepare_signal_history(input_json_path)
+        if not history:
             print("Could not prepare signals. Exiting.")
             return None
+        signals, actual_len = self.signal_window(history)
 
         merkle_data = self.run_merkle_generator(signals, actual_len)
         if not merkle_data:
@@ -307,15 +229,6 @@ class Miner:
             print(f"Error saving tree data: {e}")
             return None
 
-        if os.path.exists(self.TREE_GEN_PROVER_TOML):
-            os.remove(self.TREE_GEN_PROVER_TOML)
-
-        merkle_witness_path = os.path.join(
-            self.TREE_GEN_DIR, "target", "merkle_witness.gz"
-        )
-        if os.path.exists(merkle_witness_path):
-            os.remove(merkle_witness_path)
-
         return tree_data
 
     def visualize_tree(self, tree_data):
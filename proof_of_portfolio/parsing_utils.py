@@ -1,8 +1,32 @@
 """
 Shared parsing utilities for nargo output across all demos.
+
+Deprecated: circuit outputs are decoded from the witness and the program ABI
+by abi.read_circuit_output, which does not depend on nargo's print format.
+These stdout parsers are kept for existing callers and will be removed in a
+future release; field_to_signed_int is re-exported from abi.
 """
 
 import re
+import warnings
+
+from .abi import field_to_signed_int
+
+warnings.warn(
+    "proof_of_portfolio.parsing_utils is deprecated, use "
+    "proof_of_portfolio.abi.read_circuit_output instead",
+    DeprecationWarning,
+    stacklevel=2,
+)
+
+__all__ = [
+    "field_to_signed_int",
+    "parse_circuit_output",
+    "parse_demo_output",
+    "parse_nargo_struct_output",
+    "parse_nested_arrays",
+    "parse_single_field_output",
+]
 
 
 def parse_single_field_output(output):
@@ -34,23 +58,6 @@ def parse_single_field_output(output):
     return None
 
 
-def field_to_signed_int(field_str):
-    """
-    Convert a field string to a signed integer, handling two's complement.
-    """
-    if isinstance(field_str, str) and field_str.startswith("0x"):
-        val = int(field_str, 16)
-    else:
-        val = int(field_str)
-
-    # Noir's i64 as u64 casting uses standard two's complement
-    # Convert from u64 back to i64 using two's complement
-    if val >= 2**63:  # If the high bit is set, it's negative
-        return val - 2**64  # Convert from unsigned to signed
-    else:
-        return val  # Positive values unchanged
-
-
 def parse_demo_output(output, scale=10_000_000, no_confidence_value=-100):
     """
     Standardized parsing for demo output.
@@ -169,6 +176,14 @@ def parse_nargo_struct_output(output):
     return values
 
 
+def parse_circuit_output(output):
+    """
+    Parses the output of the main circuit; formerly
+    proof_generator.parse_circuit_output.
+    """
+    return parse_nargo_struct_output(output)
+
+
 def parse_nested_arrays(section):
     """Helper function to parse nested array structures like [[...], [...]]"""
     if not section.strip().startswith("["):
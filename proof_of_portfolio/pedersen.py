@@ -0,0 +1,181 @@
+"""
+Native Pedersen hash over the Grumpkin curve.
+
+Matches Noir's `std::hash::pedersen_hash` (barretenberg's pedersen_hash with the
+default domain separator), so leaves and nodes computed here are identical to
+the ones the circuits compute in-constraint.
+"""
+
+from functools import lru_cache
+
+# BN254 scalar field, which is also the base field of the Grumpkin curve
+PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+# Grumpkin: y^2 = x^3 - 17
+CURVE_B = PRIME - 17
+
+# derive_generators("DEFAULT_DOMAIN_SEPARATOR", 8, 0)
+DEFAULT_GENERATORS = [
+    (
+        0x083E7911D835097629F0067531FC15CAFD79A89BEECB39903F69572C636F4A5A,
+        0x1A7F5EFAAD7F315C25A918F30CC8D7333FCCAB7AD7C90F14DE81BCC528F9935D,
+    ),
+    (
+        0x054AA86A73CB8A34525E5BBED6E43BA1198E860F5F3950268F71DF4591BDE402,
+        0x209DCFBF2CFB57F9F6046F44D71AC6FAF87254AFC7407C04EB621A6287CAC126,
+    ),
+    (
+        0x1C44F2A5207C81C28A8321A5815CE8B1311024BBED131819BBDAF5A2ADA84748,
+        0x03AAEE36E6422A1D0191632AC6599AE9EBA5AC2C17A8C920AA3CAF8B89C5F8A8,
+    ),
+    (
+        0x26D8B1160C6821A30C65F6CB47124AFE01C29F4338F44D4A12C9FCCF22FB6FB2,
+        0x05C70C3B9C0D25A4C100E3A27BF3CC375F8AF8CDD9498EC4089A823D7464CAFF,
+    ),
+    (
+        0x20ED9C6A1D27271C4498BFCE0578D59DB1ADBEAA8734F7FACC097B9B994FCF6E,
+        0x29CD7D370938B358C62C4A00F73A0D10ABA7E5AAA04704A0713F891EBEB92371,
+    ),
+    (
+        0x0224A8ABC6C8B8D50373D64CD2A1AB1567BF372B3B1F7B861D7F01257052D383,
+        0x2358629B90EAFB299D6650A311E79914B0215EB0A790810B26DA5A826726D711,
+    ),
+    (
+        0x0F106F6D46BC904A5290542490B2F238775FF3C445B2F8F704C466655F460A2A,
+        0x29AB84D472F1D33F42FE09C47B8F7710F01920D6155250126731E486877BCF27,
+    ),
+    (
+        0x0298F2E42249F0519C8A8ABD91567EBE016E480F219B8C19461D6A595CC33696,
+        0x035BEC4B8520A4ECE27BD5AAFABEE3DFE1390D7439C419A8C55ACEB207AAC83B,
+    ),
+]
+
+# derive_generators("pedersen_hash_length", 1, 0)
+LENGTH_GENERATOR = (
+    0x2DF8B940E5890E4E1377E05373FAE69A1D754F6935E6A780B666947431F2CDCD,
+    0x2ECD88D15967BC53B885912E0D16866154ACB6AAC2D3F85E27CA7EEFB2C19083,
+)
+
+WINDOW_BITS = 4
+NUM_WINDOWS = 64  # 64 * 4 bits covers any field element
+
+
+def _affine_add(p1, p2):
+    if p1 is None:
+        return p2
+    if p2 is None:
+        return p1
+    x1, y1 = p1
+    x2, y2 = p2
+    if x1 == x2:
+        if (y1 + y2) % PRIME == 0:
+            return None
+        slope = 3 * x1 * x1 * pow(2 * y1, -1, PRIME) % PRIME
+    else:
+        slope = (y2 - y1) * pow(x2 - x1, -1, PRIME) % PRIME
+    x3 = (slope * slope - x1 - x2) % PRIME
+    return x3, (slope * (x1 - x3) - y1) % PRIME
+
+
+def _jacobian_double(x1, y1, z1):
+    if y1 == 0:
+        return None
+    a = x1 * x1 % PRIME
+    b = y1 * y1 % PRIME
+    c = b * b % PRIME
+    d = 2 * ((x1 + b) * (x1 + b) - a - c) % PRIME
+    e = 3 * a
+    x3 = (e * e - 2 * d) % PRIME
+    y3 = (e * (d - x3) - 8 * c) % PRIME
+    z3 = 2 * y1 * z1 % PRIME
+    return x3, y3, z3
+
+
+def _jacobian_add_affine(acc, point):
+    """Mixed addition of an affine point into a Jacobian accumulator."""
+    if acc is None:
+        return point[0], point[1], 1
+    x1, y1, z1 = acc
+    x2, y2 = point
+    z1z1 = z1 * z1 % PRIME
+    u2 = x2 * z1z1 % PRIME
+    s2 = y2 * z1 * z1z1 % PRIME
+    h = (u2 - x1) % PRIME
+    r = 2 * (s2 - y1) % PRIME
+    if h == 0:
+        if r == 0:
+            return _jacobian_double(x1, y1, z1)
+        return None
+    hh = h * h % PRIME
+    i = 4 * hh % PRIME
+    j = h * i % PRIME
+    v = x1 * i % PRIME
+    x3 = (r * r - j - 2 * v) % PRIME
+    y3 = (r * (v - x3) - 2 * y1 * j) % PRIME
+    z3 = ((z1 + h) * (z1 + h) - z1z1 - hh) % PRIME
+    return x3, y3, z3
+
+
+def _jacobian_x(acc):
+    if acc is None:
+        return 0
+    x, _, z = acc
+    z_inv = pow(z, -1, PRIME)
+    return x * z_inv * z_inv % PRIME
+
+
+@lru_cache(maxsize=None)
+def _fixed_base_table(point):
+    """
+    Window table for fixed-base multiplication: table[w][k] = k * 2^(4w) * point.
+    """
+    table = []
+    base = point
+    for _ in range(NUM_WINDOWS):
+        row = [None]
+        for _ in range((1 << WINDOW_BITS) - 1):
+            row.append(_affine_add(row[-1], base))
+        table.append(row)
+        base = _affine_add(row[-1], base)
+    return table
+
+
+def _accumulate(acc, point, scalar):
+    table = _fixed_base_table(point)
+    mask = (1 << WINDOW_BITS) - 1
+    window = 0
+    while scalar:
+        digit = scalar & mask
+        if digit:
+            acc = _jacobian_add_affine(acc, table[window][digit])
+        scalar >>= WINDOW_BITS
+        window += 1
+    return acc
+
+
+def to_field(value):
+    """Convert an int, decimal string or 0x-prefixed hex string to a field element."""
+    if isinstance(value, str):
+        value = int(value, 16) if value.startswith("0x") else int(value)
+    return int(value) % PRIME
+
+
+def pedersen_hash(inputs):
+    """
+    Pedersen hash of a list of field elements, identical to Noir's
+    `std::hash::pedersen_hash`.
+
+    Args:
+        inputs: Sequence of ints or field strings (at most 8 elements)
+
+    Returns:
+        int: The hash as a field element
+    """
+    if len(inputs) > len(DEFAULT_GENERATORS):
+        raise ValueError(
+            f"pedersen_hash supports at most {len(DEFAULT_GENERATORS)} inputs, got {len(inputs)}"
+        )
+
+    acc = _accumulate(None, LENGTH_GENERATOR, len(inputs))
+    for generator, value in zip(DEFAULT_GENERATORS, inputs):
+        acc = _accumulate(acc, generator, to_field(value))
+    return _jacobian_x(acc)
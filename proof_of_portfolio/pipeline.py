@@ -0,0 +1,143 @@
+"""
+Two-stage witness/prove pipeline.
+
+Witness generation (input preparation plus `nargo execute`, mostly one core)
+and `bb prove` (multi-threaded) run in separate stages connected by a bounded
+buffer, so witnesses for the next miners are generated while bb proves the
+current one. With enough witness workers the total time approaches the time bb
+alone needs for the whole batch.
+"""
+
+import queue
+import threading
+import time
+
+import bittensor as bt
+
+from .proof_generator import finish_proof, generate_witness
+
+_STOP = object()
+
+
+class ProofPipeline:
+    """
+    Args:
+        witness_workers: Concurrent witness generation jobs
+        prove_workers: Concurrent bb prove jobs
+        buffer_size: Maximum solved witnesses waiting for a prover; witness
+            workers block once it is full
+        bb_threads: Thread budget per bb prove (defaults to all cores)
+    """
+
+    def __init__(
+        self, witness_workers=1, prove_workers=1, buffer_size=2, bb_threads=None
+    ):
+        self.witness_workers = max(1, witness_workers)
+        self.prove_workers = max(1, prove_workers)
+        self.buffer_size = max(1, buffer_size)
+        self.bb_threads = bb_threads
+        self.stats = {}
+
+    def run(self, jobs):
+        """
+        Run generate_witness/finish_proof for every job.
+
+        Args:
+            jobs: Iterable of (key, generate_witness keyword arguments)
+
+        Yields:
+            (key, results) in completion order; results is the generate_proof
+            dictionary, or the exception raised for that job
+        """
+        jobs = list(jobs)
+        pending = iter(jobs)
+        pending_lock = threading.Lock()
+        solved = queue.Queue(maxsize=self.buffer_size)
+        finished = queue.Queue()
+        stop = threading.Event()
+        busy = {"witness": 0.0, "prove": 0.0}
+        busy_lock = threading.Lock()
+
+        def add_busy(stage, seconds):
+            with busy_lock:
+                busy[stage] += seconds
+
+        def witness_stage():
+            while not stop.is_set():
+                with pending_lock:
+                    item = next(pending, None)
+                if item is None:
+                    return
+                key, kwargs = item
+                start = time.monotonic()
+                try:
+                    job = generate_witness(**kwargs)
+                except Exception as e:
+                    finished.put((key, e))
+                    continue
+                finally:
+                    add_busy("witness", time.monotonic() - start)
+                solved.put((key, job))
+
+        def prove_stage():
+            while True:
+                item = solved.get()
+                if item is _STOP:
+                    return
+                key, job = item
+                if stop.is_set():
+                    job["workspace"].cleanup()
+                    continue
+                start = time.monotonic()
+                try:
+                    finished.put((key, finish_proof(job, bb_threads=self.bb_threads)))
+                except Exception as e:
+                    finished.put((key, e))
+                finally:
+                    add_busy("prove", time.monotonic() - start)
+
+        witness_threads = [
+            threading.Thread(target=witness_stage, name=f"pop-witness-{i}", daemon=True)
+            for i in range(self.witness_workers)
+        ]
+        prove_threads = [
+            threading.Thread(target=prove_stage, name=f"pop-prove-{i}", daemon=True)
+            for i in range(self.prove_workers)
+        ]
+
+        def close_solved():
+            for thread in witness_threads:
+                thread.join()
+            for _ in prove_threads:
+                solved.put(_STOP)
+
+        start = time.monotonic()
+        for thread in witness_threads + prove_threads:
+            thread.start()
+        closer = threading.Thread(target=close_solved, daemon=True)
+        closer.start()
+
+        try:
+            for _ in range(len(jobs)):
+                yield finished.get()
+        finally:
+            stop.set()
+            closer.join()
+            for thread in prove_threads:
+                thread.join()
+
+            wall = time.monotonic() - start
+            self.stats = {
+                "jobs": len(jobs),
+                "wall_seconds": wall,
+                "witness_busy_seconds": busy["witness"],
+                "prove_busy_seconds": busy["prove"],
+                # 1.0 means bb was never waiting on a witness
+                "prove_utilization": (
+                    busy["prove"] / (wall * self.prove_workers) if wall > 0 else 0.0
+                ),
+            }
+            bt.logging.info(
+                f"Pipeline finished {len(jobs)} jobs in {wall:.2f}s "
+                f"(witness busy {busy['witness']:.2f}s, prove busy {busy['prove']:.2f}s)"
+            )
@@ -0,0 +1,512 @@
+"""
+Witness-free evaluation of the main circuit.
+
+Computes the 8 outputs of circuits/src/main.nr from the same inputs that go
+into its Prover.toml, in Python and with the circuit's fixed-point semantics:
+i64/u64 arithmetic that fails on overflow, division truncating toward zero,
+floored integer square roots and the same Pedersen-hashed returns tree. The
+outputs are bit-identical to `nargo execute`, in milliseconds instead of a
+witness generation.
+
+Inputs the circuit would reject (an overflow, a division by zero or a failing
+assert) raise CircuitAssertionError instead of producing numbers the circuit
+could never prove.
+"""
+
+from functools import lru_cache
+
+from .pedersen import pedersen_hash
+
+SCALE = 10**8
+MAX_RETURNS = 256
+RETURNS_TREE_LEVELS = 8
+I64_MIN = -(1 << 63)
+I64_MAX = (1 << 63) - 1
+U64 = 1 << 64
+
+SHARPE_STDDEV_MINIMUM = SCALE // 100
+SORTINO_DOWNSIDE_MINIMUM = SCALE // 100
+OMEGA_SCALE_FACTOR = 1000000
+
+
+class CircuitAssertionError(ValueError):
+    """Raised for inputs the main circuit fails to execute on."""
+
+
+def _i64(value):
+    if value < I64_MIN or value > I64_MAX:
+        raise CircuitAssertionError(f"i64 overflow ({value})")
+    return value
+
+
+def _u64(value):
+    if value < 0 or value >= U64:
+        raise CircuitAssertionError(f"u64 overflow ({value})")
+    return value
+
+
+def _div(a, b):
+    """Noir integer division: truncates toward zero, fails on zero."""
+    if b == 0:
+        raise CircuitAssertionError("division by zero")
+    quotient = abs(a) // abs(b)
+    return _i64(quotient if (a < 0) == (b < 0) else -quotient)
+
+
+def as_u64(value):
+    """`value as u64` of an i64 (two's complement)."""
+    return value % U64
+
+
+def as_i64(value):
+    """`value as i64` of a u64."""
+    value %= U64
+    return value - U64 if value > I64_MAX else value
+
+
+def _compute_sqrt(n):
+    """The unconstrained square root oracle of components::utils::sqrt."""
+    if n <= 1:
+        return n
+    if n <= 3:
+        return 1
+    if n <= 8:
+        return 2
+    if n <= 15:
+        return 3
+    bit = 1
+    for _ in range(32):
+        bit <<= 1
+        if bit > n:
+            break
+    x = max(bit >> 1, 1)
+    for _ in range(20):
+        following = (x + n // x) // 2
+        if following >= x:
+            break
+        x = following
+    return x
+
+
+def _sqrt(n):
+    """components::utils::sqrt::sqrt, including the asserts on the oracle."""
+    root = _compute_sqrt(n)
+    if not (_u64(root * root) <= n < _u64((root + 1) * (root + 1))):
+        raise CircuitAssertionError(f"sqrt({n}) did not converge")
+    return root
+
+
+def average(values, actual_len, weights, use_weighting, sum_of_weights):
+    result = 0
+    if actual_len > 0:
+        if use_weighting:
+            weighted_sum = 0
+            for i in range(actual_len):
+                weighted_sum = _i64(weighted_sum + _i64(values[i] * weights[i]))
+            if sum_of_weights != 0:
+                result = _div(weighted_sum, sum_of_weights)
+        else:
+            total = 0
+            for i in range(actual_len):
+                total = _i64(total + values[i])
+            result = _div(total, actual_len)
+    return result
+
+
+def variance(values, actual_len, ddof, weights, use_weighting, sum_of_weights):
+    proceed = actual_len >= 2 if use_weighting else actual_len > ddof
+    if not proceed:
+        return 0
+
+    mean = average(values, actual_len, weights, use_weighting, sum_of_weights)
+    sum_sq_diff = 0
+    for i in range(actual_len):
+        diff = _i64(values[i] - mean)
+        scaled_sq_diff = _div(_i64(diff * diff), SCALE)
+        if use_weighting:
+            scaled_sq_diff = _i64(scaled_sq_diff * weights[i])
+        sum_sq_diff = _i64(sum_sq_diff + scaled_sq_diff)
+
+    if use_weighting:
+        return _div(sum_sq_diff, sum_of_weights) if sum_of_weights != 0 else 0
+    return _div(sum_sq_diff, actual_len)
+
+
+def downside_variance(values, actual_len, ddof, weights, use_weighting, daily_rf):
+    downside_returns = []
+    downside_weights = []
+    downside_sum_weights = 0
+    for i in range(actual_len):
+        if values[i] < daily_rf:
+            weight = weights[i] if use_weighting else SCALE // 1000
+            downside_returns.append(values[i])
+            downside_weights.append(weight)
+            downside_sum_weights = _i64(downside_sum_weights + weight)
+
+    downside_count = len(downside_returns)
+    if downside_count == 0:
+        return SCALE * SCALE
+
+    downside_avg = average(
+        downside_returns,
+        downside_count,
+        downside_weights,
+        use_weighting,
+        downside_sum_weights,
+    )
+    proceed = downside_count >= 2 if use_weighting else downside_count > ddof
+    if not proceed:
+        return SCALE
+
+    sum_sq_diff = 0
+    if use_weighting:
+        sum_weights_sq = 0
+        for value, weight in zip(downside_returns, downside_weights):
+            diff = _div(_i64(value - downside_avg), 100)
+            weighted_sq_diff = _div(_i64(_i64(diff * diff) * weight), SCALE // 10000)
+            sum_sq_diff = _i64(sum_sq_diff + weighted_sq_diff)
+            weight_sq = _div(_i64(_div(weight, 100) * weight), 100)
+            sum_weights_sq = _i64(sum_weights_sq + _i64(weight_sq * (SCALE // 10000)))
+
+        denominator = _i64(
+            downside_sum_weights - _div(sum_weights_sq, downside_sum_weights)
+        )
+        return _div(sum_sq_diff, denominator) if denominator > 0 else SCALE
+
+    for value in downside_returns:
+        diff = _div(_i64(value - downside_avg), 100)
+        sum_sq_diff = _i64(sum_sq_diff + _div(_i64(diff * diff), SCALE // 10000))
+    return _div(sum_sq_diff, downside_count - ddof)
+
+
+def ann_excess_return(
+    values, actual_len, annual_risk_free, weights, use_weighting, days_in_year
+):
+    if use_weighting:
+        sum_of_weights = 0
+        for i in range(actual_len):
+            sum_of_weights = _i64(sum_of_weights + weights[i])
+    else:
+        sum_of_weights = actual_len
+    avg = average(values, actual_len, weights, use_weighting, sum_of_weights)
+    return _i64(_i64(avg * days_in_year) - annual_risk_free)
+
+
+def _annualized_volatility(variance_val):
+    scaled_volatility = _sqrt(_u64(as_u64(variance_val) * 365))
+    return as_i64(_u64(scaled_volatility * SCALE) // _sqrt(SCALE))
+
+
+def _ratio(
+    actual_len,
+    bypass_confidence,
+    variance_val,
+    ann_excess_return_val,
+    noconfidence_value,
+    minimum_n,
+    minimum_volatility,
+):
+    """Shared body of core::sharpe::sharpe and core::sortino::sortino."""
+    if not bypass_confidence and actual_len < minimum_n:
+        return noconfidence_value
+    volatility = SCALE if actual_len < 2 else _annualized_volatility(variance_val)
+    effective_volatility = max(volatility, minimum_volatility)
+    return _div(_i64(ann_excess_return_val * SCALE), effective_volatility)
+
+
+def sharpe(
+    actual_len,
+    bypass_confidence,
+    variance_val,
+    ann_excess_return_val,
+    noconfidence_value,
+    minimum_n,
+):
+    return _ratio(
+        actual_len,
+        bypass_confidence,
+        variance_val,
+        ann_excess_return_val,
+        noconfidence_value,
+        minimum_n,
+        SHARPE_STDDEV_MINIMUM,
+    )
+
+
+def sortino(
+    actual_len,
+    bypass_confidence,
+    downside_variance_val,
+    ann_excess_return_val,
+    noconfidence_value,
+    minimum_n,
+):
+    return _ratio(
+        actual_len,
+        bypass_confidence,
+        downside_variance_val,
+        ann_excess_return_val,
+        noconfidence_value,
+        minimum_n,
+        SORTINO_DOWNSIDE_MINIMUM,
+    )
+
+
+def exp_scaled(x_scaled):
+    abs_x = _i64(-x_scaled) if x_scaled < 0 else x_scaled
+    if abs_x > SCALE * 5:
+        return SCALE * 148 if x_scaled > 0 else 0
+
+    result = SCALE
+    x_power = x_scaled
+    factorial = 1
+    for i in range(1, 15):
+        factorial = _i64(factorial * i)
+        result = _i64(result + _div(x_power, factorial))
+        x_power = _div(_i64(x_power * x_scaled), SCALE)
+    return result
+
+
+def daily_max_drawdown(log_returns, actual_len):
+    max_drawdown = 0
+    cumulative_sum = 0
+    running_max = 0
+    for i in range(actual_len):
+        cumulative_sum = _i64(cumulative_sum + log_returns[i])
+        running_max = max(running_max, cumulative_sum)
+        delta_scaled = _i64(cumulative_sum - running_max)
+        if delta_scaled < 0:
+            drawdown = _i64(SCALE - exp_scaled(delta_scaled))
+            max_drawdown = max(max_drawdown, drawdown)
+    return max_drawdown
+
+
+def calmar(avg_daily_return, days_in_year, checkpoint_count, checkpoint_mdds):
+    base_return_precise = _i64(_i64(avg_daily_return * days_in_year) * 100)
+
+    risk_norm_factor = 0
+    if checkpoint_count > 0:
+        min_mdd = min([SCALE, *checkpoint_mdds[:checkpoint_count]])
+        drawdown_pct = _div(_i64(_i64(SCALE - min_mdd) * 100), SCALE)
+        if 0 < drawdown_pct <= 10:
+            risk_norm_factor = _div(SCALE, drawdown_pct)
+
+    return _div(_i64(base_return_precise * risk_norm_factor), SCALE)
+
+
+def omega(
+    log_returns,
+    actual_len,
+    weights,
+    use_weighting,
+    bypass_confidence,
+    omega_loss_min,
+    noconfidence_value,
+    minimum_n,
+):
+    if not bypass_confidence and actual_len < minimum_n:
+        return noconfidence_value
+
+    if not use_weighting:
+        positive_sum = 0
+        negative_sum = 0
+        for i in range(actual_len):
+            if log_returns[i] > 0:
+                positive_sum = _i64(positive_sum + log_returns[i])
+            else:
+                negative_sum = _i64(negative_sum + log_returns[i])
+        effective_denominator = max(_i64(-negative_sum), omega_loss_min)
+        return _div(_i64(positive_sum * SCALE), effective_denominator)
+
+    product_sum_positive = 0
+    product_sum_negative = 0
+    sum_weights_positive = 0
+    sum_weights_negative = 0
+    for i in range(actual_len):
+        product = _i64(log_returns[i] * weights[i])
+        if log_returns[i] > 0:
+            product_sum_positive = _i64(product_sum_positive + product)
+            sum_weights_positive = _i64(sum_weights_positive + weights[i])
+        else:
+            product_sum_negative = _i64(product_sum_negative + product)
+            sum_weights_negative = _i64(sum_weights_negative + weights[i])
+
+    sum_weights_positive = max(sum_weights_positive, omega_loss_min)
+    sum_weights_negative = max(sum_weights_negative, omega_loss_min)
+
+    positive_cross = _i64(
+        _div(product_sum_positive, OMEGA_SCALE_FACTOR) * sum_weights_negative
+    )
+    negative_cross = _i64(
+        _div(product_sum_negative, OMEGA_SCALE_FACTOR) * sum_weights_positive
+    )
+    abs_negative = negative_cross if negative_cross >= 0 else _i64(-negative_cross)
+    effective_denominator = max(abs_negative, _div(omega_loss_min, OMEGA_SCALE_FACTOR))
+
+    adjusted_ratio_scale = SCALE * OMEGA_SCALE_FACTOR
+    if effective_denominator >= adjusted_ratio_scale:
+        return _div(positive_cross, _div(effective_denominator, adjusted_ratio_scale))
+    if effective_denominator != 0:
+        max_omega_result = SCALE * 1000
+        tentative_result = _div(positive_cross, effective_denominator)
+        if tentative_result <= _div(max_omega_result, adjusted_ratio_scale):
+            return _i64(tentative_result * adjusted_ratio_scale)
+        return max_omega_result
+    return 0
+
+
+def statistical_confidence(
+    actual_len,
+    bypass_confidence,
+    avg_daily_return,
+    variance_val,
+    noconfidence_value,
+    minimum_n,
+):
+    if not bypass_confidence and actual_len < minimum_n and actual_len < 2:
+        return noconfidence_value
+    if variance_val <= 0:
+        return noconfidence_value
+
+    std_dev = as_i64(_sqrt(variance_val))
+    standard_error = _div(std_dev, _sqrt(actual_len))
+    if standard_error == 0:
+        return SCALE
+    return _div(_i64(avg_daily_return * SCALE), standard_error)
+
+
+@lru_cache(maxsize=65536)
+def hash_return(log_return):
+    """core::merkle::hash_return: negative returns are offset by 2**63."""
+    unsigned_value = log_return + (1 << 63) if log_return < 0 else log_return
+    return pedersen_hash([unsigned_value])
+
+
+def returns_merkle_root(log_returns, num_leaves):
+    """core::merkle::build_merkle_root over the first num_leaves returns."""
+    return _returns_merkle_root(tuple(log_returns[:num_leaves]))
+
+
+@lru_cache(maxsize=256)
+def _returns_merkle_root(leaves):
+    # Pedersen hashing dominates a preview, so repeated previews of the same
+    # returns reuse the root
+    if not leaves:
+        return 0
+    nodes = [hash_return(value) for value in leaves]
+    count = len(leaves)
+    for _ in range(RETURNS_TREE_LEVELS):
+        nodes = [
+            pedersen_hash(
+                [nodes[2 * i], nodes[2 * i + 1] if 2 * i + 1 < count else nodes[2 * i]]
+            )
+            for i in range((count + 1) // 2)
+        ]
+        count = count if count <= 1 else (count + 1) // 2
+    return nodes[0]
+
+
+def circuit_outputs(inputs):
+    """
+    Evaluate the main circuit on its Prover.toml inputs.
+
+    Args:
+        inputs: The input dictionary generate_witness writes to Prover.toml
+
+    Returns:
+        list: The 8 returned Fields as ints, exactly as `nargo execute` returns
+            them (i64 results as their u64 two's complement)
+
+    Raises:
+        CircuitAssertionError: If the circuit would fail on these inputs
+    """
+    n_returns = int(inputs["n_returns"])
+    n_pnl = int(inputs["n_pnl"])
+    checkpoint_count = int(inputs["checkpoint_count"])
+    use_weighting = bool(int(inputs["use_weighting"]))
+    bypass_confidence = bool(int(inputs["bypass_confidence"]))
+    minimum_n = int(inputs["stat_conf_min_n"])
+    days_in_year = int(inputs["days_in_year"])
+    log_returns = [int(value) for value in inputs["log_returns"]]
+    daily_pnl = [int(value) for value in inputs["daily_pnl"]]
+
+    if n_returns > min(len(log_returns), MAX_RETURNS) or n_pnl > len(daily_pnl):
+        raise CircuitAssertionError("Counts exceed the input arrays")
+
+    weights = (
+        [int(value) for value in inputs["weights"]]
+        if use_weighting
+        else [SCALE // 1000] * max(n_returns, n_pnl)
+    )
+    if use_weighting:
+        sum_of_weights = 0
+        for i in range(n_returns):
+            sum_of_weights = _i64(sum_of_weights + weights[i])
+    else:
+        sum_of_weights = n_returns
+    if sum_of_weights == 0:
+        raise CircuitAssertionError("sum_of_weights != 0 failed")
+
+    daily_rf = int(inputs["daily_rf"])
+    annual_risk_free = int(inputs["annual_risk_free"])
+    avg_daily_return = average(
+        log_returns, n_returns, weights, use_weighting, sum_of_weights
+    )
+    variance_val = variance(
+        log_returns, n_returns, 1, weights, use_weighting, sum_of_weights
+    )
+    downside_variance_val = downside_variance(
+        log_returns, n_returns, 1, weights, use_weighting, daily_rf
+    )
+    ann_excess_return_val = ann_excess_return(
+        log_returns, n_returns, annual_risk_free, weights, use_weighting, days_in_year
+    )
+    avg_daily_pnl = average(daily_pnl, n_pnl, weights, use_weighting, sum_of_weights)
+
+    outputs = [
+        avg_daily_pnl,
+        sharpe(
+            n_returns,
+            bypass_confidence,
+            variance_val,
+            ann_excess_return_val,
+            int(inputs["sharpe_noconfidence"]),
+            minimum_n,
+        ),
+        daily_max_drawdown(log_returns, n_returns),
+        calmar(
+            avg_daily_return,
+            days_in_year,
+            checkpoint_count,
+            [int(value) for value in inputs["checkpoint_mdds"]],
+        ),
+        omega(
+            log_returns,
+            n_returns,
+            weights,
+            use_weighting,
+            bypass_confidence,
+            int(inputs["omega_loss_min"]),
+            int(inputs["omega_noconfidence"]),
+            minimum_n,
+        ),
+        sortino(
+            n_returns,
+            bypass_confidence,
+            downside_variance_val,
+            ann_excess_return_val,
+            int(inputs["sortino_noconfidence"]),
+            minimum_n,
+        ),
+        statistical_confidence(
+            n_returns,
+            bypass_confidence,
+            avg_daily_return,
+            variance_val,
+            int(inputs["stat_confidence_noconfidence"]),
+            minimum_n,
+        ),
+    ]
+    return [as_u64(value) for value in outputs] + [
+        returns_merkle_root(log_returns, n_returns)
+    ]
@@ -0,0 +1,315 @@
+"""
+Constraint cost profile of a Noir program.
+
+The compiled artifact carries debug symbols that map every ACIR opcode to the
+call stack of source locations it was generated from, and `bb gates` reports
+the number of gates each opcode turns into. Together they attribute opcodes and
+gates to each source file (e.g. components/src/core/drawdown.nr) and to each
+function in it. Counts are reported both inclusive (any frame of the call stack
+is in the file or function) and self (the innermost frame is).
+
+Profiles are plain JSON with sorted keys and no timestamps, so two versions can
+be diffed directly, or compared with compare_profiles().
+"""
+
+import base64
+import bisect
+import gzip
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+import zlib
+
+from . import BB_PATH, NARGO_PATH
+from .artifacts import ArtifactManager
+from .proof_store import file_digest
+from .workspace import Workspace
+
+_FN_PATTERN = re.compile(rb"\bfn\s+([A-Za-z_][A-Za-z0-9_]*)")
+COMPARED_METRICS = ("acir_opcodes", "gates")
+
+
+def _decode_debug_symbols(value):
+    """Debug symbols are either plain JSON or base64 of compressed JSON."""
+    if isinstance(value, dict):
+        return value
+    data = base64.b64decode(value)
+    for decompress in (
+        lambda d: zlib.decompress(d, -zlib.MAX_WBITS),
+        zlib.decompress,
+        gzip.decompress,
+    ):
+        try:
+            return json.loads(decompress(data))
+        except (zlib.error, OSError, ValueError):
+            continue
+    raise ValueError("Unsupported debug symbols encoding")
+
+
+def _call_stacks(debug_info):
+    """
+    ACIR opcode index to its call stack, outermost frame first.
+
+    Handles both the flat `locations` map of older nargo versions and the
+    `acir_locations` + `location_tree` layout of newer ones.
+    """
+    stacks = {}
+    if "acir_locations" in debug_info:
+        nodes = debug_info["location_tree"]["locations"]
+
+        def resolve(node_id):
+            frames = []
+            while node_id is not None:
+                node = nodes[node_id]
+                if node.get("value") is not None:
+                    frames.append(node["value"])
+                node_id = node.get("parent")
+            return frames[::-1]
+
+        for location, node_id in debug_info["acir_locations"].items():
+            if location.isdigit():
+                stacks[int(location)] = resolve(node_id)
+    else:
+        for location, frames in debug_info.get("locations", {}).items():
+            if location.isdigit():
+                stacks[int(location)] = frames
+    return stacks
+
+
+def _component_name(path, circuit_dir):
+    """Source path relative to the package (or to its library) for reporting."""
+    real = os.path.realpath(path)
+    root = os.path.realpath(circuit_dir)
+    if real.startswith(root + os.sep):
+        return os.path.relpath(real, root)
+    for marker in ("/components/", "/src/"):
+        index = path.find(marker)
+        if index != -1:
+            return path[index + 1 :]
+    return path
+
+
+class _SourceIndex:
+    """Maps byte offsets in a source file to the enclosing function name."""
+
+    def __init__(self, source):
+        matches = list(_FN_PATTERN.finditer(source.encode()))
+        self.starts = [m.start() for m in matches]
+        self.names = [m.group(1).decode() for m in matches]
+
+    def function_at(self, offset):
+        index = bisect.bisect_right(self.starts, offset) - 1
+        return self.names[index] if index >= 0 else "<global>"
+
+
+def _empty_counts():
+    return {"acir_opcodes": 0, "gates": 0}
+
+
+def _add(target, gates):
+    target["acir_opcodes"] += 1
+    target["gates"] += gates
+
+
+def attribute_costs(artifact, gates_per_opcode, circuit_dir):
+    """
+    Attribute the main function's ACIR opcodes and gates to source files and
+    functions.
+
+    Returns:
+        dict: file -> {"inclusive", "self", "functions": {name: {"inclusive", "self"}}}
+    """
+    file_map = artifact.get("file_map", {})
+    debug_infos = _decode_debug_symbols(artifact["debug_symbols"])["debug_infos"]
+    stacks = _call_stacks(debug_infos[0])
+
+    names = {}
+    indexes = {}
+    for file_id, entry in file_map.items():
+        names[int(file_id)] = _component_name(entry["path"], circuit_dir)
+        indexes[int(file_id)] = _SourceIndex(entry.get("source", ""))
+
+    components = {}
+
+    def counts(file_name, function=None):
+        component = components.setdefault(
+            file_name,
+            {"inclusive": _empty_counts(), "self": _empty_counts(), "functions": {}},
+        )
+        if function is None:
+            return component
+        return component["functions"].setdefault(
+            function, {"inclusive": _empty_counts(), "self": _empty_counts()}
+        )
+
+    for index, frames in stacks.items():
+        if not frames:
+            continue
+        gates = gates_per_opcode[index] if index < len(gates_per_opcode) else 0
+        keys = []
+        for frame in frames:
+            file_name = names.get(frame["file"], str(frame["file"]))
+            index_for_file = indexes.get(frame["file"])
+            function = (
+                index_for_file.function_at(frame["span"]["start"])
+                if index_for_file
+                else "<unknown>"
+            )
+            keys.append((file_name, function))
+
+        # Inclusive: once per file and function anywhere on the call stack
+        for file_name in {file_name for file_name, _ in keys}:
+            _add(counts(file_name)["inclusive"], gates)
+        for file_name, function in set(keys):
+            _add(counts(file_name, function)["inclusive"], gates)
+
+        # Self: only the innermost frame
+        file_name, function = keys[-1]
+        _add(counts(file_name)["self"], gates)
+        _add(counts(file_name, function)["self"], gates)
+    return components
+
+
+def _run_json(command, cwd=None):
+    result = subprocess.run(command, capture_output=True, text=True, cwd=cwd)
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} failed: {result.stderr.strip()}")
+    return json.loads(result.stdout)
+
+
+def bb_gates(artifact_path):
+    """
+    Gate report of a program's main function.
+
+    Returns:
+        tuple: (ACIR opcode count, total gates, gates per ACIR opcode)
+    """
+    report = _run_json(
+        [BB_PATH, "gates", "-b", artifact_path, "--include_gates_per_opcode"]
+    )
+    function = report["functions"][0]
+    return (
+        function["acir_opcodes"],
+        function["circuit_size"],
+        function.get("gates_per_opcode", []),
+    )
+
+
+def brillig_opcodes(circuit_dir):
+    """Opcode counts of the unconstrained functions from `nargo info --json`."""
+    with Workspace(circuit_dir, prefix="pop-profile-") as workspace:
+        info = _run_json(
+            [NARGO_PATH, "info", "--json", "--silence-warnings"], cwd=workspace.path
+        )
+    return {
+        function["name"]: function["opcodes"]
+        for program in info.get("programs", [])
+        for function in program.get("unconstrained_functions", [])
+    }
+
+
+def execution_time(name, prover_toml, iterations=3, manager=None):
+    """Best `nargo execute` wall time over `iterations` runs with the given inputs."""
+    manager = manager or ArtifactManager()
+    best = None
+    with Workspace(manager.circuit_dirs[name], prefix="pop-profile-") as workspace:
+        shutil.copyfile(prover_toml, workspace.prover_toml)
+        manager.install(name, workspace.target_dir)
+        for _ in range(max(1, iterations)):
+            start = time.perf_counter()
+            result = subprocess.run(
+                [NARGO_PATH, "execute", "--silence-warnings"],
+                capture_output=True,
+                text=True,
+                cwd=workspace.path,
+            )
+            elapsed = time.perf_counter() - start
+            if result.returncode != 0:
+                raise RuntimeError(f"nargo execute failed: {result.stderr.strip()}")
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def profile_circuit(name="circuits", prover_toml=None, iterations=3, manager=None):
+    """
+    Build the cost profile of a registered program.
+
+    Args:
+        name: Program name known to the ArtifactManager
+        prover_toml: Inputs to time `nargo execute` with (execution time is
+            left out without them)
+        iterations: Timed executions; the best is reported
+
+    Returns:
+        dict: The profile
+    """
+    manager = manager or ArtifactManager()
+    manifest = manager.compile(name)
+    circuit_dir = manager.circuit_dirs[name]
+    artifact_path = manager.artifact_path(name)
+    with open(artifact_path, "r") as f:
+        artifact = json.load(f)
+
+    acir_opcodes, total_gates, gates_per_opcode = bb_gates(artifact_path)
+    brillig = brillig_opcodes(circuit_dir)
+    components = attribute_costs(artifact, gates_per_opcode, circuit_dir)
+
+    profile = {
+        "circuit": name,
+        "nargo_version": manifest["nargo_version"],
+        "source_digest": manifest["source_digest"],
+        "artifact_digest": file_digest(artifact_path),
+        "totals": {
+            "acir_opcodes": acir_opcodes,
+            "gates": total_gates,
+            "brillig_opcodes": sum(brillig.values()),
+        },
+        "brillig_functions": brillig,
+        "components": components,
+        "execution_seconds": None,
+    }
+    if prover_toml:
+        profile["execution_seconds"] = execution_time(
+            name, prover_toml, iterations, manager
+        )
+    return profile
+
+
+def compare_profiles(baseline, current, max_regression=1.0):
+    """
+    Compare the inclusive costs of every component against a baseline profile.
+
+    Args:
+        max_regression: Allowed growth in percent before a change counts as a
+            regression
+
+    Returns:
+        tuple: (changes, regressions), lists of
+            (component, metric, baseline value, current value, percent change)
+    """
+
+    def flatten(profile):
+        values = {
+            ("<total>", metric): profile["totals"].get(metric, 0)
+            for metric in COMPARED_METRICS
+        }
+        for component, costs in profile["components"].items():
+            for metric in COMPARED_METRICS:
+                values[(component, metric)] = costs["inclusive"][metric]
+        return values
+
+    old, new = flatten(baseline), flatten(current)
+    changes, regressions = [], []
+    for key in sorted(set(old) | set(new)):
+        before, after = old.get(key, 0), new.get(key, 0)
+        if before == after:
+            continue
+        percent = (after - before) / before * 100 if before else float("inf")
+        change = (key[0], key[1], before, after, percent)
+        changes.append(change)
+        if percent > max_regression:
+            regressions.append(change)
+    return changes, regressions
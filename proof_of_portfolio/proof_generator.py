@@ -1,26 +1,59 @@
 import subprocess
-import toml
-import re
 import os
 import time
 import json
 import math
+import sqlite3
+import numpy as np
 import bittensor as bt
 import traceback
-import requests
-import base64
+import warnings
 from pathlib import Path
 
 # Import global constants
 from . import BB_PATH, NARGO_PATH
-
-
-ARRAY_SIZE = 256
+from .abi import field_to_signed_int, read_circuit_output
+from .artifacts import ArtifactManager, nargo_version_tag
+from .blobs import store_proof_blobs, to_hex, want_hex
+from .inputs_store import InputStore
+from .metrics import StageTimer, export_stages
+from .preview import circuit_outputs
+from .results_index import get_results_index, hotkey_rows, latest_row
+from .proof_store import ProofStore, proof_key, stats as proof_store_stats
+from .prover_toml import dump_prover_toml
+from .spool import UploadSpool
+from .tiers import TIER_SIZES, prepare as prepare_tier, select_tier, variant_dir
+from .tree_state import update_signals_tree
+from .uploader import get_uploader, sync_uploads
+from .witness_cache import WitnessCache, circuit_digest
+from .workspace import Workspace
+
+
+ARRAY_SIZE = TIER_SIZES["circuits"]["large"]["ARRAY_SIZE"]
 MAX_DAYS = 256
 MAX_SIGNALS = 512
 MERKLE_DEPTH = 8
 SCALE = 10**8  # Base scaling factor (10^8) - used for all ratio outputs
-PRIME = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+INT64_LIMIT = float(2**63)
+
+
+# Former stdout parsers, now served from the deprecated parsing_utils module
+_PARSING_UTILS_NAMES = ("parse_circuit_output", "parse_nested_arrays")
+
+
+def __getattr__(name):
+    if name not in _PARSING_UTILS_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    warnings.warn(
+        f"proof_generator.{name} is deprecated, use "
+        "proof_of_portfolio.abi.read_circuit_output instead",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        from . import parsing_utils
+    return getattr(parsing_utils, name)
 
 
 def log_verbose(verbose, level, message):
@@ -35,7 +68,47 @@ def get_attr(obj, attr):
 
 def scale_to_int(value):
     """Convert float to scaled integer"""
-    return int(value * SCALE)
+    return scale_array([value], 1, name="value")[0]
+
+
+def scale_array(values, length, fill=0, name="values"):
+    """
+    Convert floats to scaled integers in bulk and pad them to `length`.
+
+    Matches `int(value * SCALE)` element-wise (truncation toward zero).
+
+    Args:
+        values: Sequence or array of floats
+        length: Minimum length of the result; shorter inputs are padded
+        fill: Value used for padding
+        name: Input name for error messages
+
+    Returns:
+        list: Python ints
+
+    Raises:
+        ValueError: On NaN or infinite values, or values that do not fit int64
+            once scaled
+    """
+    values = np.asarray(values, dtype=np.float64)
+    buffer = np.full(max(length, values.size), fill, dtype=np.int64)
+    if values.size:
+        scaled = values * SCALE
+        if not np.isfinite(scaled).all():
+            raise ValueError(f"{name} contains NaN or infinite values")
+        if (np.abs(scaled) >= INT64_LIMIT).any():
+            raise ValueError(f"{name} overflows int64 once scaled by {SCALE}")
+        buffer[: values.size] = np.trunc(scaled)
+    return buffer.tolist()
+
+
+def signal_window():
+    """
+    Which orders the circuit proves when a miner has more than MAX_SIGNALS:
+    the "first" (default) or "latest" by processed_ms, from POP_SIGNAL_WINDOW.
+    """
+    window = os.environ.get("POP_SIGNAL_WINDOW", "first").lower()
+    return window if window in ("first", "latest") else "first"
 
 
 def scale_from_int(value):
@@ -55,205 +128,84 @@ def run_command(command, cwd):
     return result.stdout
 
 
-def parse_circuit_output(output):
-    if "[" in output and "]" in output and "MerkleTree" not in output:
-        array_matches = re.findall(r"\[([^\]]+)\]", output)
-        if array_matches:
-            array_content = array_matches[-1]
-            values = []
-            for item in array_content.split(","):
-                item = item.strip()
-                if item.startswith("0x"):
-                    try:
-                        values.append(str(int(item, 16)))
-                    except ValueError:
-                        continue
-                elif item.lstrip("-").isdigit():
-                    values.append(item)
-            if values:
-                return values
-
-    struct_start = output.find("{")
-    struct_end = output.rfind("}")
-
-    if struct_start == -1 or struct_end == -1:
-        return re.findall(r"Field\(([-0-9]+)\)", output)
-
-    struct_content = output[struct_start : struct_end + 1]
-
-    if "MerkleTree" in output:
-        tree = {}
-        if "path_elements:" in struct_content:
-            start = struct_content.find("path_elements:") + len("path_elements:")
-            end = struct_content.find(", path_indices:")
-            path_elem_section = struct_content[start:end].strip()
-            tree["path_elements"] = parse_nested_arrays(path_elem_section)
-
-        if "path_indices:" in struct_content:
-            start = struct_content.find("path_indices:") + len("path_indices:")
-            end = struct_content.find(", root:")
-            path_idx_section = struct_content[start:end].strip()
-            tree["path_indices"] = parse_nested_arrays(path_idx_section)
-
-        if "root:" in struct_content:
-            start = struct_content.find("root:") + len("root:")
-            root_section = struct_content[start:].strip().rstrip("}")
-            tree["root"] = root_section.strip()
-
-        return tree
-
-    values = []
-    parts = re.split(r"[,\s]+", struct_content)
-    for part in parts:
-        part = part.strip("{}[](), \t\n\r")
-        if not part:
-            continue
-        if part.startswith("0x") and len(part) > 2:
-            try:
-                values.append(str(int(part, 16)))
-                continue
-            except ValueError:
-                pass
-        if part.lstrip("-").isdigit():
-            values.append(part)
-
-    return values
-
-
-def parse_nested_arrays(section):
-    if not section.strip().startswith("["):
-        return []
-
-    arrays = []
-    depth = 0
-    current_array = ""
-
-    for char in section:
-        if char == "[":
-            depth += 1
-            if depth == 2:
-                current_array = ""
-            elif depth == 1:
-                continue
-        elif char == "]":
-            depth -= 1
-            if depth == 1:
-                if current_array.strip():
-                    arrays.append(
-                        [x.strip() for x in current_array.split(",") if x.strip()]
-                    )
-                current_array = ""
-            elif depth == 0:
-                break
-        elif depth == 2:
-            current_array += char
-
-    return arrays
-
-
-def field_to_toml_value(f):
-    return str(f + PRIME) if f < 0 else str(f)
-
-
-def field_to_signed_int(field_str):
-    val = int(field_str, 16) if field_str.startswith("0x") else int(field_str)
-    return val - 2**64 if val >= 2**63 else val
-
-
-def upload_proof(proof_hex, public_inputs_hex, wallet, testnet=True):
+def upload_proof(
+    proof=None,
+    public_inputs=None,
+    wallet=None,
+    testnet=True,
+    tier="large",
+    *,
+    proof_hex=None,
+    public_inputs_hex=None,
+):
     """
-    Upload proof to the API endpoint.
+    Upload proof to the API endpoint, blocking until it succeeds or retries
+    are exhausted. generate_proof queues uploads on the shared uploader
+    instead.
 
     Args:
-        proof_hex: Proof as hex string
-        public_inputs_hex: Public inputs as hex string
+        proof: Proof as bytes, memoryview or hex string
+        public_inputs: Public inputs as bytes, memoryview or hex string
         wallet: Bittensor wallet for signing
         testnet: Whether this is a testnet proof
+        tier: Circuit tier the proof was generated with
+        proof_hex: Former name of `proof`, still accepted as a keyword
+        public_inputs_hex: Former name of `public_inputs`, still accepted as
+            a keyword
 
     Returns:
         API response dictionary or None if failed
     """
+    proof = proof_hex if proof is None else proof
+    public_inputs = public_inputs_hex if public_inputs is None else public_inputs
     bt.logging.info(
-        f"[UPLOAD] Starting upload_proof: wallet={bool(wallet)}, proof_hex={bool(proof_hex)}, public_inputs_hex={bool(public_inputs_hex)}, testnet={testnet}"
+        f"[UPLOAD] Starting upload_proof: wallet={bool(wallet)}, proof={bool(proof)}, public_inputs={bool(public_inputs)}, testnet={testnet}"
     )
 
     if not wallet:
         bt.logging.warning("[UPLOAD] Missing wallet for upload")
         return None
-    if not proof_hex:
-        bt.logging.warning("[UPLOAD] Missing proof_hex for upload")
+    if not proof:
+        bt.logging.warning("[UPLOAD] Missing proof for upload")
         return None
-    if not public_inputs_hex:
-        bt.logging.warning("[UPLOAD] Missing public_inputs_hex for upload")
+    if not public_inputs:
+        bt.logging.warning("[UPLOAD] Missing public_inputs for upload")
         return None
 
-    try:
-        # Sign timestamp
-        bt.logging.info(
-            f"[UPLOAD] Signing with wallet hotkey: {wallet.hotkey.ss58_address[:8]}..."
-        )
-        timestamp = str(int(time.time()))
-        signature = wallet.hotkey.sign(timestamp.encode())
-        signature_b64 = base64.b64encode(signature).decode()
-        bt.logging.info(f"[UPLOAD] Signature created, length: {len(signature_b64)}")
-
-        # Prepare request
-        url = "https://api.omron.ai/ptn/upload-proof"
-        headers = {
-            "x-signature": signature_b64,
-            "x-timestamp": timestamp,
-            "x-origin-ss58": wallet.hotkey.ss58_address,
-            "Content-Type": "application/json",
-        }
-
-        payload = {
-            "testnet": testnet,
-            "proof": proof_hex,
-            "public_signals": public_inputs_hex,
-        }
+    return get_uploader().upload(proof, public_inputs, wallet, testnet, tier)
 
-        bt.logging.info(
-            f"[UPLOAD] Payload sizes - proof: {len(proof_hex)}, public_signals: {len(public_inputs_hex)}"
-        )
-        bt.logging.info(
-            f"[UPLOAD] Uploading proof for {wallet.hotkey.ss58_address[:8]} to {url}..."
-        )
 
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+def queue_upload(proof, public_inputs, wallet, testnet=True, tier="large"):
+    """
+    Queue a proof for background upload through the upload spool.
 
-        bt.logging.info(f"[UPLOAD] Response status code: {response.status_code}")
+    The proof is written to the spool before the upload starts, and any
+    backlog the wallet's hotkey left behind (e.g. after a crash) is queued
+    along with it.
 
-        if response.status_code == 200:
-            bt.logging.success("✅ [UPLOAD] Proof uploaded successfully!")
-            result = response.json()
-            bt.logging.info(f"[UPLOAD] Response data: {result}")
-            return result
-        else:
-            bt.logging.error(
-                f"❌ [UPLOAD] Proof upload failed: {response.status_code} - {response.text}"
-            )
-            return None
-
-    except requests.exceptions.Timeout as e:
-        bt.logging.error(f"[UPLOAD] Timeout error uploading proof: {str(e)}")
-        return None
-    except requests.exceptions.ConnectionError as e:
-        bt.logging.error(f"[UPLOAD] Connection error uploading proof: {str(e)}")
-        return None
-    except Exception as e:
-        bt.logging.error(
-            f"[UPLOAD] Unexpected error uploading proof: {type(e).__name__}: {str(e)}"
-        )
-        import traceback
+    Returns:
+        concurrent.futures.Future for this proof's upload, or None if the same
+        proof is already queued or was uploaded before
+    """
+    spool = UploadSpool.from_env()
+    if spool is None:
+        return get_uploader().submit(proof, public_inputs, wallet, testnet, tier)
 
-        bt.logging.error(f"[UPLOAD] Traceback: {traceback.format_exc()}")
-        return None
+    digest = spool.enqueue(
+        proof, public_inputs, wallet.hotkey.ss58_address, testnet, tier
+    )
+    if digest is None:
+        bt.logging.info("[UPLOAD] Proof already queued or uploaded, skipping")
+    return spool.drain(get_uploader(), wallet).get(digest)
 
 
 def save_zk_results(results, miner_hotkey):
     """
     Save ZK proof results to disk in ~/.pop/ directory.
 
+    Proof data is written to binary blob files next to the JSON file, which
+    references them (see blobs.load_proof).
+
     Args:
         results: The ZK results dictionary to save
         miner_hotkey: The miner's hotkey for filename
@@ -266,10 +218,24 @@ def save_zk_results(results, miner_hotkey):
         filename = f"{miner_hotkey}_{timestamp}.json"
         filepath = pop_dir / filename
 
+        if "proof_results" in results:
+            results = dict(results)
+            results["proof_results"] = store_proof_blobs(
+                results["proof_results"], filepath.with_suffix("")
+            )
+
+        # Compact results are written without indentation as well
+        compact = "inputs_file" in results.get("circuit_inputs", {})
         with open(filepath, "w") as f:
-            json.dump(results, f, indent=2, default=str)
+            json.dump(results, f, indent=None if compact else 2, default=str)
 
         bt.logging.info(f"ZK results saved to {filepath}")
+        index = get_results_index()
+        if index is not None:
+            try:
+                index.record("zk", miner_hotkey, filepath, results, timestamp)
+            except (OSError, sqlite3.Error) as e:
+                bt.logging.warning(f"Failed to index ZK results: {e}")
         return str(filepath)
 
     except Exception as e:
@@ -289,6 +255,11 @@ def get_latest_merkle_root_for_miner(hotkey):
     """
     try:
         pop_dir = Path.home() / ".pop"
+        index = get_results_index()
+        if index is not None:
+            latest = latest_row(index, "zk", pop_dir, hotkey)
+            return latest["summary"]["merkle_roots"] if latest else None
+
         if not pop_dir.exists():
             return None
 
@@ -320,6 +291,21 @@ def get_all_results_for_miner(hotkey):
     """
     try:
         pop_dir = Path.home() / ".pop"
+        index = get_results_index()
+        if index is not None:
+            # Index rows are already newest first; only their files are read
+            results = []
+            for row in hotkey_rows(index, "zk", pop_dir, hotkey):
+                try:
+                    with open(row["path"], "r") as f:
+                        result = json.load(f)
+                    result["_filepath"] = row["path"]
+                    result["_timestamp"] = row["timestamp"]
+                    results.append(result)
+                except Exception as e:
+                    bt.logging.warning(f"Error reading {row['path']}: {str(e)}")
+            return results
+
         if not pop_dir.exists():
             return []
 
@@ -346,7 +332,20 @@ def get_all_results_for_miner(hotkey):
         return []
 
 
-def generate_bb_proof(circuit_dir):
+def bb_env(bb_threads=None):
+    """
+    Environment for a bb subprocess, capped at `bb_threads` threads.
+
+    bb sizes its thread pool from HARDWARE_CONCURRENCY, so several proofs can run
+    side by side without each one claiming every core.
+    """
+    env = os.environ.copy()
+    if bb_threads:
+        env["HARDWARE_CONCURRENCY"] = str(int(bb_threads))
+    return env
+
+
+def generate_bb_proof(circuit_dir, bb_threads=None):
     bt.logging.info(f"Starting generate_bb_proof with circuit_dir: {circuit_dir}")
 
     try:
@@ -408,14 +407,15 @@ def generate_bb_proof(circuit_dir):
     print(f"DEBUG: Circuit file exists: {os.path.exists(circuit_file)}")
     print(f"DEBUG: Witness file exists: {os.path.exists(witness_file)}")
 
-    prove_start = time.time()
+    prove_start = time.monotonic()
     prove_result = subprocess.run(
         prove_cmd,
         capture_output=True,
         text=True,
         cwd=circuit_dir,
+        env=bb_env(bb_threads),
     )
-    prove_time = time.time() - prove_start
+    prove_time = time.monotonic() - prove_start
 
     print(f"DEBUG: bb prove completed with return code: {prove_result.returncode}")
     print(f"DEBUG: bb prove time: {prove_time:.3f}s")
@@ -453,7 +453,7 @@ def generate_bb_proof(circuit_dir):
     return prove_time, True
 
 
-def generate_proof(
+def generate_witness(
     data=None,
     daily_pnl=None,
     miner_hotkey=None,
@@ -467,7 +467,21 @@ def generate_proof(
     wallet=None,
     testnet=True,
     augmented_scores=None,
+    preview=False,
 ):
+    """
+    First stage of generate_proof: prepare the circuit inputs, solve the main
+    circuit and decode its outputs.
+
+    With preview=True the outputs are computed in Python (see preview.py)
+    instead of solving the circuit, and no workspace is created. The signals
+    Merkle tree is neither hashed nor saved, so the signals root is None.
+
+    Returns:
+        dict: A witness job to pass to finish_proof. It owns the job workspace,
+            which finish_proof removes.
+    """
+    timer = StageTimer()
     is_demo_mode = data is None
     if verbose is None:
         verbose = is_demo_mode
@@ -552,8 +566,6 @@ def generate_proof(
     if daily_pnl is None:
         raise ValueError("daily_pnl must be provided")
     n_pnl = len(daily_pnl)
-    scaled_daily_pnl = [scale_to_int(p) for p in daily_pnl]
-    scaled_daily_pnl += [0] * (ARRAY_SIZE - n_pnl)
     positions = data["positions"][miner_hotkey]["positions"]
     log_verbose(verbose, "info", "Preparing circuit inputs...")
 
@@ -569,10 +581,6 @@ def generate_proof(
         daily_log_returns = daily_log_returns[:MAX_DAYS]
         n_returns = MAX_DAYS
 
-    scaled_log_returns = [int(ret * SCALE) for ret in daily_log_returns]
-
-    scaled_log_returns += [0] * (MAX_DAYS - len(scaled_log_returns))
-
     checkpoint_returns = []
     checkpoint_mdds = []
     checkpoint_count = 0
@@ -609,41 +617,18 @@ def generate_proof(
         checkpoint_mdds = checkpoint_mdds[:MAX_CHECKPOINTS]
         checkpoint_count = MAX_CHECKPOINTS
 
-    scaled_checkpoint_returns = [int(ret * SCALE) for ret in checkpoint_returns]
-    scaled_checkpoint_mdds = [int(mdd * SCALE) for mdd in checkpoint_mdds]
-
-    scaled_checkpoint_returns += [0] * (
-        MAX_CHECKPOINTS - len(scaled_checkpoint_returns)
-    )
-    scaled_checkpoint_mdds += [SCALE] * (  # Default to 1.0 (no drawdown)
-        MAX_CHECKPOINTS - len(scaled_checkpoint_mdds)
-    )
-
-    weights_float = data.get("weights", [])
-
-    scaled_weights = [int(w * SCALE) for w in weights_float]
-    scaled_weights += [0] * (256 - len(scaled_weights))
-
     log_verbose(verbose, "info", f"Using {n_returns} daily returns from PTN")
     try:
         all_orders = []
         for pos in positions:
             all_orders.extend(get_attr(pos, "orders"))
 
-        signals_count = len(all_orders)
-        if signals_count > MAX_SIGNALS:
-            log_verbose(
-                verbose,
-                "warning",
-                f"Truncating {signals_count} signals to {MAX_SIGNALS} (circuit limit)",
-            )
-            all_orders = all_orders[:MAX_SIGNALS]
-            signals_count = MAX_SIGNALS
-
         trade_pair_map = {}
         trade_pair_counter = 0
 
         signals = []
+        order_fields = []
+        order_prices = []
         for order in all_orders:
             trade_pair = get_attr(order, "trade_pair")
             trade_pair_str = (
@@ -666,17 +651,49 @@ def generate_proof(
             else:
                 order_type_str = str(order_type)
             order_type_map = {"SHORT": 2, "LONG": 1, "FLAT": 0}
-            price = int(get_attr(order, "price") * SCALE)
             order_uuid = get_attr(order, "order_uuid")
-            bid = int(get_attr(order, "bid") * SCALE)
-            ask = int(get_attr(order, "ask") * SCALE)
-            processed_ms = get_attr(order, "processed_ms")
 
+            # A missing or non-finite price only drops its own order
+            try:
+                prices = [
+                    float(get_attr(order, name))
+                    for name in ("leverage", "price", "bid", "ask")
+                ]
+            except (TypeError, ValueError):
+                prices = None
+            if prices is None or not all(
+                math.isfinite(value) and abs(value * SCALE) < INT64_LIMIT
+                for value in prices
+            ):
+                bt.logging.warning(f"Skipping order {order_uuid}: invalid price data")
+                continue
+            prices[0] = abs(prices[0])
+
+            order_fields.append(
+                (
+                    trade_pair_map[trade_pair_str],
+                    order_type_map.get(order_type_str, 0),
+                    get_attr(order, "processed_ms"),
+                    order_uuid,
+                )
+            )
+            order_prices.append(prices)
+
+        # Scale leverage, price, bid and ask for all valid orders at once
+        scaled_prices = scale_array(
+            np.asarray(order_prices, dtype=np.float64).reshape(-1),
+            0,
+            name="order prices",
+        )
+        for i, (trade_pair, order_type, processed_ms, order_uuid) in enumerate(
+            order_fields
+        ):
+            leverage, price, bid, ask = scaled_prices[4 * i : 4 * i + 4]
             signals.append(
                 {
-                    "trade_pair": str(trade_pair_map[trade_pair_str]),
-                    "order_type": str(order_type_map.get(order_type_str, 0)),
-                    "leverage": str(int(abs(get_attr(order, "leverage")) * SCALE)),
+                    "trade_pair": str(trade_pair),
+                    "order_type": str(order_type),
+                    "leverage": str(leverage),
                     "price": str(price),
                     "processed_ms": str(processed_ms),
                     "order_uuid": f"0x{str(order_uuid).replace('-', '')}",
@@ -687,6 +704,55 @@ def generate_proof(
     except Exception:
         traceback.print_exc()
 
+    signals_total = len(signals)
+    window = signal_window()
+    if signals_total > MAX_SIGNALS:
+        bt.logging.warning(
+            f"{signals_total} signals exceed the circuit limit of {MAX_SIGNALS}; "
+            f"proving the {window} {MAX_SIGNALS}"
+        )
+        # Both windows are cut from the same chronological order
+        history = sorted(signals, key=lambda signal: int(signal["processed_ms"]))
+        signals = (
+            history[-MAX_SIGNALS:] if window == "latest" else history[:MAX_SIGNALS]
+        )
+    signals_count = len(signals)
+    timer.mark("signal_conversion")
+
+    # Prove with the smallest circuit tier the inputs fit in, counting only
+    # the signals left after invalid orders were dropped
+    tier = select_tier(
+        "circuits",
+        MAX_SIGNALS=signals_count,
+        MAX_DAYS=n_returns,
+        MAX_CHECKPOINTS=checkpoint_count,
+        ARRAY_SIZE=max(n_pnl, n_returns),
+    )
+    sizes = TIER_SIZES["circuits"][tier]
+    log_verbose(verbose, "info", f"Using {tier} circuit tier: {sizes}")
+
+    scaled_daily_pnl = scale_array(daily_pnl, sizes["ARRAY_SIZE"], name="daily_pnl")
+    scaled_log_returns = scale_array(
+        daily_log_returns, sizes["MAX_DAYS"], name="daily_returns"
+    )
+    scaled_checkpoint_returns = scale_array(
+        checkpoint_returns, sizes["MAX_CHECKPOINTS"], name="checkpoint_returns"
+    )
+    scaled_checkpoint_mdds = scale_array(
+        checkpoint_mdds,
+        sizes["MAX_CHECKPOINTS"],
+        fill=SCALE,  # Default to 1.0 (no drawdown)
+        name="checkpoint_mdds",
+    )
+
+    weights_float = data.get("weights", [])
+
+    # The circuit only reads the weights of the first n_returns days
+    scaled_weights = scale_array(
+        weights_float[: sizes["ARRAY_SIZE"]], sizes["ARRAY_SIZE"], name="weights"
+    )
+    timer.mark("input_scaling")
+
     # Pad signals too
     signals += [
         {
@@ -699,7 +765,7 @@ def generate_proof(
             "bid": "0",
             "ask": "0",
         }
-    ] * (MAX_SIGNALS - len(signals))
+    ] * (sizes["MAX_SIGNALS"] - len(signals))
 
     log_verbose(
         verbose,
@@ -738,44 +804,36 @@ def generate_proof(
             )
 
         bt.logging.info(
-            f"Circuit Config: MAX_DAYS={MAX_DAYS}, MAX_CHECKPOINTS={MAX_CHECKPOINTS}, DAILY_CHECKPOINTS=2"
+            f"Circuit Config: tier={tier}, MAX_DAYS={sizes['MAX_DAYS']}, MAX_CHECKPOINTS={sizes['MAX_CHECKPOINTS']}, DAILY_CHECKPOINTS=2"
         )
 
-    log_verbose(verbose, "info", "Running tree_generator circuit...")
-    bt.logging.info(f"Generating tree for hotkey {miner_hotkey[:8]}...")
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    tree_generator_dir = os.path.join(current_dir, "tree_generator")
-
-    tree_prover_input = {"signals": signals, "actual_len": str(signals_count)}
-    os.makedirs(tree_generator_dir, exist_ok=True)
-    with open(os.path.join(tree_generator_dir, "Prover.toml"), "w") as f:
-        toml.dump(tree_prover_input, f)
-
-    output = run_command(
-        [NARGO_PATH, "execute", "--silence-warnings"],
-        tree_generator_dir,
-    )
+    if preview:
+        # circuit_outputs does not use the signals tree
+        path_elements = path_indices = []
+        signals_merkle_root = None
+    else:
+        log_verbose(verbose, "info", "Building signals Merkle tree...")
+        bt.logging.info(f"Generating tree for hotkey {miner_hotkey[:8]}...")
 
-    tree = parse_circuit_output(output)
-    try:
-        path_elements = tree["path_elements"]
-        path_indices = tree["path_indices"]
-        signals_merkle_root = tree["root"]
-    except Exception:
-        raise RuntimeError(
-            "Unexpected tree_generator output structure, expected MerkleTree dict with leaf_hashes, path_elements, path_indices, and root"
+        with timer.stage("merkle_tree"):
+            tree = update_signals_tree(miner_hotkey, signals, signals_count)
+        log_verbose(
+            verbose, "info", f"Rehashed {len(tree['changed'])} changed Merkle leaves"
         )
+        # The tree always has MAX_SIGNALS leaves; a tier takes the paths of its first ones
+        path_elements = tree["path_elements"][: sizes["MAX_SIGNALS"]]
+        path_indices = tree["path_indices"][: sizes["MAX_SIGNALS"]]
+        signals_merkle_root = f"0x{tree['root']:x}"
 
-    log_verbose(
-        verbose, "info", f"Generated signals Merkle root: {signals_merkle_root}"
-    )
+        log_verbose(
+            verbose, "info", f"Generated signals Merkle root: {signals_merkle_root}"
+        )
     log_verbose(
         verbose, "info", "Returns Merkle root will be calculated within circuit"
     )
     log_verbose(verbose, "info", f"Number of daily returns: {n_returns}")
     log_verbose(verbose, "info", "Running main proof of portfolio circuit...")
     bt.logging.info(f"Generating witness for hotkey {miner_hotkey[:8]}...")
-    main_circuit_dir = os.path.join(current_dir, "circuits")
 
     # Pass annual risk-free rate (to match ann_excess_return usage)
     annual_risk_free_decimal = annual_risk_free_decimal
@@ -786,330 +844,547 @@ def generate_proof(
 
     account_size = data.get("account_size", 250000)
     # Finally, LFG
+    # Values stay ints; the Prover.toml writer quotes them as it streams
     main_prover_input = {
         "hotkey": str(miner_hotkey),
-        "log_returns": [str(r) for r in scaled_log_returns],
-        "n_returns": str(n_returns),
-        "checkpoint_returns": [str(r) for r in scaled_checkpoint_returns],
-        "checkpoint_count": str(checkpoint_count),
-        "checkpoint_mdds": [str(mdd) for mdd in scaled_checkpoint_mdds],
-        "daily_pnl": [str(p) for p in scaled_daily_pnl],
-        "n_pnl": str(n_pnl),
+        "log_returns": scaled_log_returns,
+        "n_returns": n_returns,
+        "checkpoint_returns": scaled_checkpoint_returns,
+        "checkpoint_count": checkpoint_count,
+        "checkpoint_mdds": scaled_checkpoint_mdds,
+        "daily_pnl": scaled_daily_pnl,
+        "n_pnl": n_pnl,
         "signals": signals,
-        "signals_count": str(signals_count),
-        "path_elements": [
-            [
-                field_to_toml_value(
-                    int(x, 16) if isinstance(x, str) and x.startswith("0x") else int(x)
-                )
-                for x in p
-            ]
-            for p in path_elements
-        ],
-        "path_indices": [
-            [
-                int(x, 16) if isinstance(x, str) and x.startswith("0x") else int(x)
-                for x in p
-            ]
-            for p in path_indices
-        ],
-        "signals_merkle_root": (
-            signals_merkle_root
-            if isinstance(signals_merkle_root, str)
-            else str(signals_merkle_root)
-        ),
-        "risk_free_rate": str(risk_free_rate_scaled),
-        "daily_rf": str(daily_rf_scaled),
-        "use_weighting": str(int(use_weighting)),
-        "weights": [str(w) for w in scaled_weights],
-        "bypass_confidence": str(int(bypass_confidence)),
-        "account_size": str(account_size),
-        "days_in_year": str(days_in_year_crypto),
-        "weighted_decay_max": str(int(weighted_average_decay_max * SCALE)),
-        "weighted_decay_min": str(int(weighted_average_decay_min * SCALE)),
-        "weighted_decay_rate": str(int(weighted_average_decay_rate * SCALE)),
-        "omega_loss_min": str(int(omega_loss_minimum * SCALE)),
-        "sharpe_stddev_min": str(int(sharpe_stddev_minimum * SCALE)),
-        "sortino_downside_min": str(int(sortino_downside_minimum * SCALE)),
-        "stat_conf_min_n": str(statistical_confidence_minimum_n_ceil),
-        "annual_risk_free": str(int(annual_risk_free_decimal * SCALE)),
-        "omega_noconfidence": str(int(omega_noconfidence_value * SCALE)),
-        "sharpe_noconfidence": str(int(sharpe_noconfidence_value * SCALE)),
-        "sortino_noconfidence": str(int(sortino_noconfidence_value * SCALE)),
-        "calmar_noconfidence": str(int(calmar_noconfidence_value * SCALE)),
-        "stat_confidence_noconfidence": str(
-            int(statistical_confidence_noconfidence_value * SCALE)
+        "signals_count": signals_count,
+        "path_elements": path_elements,
+        "path_indices": path_indices,
+        "signals_merkle_root": signals_merkle_root,
+        "risk_free_rate": risk_free_rate_scaled,
+        "daily_rf": daily_rf_scaled,
+        "use_weighting": int(use_weighting),
+        "weights": scaled_weights,
+        "bypass_confidence": int(bypass_confidence),
+        "account_size": account_size,
+        "days_in_year": days_in_year_crypto,
+        "weighted_decay_max": int(weighted_average_decay_max * SCALE),
+        "weighted_decay_min": int(weighted_average_decay_min * SCALE),
+        "weighted_decay_rate": int(weighted_average_decay_rate * SCALE),
+        "omega_loss_min": int(omega_loss_minimum * SCALE),
+        "sharpe_stddev_min": int(sharpe_stddev_minimum * SCALE),
+        "sortino_downside_min": int(sortino_downside_minimum * SCALE),
+        "stat_conf_min_n": statistical_confidence_minimum_n_ceil,
+        "annual_risk_free": int(annual_risk_free_decimal * SCALE),
+        "omega_noconfidence": int(omega_noconfidence_value * SCALE),
+        "sharpe_noconfidence": int(sharpe_noconfidence_value * SCALE),
+        "sortino_noconfidence": int(sortino_noconfidence_value * SCALE),
+        "calmar_noconfidence": int(calmar_noconfidence_value * SCALE),
+        "stat_confidence_noconfidence": int(
+            statistical_confidence_noconfidence_value * SCALE
         ),
     }
 
-    os.makedirs(main_circuit_dir, exist_ok=True)
-    with open(os.path.join(main_circuit_dir, "Prover.toml"), "w") as f:
-        toml.dump(main_prover_input, f)
-
-    log_verbose(verbose, "info", "Executing main circuit to generate witness...")
-    witness_start = time.time()
-    output = run_command(
-        [
-            NARGO_PATH,
-            "execute",
-            "witness",
-            "--silence-warnings",
-        ],
-        main_circuit_dir,
-    )
-    witness_time = time.time() - witness_start
-    log_verbose(verbose, "info", f"Witness generation completed in {witness_time:.3f}s")
+    witness_start = time.monotonic()
+    workspace = witness_file = circuit_file = None
+    try:
+        witness_cached = False
+        if preview:
+            # Same outputs as the circuit, computed without nargo
+            with timer.stage("preview"):
+                fields = circuit_outputs(main_prover_input)
+        else:
+            artifacts = ArtifactManager.from_env()
+            with timer.stage("circuit_tier"):
+                circuit_name = prepare_tier(
+                    "circuits", tier, artifacts, with_vk=not witness_only
+                )
+            main_circuit_dir = variant_dir("circuits", tier)
+            if artifacts is not None and not witness_only:
+                # Fail before solving anything if the shipped vk is stale
+                with timer.stage("artifact_check"):
+                    artifacts.check_vk(circuit_name)
+
+            workspace = Workspace(main_circuit_dir)
+            log_verbose(verbose, "info", f"Using job workspace {workspace.path}")
+            witness_file = workspace.witness_file("witness")
+            circuit_file = os.path.join(workspace.target_dir, "circuits.json")
+
+            witness_cache = WitnessCache.from_env()
+            fields = None
+            if witness_cache is not None:
+                with timer.stage("witness_cache_lookup"):
+                    # Witnesses and the cached compiled circuit depend on the
+                    # compiler as well as the sources
+                    circuit_hash = (
+                        f"{circuit_digest(main_circuit_dir)}-{nargo_version_tag()}"
+                    )
+                    cache_key = witness_cache.key(main_prover_input, circuit_hash)
+                    fields = witness_cache.get(
+                        cache_key,
+                        witness_file,
+                        circuit_hash,
+                        None if witness_only else circuit_file,
+                    )
 
-    fields = parse_circuit_output(output)
-    log_verbose(verbose, "info", f"Circuit output: {output}")
-    log_verbose(verbose, "info", f"Parsed fields: {fields}")
-    if len(fields) < 8:
-        raise RuntimeError(
-            f"Expected 8 output fields from main circuit, got {len(fields)}: {fields}"
-        )
+            witness_cached = fields is not None
+            if witness_cached:
+                log_verbose(verbose, "info", f"Witness cache hit ({cache_key[:12]})")
+            else:
+                if artifacts is not None:
+                    with timer.stage("artifact_install"):
+                        artifacts.install(circuit_name, workspace.target_dir)
 
-    avg_daily_pnl_raw = fields[0]
-    sharpe_raw = fields[1]
-    drawdown_raw = fields[2]
-    calmar_raw = fields[3]
-    omega_raw = fields[4]
-    sortino_raw = fields[5]
-    stat_confidence_raw = fields[6]
-    returns_merkle_root_raw = fields[7]
-
-    def field_to_signed_int(field_str):
-        if isinstance(field_str, str) and field_str.startswith("0x"):
-            val = int(field_str, 16)
-        else:
-            val = int(field_str)
+                with timer.stage("toml_write"):
+                    dump_prover_toml(main_prover_input, workspace.prover_toml)
 
-        # Noir's i64 as u64 casting uses standard two's complement
-        # Convert from u64 back to i64 using two's complement
-        if val >= 2**63:  # If the high bit is set, it's negative
-            return val - 2**64  # Convert from unsigned to signed
-        else:
-            return val  # Positive values unchanged
-
-    avg_daily_pnl_value = field_to_signed_int(avg_daily_pnl_raw)
-    sharpe_ratio_raw = field_to_signed_int(sharpe_raw)
-    max_drawdown_raw = field_to_signed_int(drawdown_raw)
-    calmar_ratio_raw = field_to_signed_int(calmar_raw)
-    omega_ratio_raw = field_to_signed_int(omega_raw)
-    sortino_ratio_raw = field_to_signed_int(sortino_raw)
-    stat_confidence_raw = field_to_signed_int(stat_confidence_raw)
-
-    # Process returns merkle root (it's a Field, not signed)
-    if isinstance(returns_merkle_root_raw, str) and returns_merkle_root_raw.startswith(
-        "0x"
-    ):
-        returns_merkle_root = returns_merkle_root_raw
-    else:
-        returns_merkle_root = f"0x{int(returns_merkle_root_raw):x}"
+                log_verbose(
+                    verbose, "info", "Executing main circuit to generate witness..."
+                )
+                with timer.stage("nargo_execute"):
+                    output = run_command(
+                        [
+                            NARGO_PATH,
+                            "execute",
+                            "witness",
+                            "--silence-warnings",
+                        ],
+                        workspace.path,
+                    )
 
-    avg_daily_pnl_scaled = scale_from_int(avg_daily_pnl_value)
-    avg_daily_pnl_ptn_scaled = avg_daily_pnl_scaled * 365 * 100
-    sharpe_ratio_scaled = scale_from_int(sharpe_ratio_raw)
-    max_drawdown_scaled = scale_from_int(max_drawdown_raw)
-    calmar_ratio_scaled = scale_from_int(calmar_ratio_raw)
-    omega_ratio_scaled = scale_from_int(omega_ratio_raw) / 1000000
-    sortino_ratio_scaled = scale_from_int(sortino_ratio_raw)
-    stat_confidence_scaled = scale_from_int(stat_confidence_raw)
-
-    if witness_only:
-        prove_time, proving_success = None, True
+                log_verbose(verbose, "info", f"Circuit output: {output}")
+                with timer.stage("output_decode"):
+                    fields = read_circuit_output(
+                        workspace.path, "witness", target_dir=workspace.target_dir
+                    )
+
+                if witness_cache is not None and len(fields) >= 8:
+                    try:
+                        with timer.stage("witness_cache_store"):
+                            witness_cache.put(
+                                cache_key,
+                                witness_file,
+                                fields,
+                                circuit_hash,
+                                circuit_file,
+                            )
+                    except OSError as e:
+                        bt.logging.warning(f"Failed to cache witness: {e}")
+
+        witness_time = time.monotonic() - witness_start
         log_verbose(
-            verbose,
-            "info",
-            "Skipping barretenberg proof generation (witness_only=True)",
-        )
-    else:
-        bt.logging.info(
-            f"Starting barretenberg proof generation for {miner_hotkey[:8]}..."
+            verbose, "info", f"Witness generation completed in {witness_time:.3f}s"
         )
-        try:
-            prove_time, proving_success = generate_bb_proof(main_circuit_dir)
-            bt.logging.info(
-                f"generate_bb_proof returned: prove_time={prove_time}, proving_success={proving_success}"
-            )
-            if prove_time is None:
-                bt.logging.error(
-                    "Barretenberg proof generation failed - prove_time is None"
-                )
-                prove_time, proving_success = None, False
-            elif not proving_success:
-                bt.logging.error(
-                    "Barretenberg proof generation failed - proving_success is False"
-                )
-        except Exception as e:
-            bt.logging.error(
-                f"Exception during proof generation: {type(e).__name__}: {e}"
+        log_verbose(verbose, "info", f"Parsed fields: {fields}")
+        if len(fields) < 8:
+            raise RuntimeError(
+                f"Expected 8 output fields from main circuit, got {len(fields)}: {fields}"
             )
-            bt.logging.error(f"Full traceback: {traceback.format_exc()}")
-            prove_time, proving_success = None, False
-
-    # Always print key production info: hotkey and verification status
-    bt.logging.info(f"Hotkey: {miner_hotkey}")
-    bt.logging.info(f"Orders processed: {signals_count}")
-    bt.logging.info(f"Signals Merkle Root: {signals_merkle_root}")
-    bt.logging.info(f"Returns Merkle Root: {returns_merkle_root}")
-    bt.logging.info(f"Average Daily PnL: {avg_daily_pnl_scaled:.9f}")
-    bt.logging.info(f"Sharpe Ratio: {sharpe_ratio_scaled:.9f}")
-    # Convert drawdown factor to percentage: drawdown% = (1 - factor) * 100
-    drawdown_percentage = max_drawdown_scaled * 100
-    bt.logging.info(
-        f"Max Drawdown: {max_drawdown_scaled:.9f} ({drawdown_percentage:.6f}%)"
-    )
-    bt.logging.info(f"Calmar Ratio: {calmar_ratio_scaled:.9f}")
-    bt.logging.info(f"Omega Ratio: {omega_ratio_scaled:.9f}")
-    bt.logging.info(f"Sortino Ratio: {sortino_ratio_scaled:.9f}")
-    bt.logging.info(f"Statistical Confidence: {stat_confidence_scaled:.9f}")
 
-    if verbose:
-        bt.logging.info("\n--- Proof Generation Complete ---")
-        bt.logging.info("\n=== MERKLE ROOTS ===")
+        avg_daily_pnl_raw = fields[0]
+        sharpe_raw = fields[1]
+        drawdown_raw = fields[2]
+        calmar_raw = fields[3]
+        omega_raw = fields[4]
+        sortino_raw = fields[5]
+        stat_confidence_raw = fields[6]
+        returns_merkle_root_raw = fields[7]
+
+        avg_daily_pnl_value = field_to_signed_int(avg_daily_pnl_raw)
+        sharpe_ratio_raw = field_to_signed_int(sharpe_raw)
+        max_drawdown_raw = field_to_signed_int(drawdown_raw)
+        calmar_ratio_raw = field_to_signed_int(calmar_raw)
+        omega_ratio_raw = field_to_signed_int(omega_raw)
+        sortino_ratio_raw = field_to_signed_int(sortino_raw)
+        stat_confidence_raw = field_to_signed_int(stat_confidence_raw)
+
+        # Process returns merkle root (it's a Field, not signed)
+        returns_merkle_root = f"0x{int(returns_merkle_root_raw):x}"
+
+        avg_daily_pnl_scaled = scale_from_int(avg_daily_pnl_value)
+        avg_daily_pnl_ptn_scaled = avg_daily_pnl_scaled * 365 * 100
+        sharpe_ratio_scaled = scale_from_int(sharpe_ratio_raw)
+        max_drawdown_scaled = scale_from_int(max_drawdown_raw)
+        calmar_ratio_scaled = scale_from_int(calmar_ratio_raw)
+        omega_ratio_scaled = scale_from_int(omega_ratio_raw) / 1000000
+        sortino_ratio_scaled = scale_from_int(sortino_ratio_raw)
+        stat_confidence_scaled = scale_from_int(stat_confidence_raw)
+
+        # Always print key production info: hotkey and verification status
+        bt.logging.info(f"Hotkey: {miner_hotkey}")
+        bt.logging.info(f"Orders processed: {signals_count}")
         bt.logging.info(f"Signals Merkle Root: {signals_merkle_root}")
         bt.logging.info(f"Returns Merkle Root: {returns_merkle_root}")
+        bt.logging.info(f"Average Daily PnL: {avg_daily_pnl_scaled:.9f}")
+        bt.logging.info(f"Sharpe Ratio: {sharpe_ratio_scaled:.9f}")
+        # Convert drawdown factor to percentage: drawdown% = (1 - factor) * 100
+        drawdown_percentage = max_drawdown_scaled * 100
+        bt.logging.info(
+            f"Max Drawdown: {max_drawdown_scaled:.9f} ({drawdown_percentage:.6f}%)"
+        )
+        bt.logging.info(f"Calmar Ratio: {calmar_ratio_scaled:.9f}")
+        bt.logging.info(f"Omega Ratio: {omega_ratio_scaled:.9f}")
+        bt.logging.info(f"Sortino Ratio: {sortino_ratio_scaled:.9f}")
+        bt.logging.info(f"Statistical Confidence: {stat_confidence_scaled:.9f}")
+
+        if verbose:
+            bt.logging.info("\n=== MERKLE ROOTS ===")
+            bt.logging.info(f"Signals Merkle Root: {signals_merkle_root}")
+            bt.logging.info(f"Returns Merkle Root: {returns_merkle_root}")
+
+            bt.logging.info("\n=== DATA SUMMARY ===")
+            bt.logging.info(f"Daily returns processed: {n_returns}")
+            bt.logging.info(f"Trading signals processed: {signals_count}")
+            bt.logging.info("PnL calculated from cumulative returns in circuit")
+
+            bt.logging.info("\n=== WITNESS GENERATION RESULTS ===")
+            bt.logging.info(f"Witness generation time: {witness_time:.3f}s")
+
+            # Circuit vs Subnet Comparison Table (verbose only)
+            if augmented_scores:
+                bt.logging.info(
+                    f"\n=== Circuit vs Subnet Comparison for {miner_hotkey[:8] if miner_hotkey else 'unknown'} ==="
+                )
+                bt.logging.info("Metric           Circuit    Subnet     Diff")
+                bt.logging.info("=" * 50)
+
+                metric_keys = {
+                    "sharpe": sharpe_ratio_scaled,
+                    "calmar": calmar_ratio_scaled,
+                    "sortino": sortino_ratio_scaled,
+                    "omega": omega_ratio_scaled,
+                }
 
-        bt.logging.info("\n=== DATA SUMMARY ===")
-        bt.logging.info(f"Daily returns processed: {n_returns}")
-        bt.logging.info(f"Trading signals processed: {signals_count}")
-        bt.logging.info("PnL calculated from cumulative returns in circuit")
+                for metric, circuit_value in metric_keys.items():
+                    subnet_value = augmented_scores.get(metric, 0.0)
+                    # Handle case where subnet_value is a dictionary with 'value' field
+                    if isinstance(subnet_value, dict):
+                        subnet_value = subnet_value.get("value", 0.0)
+                    diff = abs(circuit_value - subnet_value)
+                    bt.logging.info(
+                        f"{metric:<15} {circuit_value:>10.6f} {subnet_value:>10.6f} {diff:>10.6f}"
+                    )
 
-        bt.logging.info("\n=== PROOF GENERATION RESULTS ===")
-        bt.logging.info(f"Witness generation time: {witness_time:.3f}s")
-        if not witness_only:
-            if prove_time is not None:
-                bt.logging.info(f"Proof generation time: {prove_time:.3f}s")
-            else:
-                bt.logging.info("Unable to prove due to an error.")
+        results = {
+            "merkle_roots": {
+                "signals": signals_merkle_root,
+                "returns": returns_merkle_root,
+            },
+            "portfolio_metrics": {
+                "avg_daily_pnl_raw": avg_daily_pnl_value,
+                "avg_daily_pnl_scaled": avg_daily_pnl_scaled,
+                "avg_daily_pnl_ptn_scaled": avg_daily_pnl_ptn_scaled,
+                "sharpe_ratio_raw": sharpe_ratio_raw,
+                "sharpe_ratio_scaled": sharpe_ratio_scaled,
+                "max_drawdown_raw": max_drawdown_raw,
+                "max_drawdown_scaled": max_drawdown_scaled,
+                "max_drawdown_percentage": max_drawdown_scaled * 100,
+                "calmar_ratio_raw": calmar_ratio_raw,
+                "calmar_ratio_scaled": calmar_ratio_scaled,
+                "omega_ratio_raw": omega_ratio_raw,
+                "omega_ratio_scaled": omega_ratio_scaled,
+                "sortino_ratio_raw": sortino_ratio_raw,
+                "sortino_ratio_scaled": sortino_ratio_scaled,
+                "stat_confidence_raw": stat_confidence_raw,
+                "stat_confidence_scaled": stat_confidence_scaled,
+            },
+            "data_summary": {
+                "daily_returns_processed": n_returns,
+                "signals_processed": signals_count,
+                "signals_total": signals_total,
+                "signals_window": window,
+                "returns_processed": n_returns,
+                "circuit_tier": tier,
+            },
+            "circuit_inputs": {
+                "daily_log_returns": daily_log_returns,
+                "weights_float": weights_float,
+                "scaled_weights": scaled_weights,
+                "scaled_daily_pnl": scaled_daily_pnl,
+                "scaled_daily_returns": scaled_log_returns,
+                "scaled_checkpoint_returns": scaled_checkpoint_returns,
+                "scaled_checkpoint_mdds": scaled_checkpoint_mdds,
+                "n_returns": n_returns,
+                "n_pnl": n_pnl,
+                "checkpoint_count": checkpoint_count,
+                "signals_count": signals_count,
+                "sum_of_weights": sum(weights_float) if weights_float else 0,
+                "weights_count": len(weights_float) if weights_float else 0,
+            },
+            "proof_results": {
+                "witness_generation_time": witness_time,
+                "witness_cached": witness_cached,
+                "preview": preview,
+            },
+        }
 
-        # Circuit vs Subnet Comparison Table (verbose only)
-        if augmented_scores:
+        input_store = InputStore.from_env()
+        if input_store is not None:
+            # Keep digests and counts inline; the arrays go to a side file
+            try:
+                with timer.stage("inputs_store"):
+                    results["circuit_inputs"] = input_store.put(
+                        results["circuit_inputs"]
+                    )
+            except OSError as e:
+                bt.logging.warning(f"Failed to store circuit inputs: {e}")
+
+        return {
+            "miner_hotkey": miner_hotkey,
+            "workspace": workspace,
+            "witness_file": witness_file,
+            "circuit_file": circuit_file,
+            "witness_only": witness_only,
+            "verbose": verbose,
+            "wallet": wallet,
+            "testnet": testnet,
+            "results": results,
+            "timer": timer,
+        }
+    except BaseException:
+        # The job only takes the workspace over once it is returned
+        if workspace is not None:
+            workspace.cleanup()
+        raise
+
+
+def finish_proof(job, bb_threads=None, proof_hex=None):
+    """
+    Second stage of generate_proof: prove a witness job with bb (or reuse a
+    stored proof), upload the proof and save the results.
+
+    Args:
+        job: Witness job returned by generate_witness
+        bb_threads: Thread budget for bb prove (defaults to all cores)
+        proof_hex: Also return the proof as hex (defaults to POP_PROOF_HEX)
+
+    Returns:
+        dict: The same results dictionary generate_proof returns
+    """
+    miner_hotkey = job["miner_hotkey"]
+    workspace = job["workspace"]
+    witness_only = job["witness_only"]
+    verbose = job["verbose"]
+    wallet = job["wallet"]
+    testnet = job["testnet"]
+    results = job["results"]
+    timer = job["timer"]
+    # Time spent queued between the two stages is not a stage
+    timer.skip()
+
+    try:
+        proof_cached = False
+        if witness_only:
+            prove_time, proving_success = None, True
+            log_verbose(
+                verbose,
+                "info",
+                "Skipping barretenberg proof generation (witness_only=True)",
+            )
+        else:
+            proof_store = ProofStore.from_env()
+            stored_proof_key = None
+            if proof_store is not None:
+                try:
+                    with timer.stage("proof_store_lookup"):
+                        stored_proof_key = proof_key(
+                            job["circuit_file"],
+                            os.path.join(workspace.path, "vk", "vk"),
+                            job["witness_file"],
+                        )
+                        proof_cached = proof_store.get(
+                            stored_proof_key, workspace.proof_dir
+                        )
+                except OSError as e:
+                    bt.logging.warning(f"Proof store lookup failed: {e}")
+
+        if proof_cached:
+            prove_time, proving_success = 0.0, True
+            log_verbose(
+                verbose,
+                "info",
+                f"Proof store hit ({stored_proof_key[:12]}), skipping bb",
+            )
+        elif not witness_only:
             bt.logging.info(
-                f"\n=== Circuit vs Subnet Comparison for {miner_hotkey[:8] if miner_hotkey else 'unknown'} ==="
+                f"Starting barretenberg proof generation for {miner_hotkey[:8]}..."
             )
-            bt.logging.info("Metric           Circuit    Subnet     Diff")
-            bt.logging.info("=" * 50)
-
-            metric_keys = {
-                "sharpe": sharpe_ratio_scaled,
-                "calmar": calmar_ratio_scaled,
-                "sortino": sortino_ratio_scaled,
-                "omega": omega_ratio_scaled,
-            }
-
-            for metric, circuit_value in metric_keys.items():
-                subnet_value = augmented_scores.get(metric, 0.0)
-                # Handle case where subnet_value is a dictionary with 'value' field
-                if isinstance(subnet_value, dict):
-                    subnet_value = subnet_value.get("value", 0.0)
-                diff = abs(circuit_value - subnet_value)
+            try:
+                with timer.stage("bb_prove"):
+                    prove_time, proving_success = generate_bb_proof(
+                        workspace.path, bb_threads=bb_threads
+                    )
                 bt.logging.info(
-                    f"{metric:<15} {circuit_value:>10.6f} {subnet_value:>10.6f} {diff:>10.6f}"
+                    f"generate_bb_proof returned: prove_time={prove_time}, proving_success={proving_success}"
                 )
+                if prove_time is None:
+                    bt.logging.error(
+                        "Barretenberg proof generation failed - prove_time is None"
+                    )
+                    prove_time, proving_success = None, False
+                elif not proving_success:
+                    bt.logging.error(
+                        "Barretenberg proof generation failed - proving_success is False"
+                    )
+            except Exception as e:
+                bt.logging.error(
+                    f"Exception during proof generation: {type(e).__name__}: {e}"
+                )
+                bt.logging.error(f"Full traceback: {traceback.format_exc()}")
+                prove_time, proving_success = None, False
 
-    # Read proof and public inputs files to return as hex strings
-    proof_hex = None
-    public_inputs_hex = None
-
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    main_circuit_dir = os.path.join(current_dir, "circuits")
-
-    if prove_time is not None or witness_only:
-        proof_path = os.path.join(main_circuit_dir, "proof", "proof")
-        public_inputs_path = os.path.join(main_circuit_dir, "proof", "public_inputs")
+            if proving_success and stored_proof_key:
+                try:
+                    with timer.stage("proof_store_store"):
+                        proof_store.put(stored_proof_key, workspace.proof_dir)
+                except OSError as e:
+                    bt.logging.warning(f"Failed to store proof: {e}")
+
+        if verbose:
+            bt.logging.info("\n--- Proof Generation Complete ---")
+            if not witness_only:
+                if prove_time is not None:
+                    bt.logging.info(f"Proof generation time: {prove_time:.3f}s")
+                else:
+                    bt.logging.info("Unable to prove due to an error.")
+
+        # Proof data stays binary; hex is only added on request
+        proof = None
+        public_inputs = None
+
+        timer.skip()
+        if prove_time is not None or witness_only:
+            proof_path = os.path.join(workspace.proof_dir, "proof")
+            public_inputs_path = os.path.join(workspace.proof_dir, "public_inputs")
 
-        try:
-            if os.path.exists(proof_path):
-                with open(proof_path, "rb") as f:
-                    proof_hex = f.read().hex()
+            try:
+                if os.path.exists(proof_path):
+                    with open(proof_path, "rb") as f:
+                        proof = f.read()
 
-            if os.path.exists(public_inputs_path):
-                with open(public_inputs_path, "rb") as f:
-                    public_inputs_hex = f.read().hex()
-        except Exception as e:
-            bt.logging.error(f"Error reading proof files: {str(e)}")
+                if os.path.exists(public_inputs_path):
+                    with open(public_inputs_path, "rb") as f:
+                        public_inputs = f.read()
+            except Exception as e:
+                bt.logging.error(f"Error reading proof files: {str(e)}")
+        timer.mark("read_proof_files")
+    finally:
+        workspace.cleanup()
 
     # Upload proof if wallet provided and proof generation was successful
     upload_result = None
+    upload_queued = False
     bt.logging.info(
-        f"[MAIN] Pre-upload check: wallet={bool(wallet)}, proof_hex={bool(proof_hex)} (len={len(proof_hex) if proof_hex else 0}), public_inputs_hex={bool(public_inputs_hex)} (len={len(public_inputs_hex) if public_inputs_hex else 0}), witness_only={witness_only}"
+        f"[MAIN] Pre-upload check: wallet={bool(wallet)}, proof={bool(proof)} (len={len(proof) if proof else 0}), public_inputs={bool(public_inputs)} (len={len(public_inputs) if public_inputs else 0}), witness_only={witness_only}"
     )
 
-    if wallet and proof_hex and public_inputs_hex and not witness_only:
+    if wallet and proof and public_inputs and not witness_only:
         bt.logging.info(
-            f"[MAIN] All conditions met, calling upload_proof with testnet={testnet}"
+            f"[MAIN] All conditions met, queueing upload with testnet={testnet}"
         )
-        upload_result = upload_proof(proof_hex, public_inputs_hex, wallet, testnet)
+        with timer.stage("upload"):
+            upload = queue_upload(
+                proof,
+                public_inputs,
+                wallet,
+                testnet,
+                results["data_summary"]["circuit_tier"],
+            )
+            upload_queued = upload is not None
+            if upload_queued and sync_uploads():
+                upload_result = upload.result()
+                upload_queued = False
     else:
         bt.logging.warning("[MAIN] Skipping upload - conditions not met:")
         if not wallet:
             bt.logging.warning("[MAIN]   - wallet is None/False")
-        if not proof_hex:
-            bt.logging.warning("[MAIN]   - proof_hex is None/False")
-        if not public_inputs_hex:
-            bt.logging.warning("[MAIN]   - public_inputs_hex is None/False")
+        if not proof:
+            bt.logging.warning("[MAIN]   - proof is None/False")
+        if not public_inputs:
+            bt.logging.warning("[MAIN]   - public_inputs is None/False")
         if witness_only:
             bt.logging.warning("[MAIN]   - witness_only is True")
 
-    bt.logging.info(f"[MAIN] Proof upload result: {upload_result}")
-
-    # Build results dictionary
-    results = {
-        "merkle_roots": {
-            "signals": signals_merkle_root,
-            "returns": returns_merkle_root,
-        },
-        "portfolio_metrics": {
-            "avg_daily_pnl_raw": avg_daily_pnl_value,
-            "avg_daily_pnl_scaled": avg_daily_pnl_scaled,
-            "avg_daily_pnl_ptn_scaled": avg_daily_pnl_ptn_scaled,
-            "sharpe_ratio_raw": sharpe_ratio_raw,
-            "sharpe_ratio_scaled": sharpe_ratio_scaled,
-            "max_drawdown_raw": max_drawdown_raw,
-            "max_drawdown_scaled": max_drawdown_scaled,
-            "max_drawdown_percentage": max_drawdown_scaled * 100,
-            "calmar_ratio_raw": calmar_ratio_raw,
-            "calmar_ratio_scaled": calmar_ratio_scaled,
-            "omega_ratio_raw": omega_ratio_raw,
-            "omega_ratio_scaled": omega_ratio_scaled,
-            "sortino_ratio_raw": sortino_ratio_raw,
-            "sortino_ratio_scaled": sortino_ratio_scaled,
-            "stat_confidence_raw": stat_confidence_raw,
-            "stat_confidence_scaled": stat_confidence_scaled,
-        },
-        "data_summary": {
-            "daily_returns_processed": n_returns,
-            "signals_processed": signals_count,
-            "returns_processed": n_returns,
-        },
-        "circuit_inputs": {
-            "daily_log_returns": daily_log_returns,
-            "weights_float": weights_float,
-            "scaled_weights": scaled_weights,
-            "scaled_daily_pnl": scaled_daily_pnl,
-            "scaled_daily_returns": scaled_log_returns,
-            "scaled_checkpoint_returns": scaled_checkpoint_returns,
-            "scaled_checkpoint_mdds": scaled_checkpoint_mdds,
-            "n_returns": n_returns,
-            "n_pnl": n_pnl,
-            "checkpoint_count": checkpoint_count,
-            "signals_count": signals_count,
-            "sum_of_weights": sum(weights_float) if weights_float else 0,
-            "weights_count": len(weights_float) if weights_float else 0,
-        },
-        "proof_results": {
-            "witness_generation_time": witness_time,
+    if upload_queued:
+        bt.logging.info("[MAIN] Proof queued for background upload")
+    else:
+        bt.logging.info(f"[MAIN] Proof upload result: {upload_result}")
+
+    results["proof_results"].update(
+        {
             "proof_generation_time": prove_time,
             "proving_success": proving_success,
             "proof_generated": prove_time is not None or witness_only,
-            "proof_hex": proof_hex,
-            "public_inputs_hex": public_inputs_hex,
+            "proof": proof,
+            "public_inputs": public_inputs,
             "upload_result": upload_result,
-        },
-    }
+            "upload_queued": upload_queued,
+            "circuit_tier": results["data_summary"]["circuit_tier"],
+            "proof_store": {"hit": proof_cached, **proof_store_stats()},
+            "stages": timer.stages,
+        }
+    )
+    if want_hex(proof_hex):
+        results["proof_results"]["proof_hex"] = to_hex(proof)
+        results["proof_results"]["public_inputs_hex"] = to_hex(public_inputs)
 
     if miner_hotkey:
-        save_zk_results(results, miner_hotkey)
+        with timer.stage("save_results"):
+            save_zk_results(results, miner_hotkey)
+
+    try:
+        export_stages(timer.stages, {"hotkey": miner_hotkey})
+    except OSError as e:
+        bt.logging.warning(f"Failed to export stage metrics: {e}")
 
     return results
+
+
+def generate_proof(
+    data=None,
+    daily_pnl=None,
+    miner_hotkey=None,
+    verbose=None,
+    vali_config=None,
+    use_weighting=False,
+    bypass_confidence=False,
+    daily_checkpoints=2,
+    witness_only=False,
+    account_size=None,
+    wallet=None,
+    testnet=True,
+    augmented_scores=None,
+    bb_threads=None,
+    preview=False,
+    proof_hex=None,
+):
+    """
+    Generate a proof of a miner's portfolio metrics.
+
+    With preview=True only the metrics are computed, in Python and identical
+    to the circuit outputs: no witness, proof, upload, signals Merkle tree or
+    saved results.
+
+    The proof and public inputs are returned as bytes in proof_results;
+    proof_hex=True (or POP_PROOF_HEX) adds their hex strings as well.
+    """
+    job = generate_witness(
+        data=data,
+        daily_pnl=daily_pnl,
+        miner_hotkey=miner_hotkey,
+        verbose=verbose,
+        vali_config=vali_config,
+        use_weighting=use_weighting,
+        bypass_confidence=bypass_confidence,
+        daily_checkpoints=daily_checkpoints,
+        witness_only=witness_only,
+        account_size=account_size,
+        wallet=wallet,
+        testnet=testnet,
+        augmented_scores=augmented_scores,
+        preview=preview,
+    )
+    if preview:
+        job["results"]["proof_results"].update(
+            {"proof_generated": False, "stages": job["timer"].stages}
+        )
+        return job["results"]
+    return finish_proof(job, bb_threads=bb_threads, proof_hex=proof_hex)
@@ -0,0 +1,153 @@
+"""
+Content-addressed store of generated proofs.
+
+A proof is fully determined by the compiled circuit, the verification key and
+the witness, so proofs are stored under a digest of those three and returned
+again without running `bb prove`. Entries expire after a TTL and the oldest
+ones are dropped once the store holds more than its capacity.
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+PROOF_FILES = ("proof", "public_inputs")
+
+_stats = {"hits": 0, "misses": 0}
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ["true", "1", "yes"]
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def witness_digest(witness_path):
+    """
+    Digest of the decompressed witness, so gzip header differences between
+    runs do not change the key.
+    """
+    with gzip.open(witness_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def proof_key(circuit_file, vk_file, witness_file):
+    digest = hashlib.sha256()
+    digest.update(file_digest(circuit_file).encode())
+    digest.update(file_digest(vk_file).encode())
+    digest.update(witness_digest(witness_file).encode())
+    return digest.hexdigest()
+
+
+def stats():
+    """Hit/miss counters for this process."""
+    return dict(_stats)
+
+
+class ProofStore:
+    """
+    On-disk proof store with capacity and TTL limits.
+
+    Args:
+        store_dir: Store location (defaults to ~/.pop/proof_store)
+        max_entries: Maximum number of stored proofs
+        ttl_seconds: Age after which a stored proof is ignored and removed
+    """
+
+    def __init__(
+        self,
+        store_dir=None,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        ttl_seconds=DEFAULT_TTL_SECONDS,
+    ):
+        self.store_dir = Path(store_dir or Path.home() / ".pop" / "proof_store")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """
+        Store configured from POP_PROOF_STORE_DIR, POP_PROOF_STORE_MAX_ENTRIES and
+        POP_PROOF_STORE_TTL_HOURS, or None when POP_PROOF_STORE_DISABLE is set.
+        """
+        if _env_flag("POP_PROOF_STORE_DISABLE"):
+            return None
+        max_entries = os.environ.get("POP_PROOF_STORE_MAX_ENTRIES")
+        ttl_hours = os.environ.get("POP_PROOF_STORE_TTL_HOURS")
+        return cls(
+            os.environ.get("POP_PROOF_STORE_DIR"),
+            int(max_entries) if max_entries else DEFAULT_MAX_ENTRIES,
+            float(ttl_hours) * 3600 if ttl_hours else DEFAULT_TTL_SECONDS,
+        )
+
+    def _expired(self, entry, now=None):
+        now = now or time.time()
+        return now - entry.stat().st_mtime > self.ttl_seconds
+
+    def get(self, key, proof_dir):
+        """
+        Copy a stored proof into `proof_dir`.
+
+        Returns:
+            bool: True on a hit, False on a miss (counted in stats())
+        """
+        entry = self.store_dir / key
+        try:
+            if self._expired(entry):
+                shutil.rmtree(entry, ignore_errors=True)
+                raise FileNotFoundError(entry)
+            os.makedirs(proof_dir, exist_ok=True)
+            for name in PROOF_FILES:
+                shutil.copyfile(entry / name, os.path.join(proof_dir, name))
+        except OSError:
+            _stats["misses"] += 1
+            return False
+
+        _stats["hits"] += 1
+        return True
+
+    def put(self, key, proof_dir):
+        """Store the proof files from `proof_dir`, then prune the store."""
+        entry = self.store_dir / key
+        if entry.exists():
+            return
+
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.store_dir))
+        try:
+            for name in PROOF_FILES:
+                shutil.copyfile(os.path.join(proof_dir, name), tmp_dir / name)
+            os.rename(tmp_dir, entry)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        self.prune()
+
+    def prune(self):
+        """Remove expired entries and the oldest ones beyond max_entries."""
+        now = time.time()
+        entries = []
+        for entry in self.store_dir.iterdir():
+            if entry.name.startswith(".tmp-"):
+                continue
+            try:
+                if self._expired(entry, now):
+                    shutil.rmtree(entry, ignore_errors=True)
+                else:
+                    entries.append((entry.stat().st_mtime, entry))
+            except OSError:
+                continue
+
+        entries.sort()
+        for _, entry in entries[: max(0, len(entries) - self.max_entries)]:
+            shutil.rmtree(entry, ignore_errors=True)
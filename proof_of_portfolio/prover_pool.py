@@ -0,0 +1,215 @@
+"""
+Long-lived pool of pre-warmed prover processes.
+
+Workers are started once (forkserver where available, spawn otherwise) with
+the heavy imports already loaded, and are reused across proofs. Submissions
+are bounded: once `max_pending` jobs are queued or running, submit() blocks
+until a slot frees up. If a worker dies (e.g. OOM-killed mid-proof), the jobs
+it held fail with BrokenProcessPool and the next submission starts a fresh set
+of workers.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bittensor as bt
+
+WARM_IMPORTS = ["bittensor", "numpy", "scipy", "proof_of_portfolio"]
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when no submission slot frees up within the requested timeout."""
+
+
+def _warm_worker():
+    """Import the heavy dependencies so the first job in a worker pays no import cost."""
+    for module in WARM_IMPORTS:
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+    return os.getpid()
+
+
+def _default_start_method():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return "forkserver"
+    return "spawn"
+
+
+class ProverPool:
+    """
+    Reusable process pool with a bounded submission queue.
+
+    Args:
+        max_workers: Number of worker processes (defaults to min(4, os.cpu_count()));
+            bb already parallelises each proof, so more workers mostly add memory
+        max_pending: Maximum jobs queued or running at once (defaults to 2 * max_workers)
+        start_method: "forkserver" or "spawn" (defaults to forkserver when available)
+        warm: Start all workers and load imports immediately instead of on first use
+    """
+
+    def __init__(
+        self, max_workers=None, max_pending=None, start_method=None, warm=True
+    ):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending or 2 * self.max_workers
+        self.start_method = start_method or _default_start_method()
+
+        self._executor = self._new_executor()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._closed = False
+
+        if warm:
+            self.warm()
+
+    def _new_executor(self):
+        context = multiprocessing.get_context(self.start_method)
+        if self.start_method == "forkserver":
+            context.set_forkserver_preload(WARM_IMPORTS)
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_warm_worker,
+        )
+
+    @property
+    def broken(self):
+        """True once a worker died and the executor stopped accepting jobs."""
+        return bool(getattr(self._executor, "_broken", False))
+
+    def _rebuild(self, executor):
+        """Replace `executor` with a fresh one unless another thread already did."""
+        with self._lock:
+            if self._executor is not executor or self._closed:
+                return
+            bt.logging.warning(
+                "⚠️ [PROVER POOL] A worker died, restarting the prover processes"
+            )
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+
+    @property
+    def pending(self):
+        """Number of jobs currently queued or running."""
+        return self._pending
+
+    def warm(self):
+        """Start every worker process and wait until each has loaded its imports."""
+        futures = [self._executor.submit(_warm_worker) for _ in range(self.max_workers)]
+        return sorted({future.result() for future in futures})
+
+    def submit(self, fn, *args, timeout=None, **kwargs):
+        """
+        Submit a job, blocking while the pool already holds max_pending jobs.
+
+        Args:
+            fn: Picklable callable to run in a worker
+            timeout: Seconds to wait for a free slot (None waits forever)
+
+        Returns:
+            concurrent.futures.Future for the job result
+        """
+        if self._closed:
+            raise RuntimeError("ProverPool has been shut down")
+
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolSaturatedError(
+                f"No free slot after {timeout}s ({self.max_pending} jobs pending)"
+            )
+
+        with self._lock:
+            self._pending += 1
+        try:
+            executor = self._executor
+            if self.broken:
+                self._rebuild(executor)
+                executor = self._executor
+            try:
+                future = executor.submit(fn, *args, **kwargs)
+            except BrokenProcessPool:
+                self._rebuild(executor)
+                future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """Stop accepting jobs and shut the worker processes down."""
+        self._closed = True
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _env_int(name):
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+def _new_pool(max_workers=None, max_pending=None, start_method=None):
+    return ProverPool(
+        max_workers=max_workers or _env_int("POP_PROVER_WORKERS"),
+        max_pending=max_pending or _env_int("POP_PROVER_MAX_PENDING"),
+        start_method=start_method,
+    )
+
+
+def configure_prover_pool(max_workers=None, max_pending=None, start_method=None):
+    """
+    Replace the shared pool used by prove() with one using the given settings.
+
+    Unset values fall back to POP_PROVER_WORKERS / POP_PROVER_MAX_PENDING and then
+    to the ProverPool defaults. Any previous shared pool is shut down first.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = _new_pool(max_workers, max_pending, start_method)
+        return _pool
+
+
+def get_prover_pool():
+    """Return the shared pool, creating it on first use and restarting dead workers."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _new_pool()
+        elif _pool.broken:
+            _pool._rebuild(_pool._executor)
+        return _pool
+
+
+def shutdown_prover_pool(wait=True, cancel_futures=False):
+    """Shut down the shared pool if one was started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+            _pool = None
+
+
+atexit.register(shutdown_prover_pool)
@@ -0,0 +1,73 @@
+"""
+Streaming Prover.toml writer.
+
+Writes circuit inputs in the TOML subset nargo reads (quoted scalars, inline
+arrays, arrays of tables) directly to a file. Values may be ints or strings;
+each array is formatted with a single join instead of building a quoted
+string per element in an intermediate document like `toml.dump` does.
+"""
+
+import json
+
+_SAFE_STRING_CHARS = frozenset('"\\\n\r\t')
+
+
+def _quote(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    value = str(value)
+    if _SAFE_STRING_CHARS.isdisjoint(value):
+        return f'"{value}"'
+    return json.dumps(value)
+
+
+def _array(values):
+    if not values:
+        return "[]"
+    first = values[0]
+    if isinstance(first, (list, tuple)):
+        return "[" + ", ".join(_array(v) for v in values) + "]"
+    if isinstance(first, bool):
+        return "[" + ", ".join(_quote(v) for v in values) + "]"
+    return '["' + '", "'.join(map(str, values)) + '"]'
+
+
+def _is_table_array(value):
+    return isinstance(value, (list, tuple)) and value and isinstance(value[0], dict)
+
+
+def write_prover_toml(f, inputs):
+    """
+    Stream circuit inputs to an open text file in Prover.toml format.
+
+    Args:
+        f: Writable text file
+        inputs: Mapping of input name to a scalar, a (nested) list of scalars or
+            a list of dicts (written as an array of tables)
+    """
+    tables = []
+    for name, value in inputs.items():
+        if _is_table_array(value):
+            tables.append((name, value))
+        elif isinstance(value, (list, tuple)):
+            f.write(f"{name} = {_array(value)}\n")
+        else:
+            f.write(f"{name} = {_quote(value)}\n")
+
+    # Tables must come after every top-level key
+    for name, rows in tables:
+        header = f"\n[[{name}]]\n"
+        for row in rows:
+            f.write(header)
+            f.write(
+                "".join(
+                    f"{key} = {_array(v) if isinstance(v, (list, tuple)) else _quote(v)}\n"
+                    for key, v in row.items()
+                )
+            )
+
+
+def dump_prover_toml(inputs, path):
+    """Write circuit inputs to a Prover.toml file at `path`."""
+    with open(path, "w", buffering=1 << 20) as f:
+        write_prover_toml(f, inputs)
@@ -0,0 +1,337 @@
+"""
+SQLite index of the results saved under ~/.pop.
+
+save_zk_results and save_instant_mdd_results write one JSON file per run.
+Instead of globbing, stat-ing and parsing every file of a hotkey on each
+lookup, every saved file gets a row in ~/.pop/results.db (or
+POP_RESULTS_INDEX) holding its hotkey, timestamp and path plus a summary:
+the merkle roots and metrics of a proof, or the whole result of an instant
+MDD run. The latest row per hotkey is kept in its own table, so latest-result
+lookups are a primary key read, and an in-memory LRU in front of it serves
+hot hotkeys without touching the database.
+
+Files the index has not seen (saved before it existed, with it disabled or
+by an older version) are imported on lookup whenever the modification time
+of their directory changed since the last import. POP_RESULTS_INDEX_DISABLE
+turns the index off; lookups then scan the files as before.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+KINDS = ("zk", "instant_mdd")
+DEFAULT_CACHE_SIZE = 1024
+# Directories modified this recently are scanned again on the next lookup:
+# mtimes can be coarse and a file may still be being written
+SETTLE_SECONDS = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    kind TEXT NOT NULL,
+    hotkey TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    saved_at REAL NOT NULL,
+    path TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    PRIMARY KEY (kind, path)
+);
+CREATE INDEX IF NOT EXISTS results_by_hotkey
+    ON results (kind, hotkey, timestamp, saved_at);
+CREATE TABLE IF NOT EXISTS latest (
+    kind TEXT NOT NULL,
+    hotkey TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    saved_at REAL NOT NULL,
+    path TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    PRIMARY KEY (kind, hotkey)
+);
+DROP TABLE IF EXISTS imported;
+CREATE TABLE IF NOT EXISTS imports (
+    kind TEXT NOT NULL,
+    directory TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    PRIMARY KEY (kind, directory)
+);
+"""
+_COLUMNS = "hotkey, timestamp, saved_at, path, summary"
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ["true", "1", "yes"]
+
+
+def summarize(kind, results):
+    """The part of a saved result the index answers lookups with."""
+    if kind == "zk":
+        return {
+            "merkle_roots": results.get("merkle_roots"),
+            "portfolio_metrics": results.get("portfolio_metrics"),
+        }
+    return results
+
+
+def file_timestamp(path):
+    """Timestamp encoded in a `<hotkey>_<timestamp>.json` file name."""
+    return int(Path(path).stem.rsplit("_", 1)[1])
+
+
+def _row(values):
+    hotkey, timestamp, saved_at, path, summary = values
+    return {
+        "hotkey": hotkey,
+        "timestamp": timestamp,
+        "saved_at": saved_at,
+        "path": path,
+        "summary": json.loads(summary),
+    }
+
+
+class ResultsIndex:
+    """
+    Args:
+        path: Database file (defaults to ~/.pop/results.db)
+        cache_size: Latest rows kept in memory
+    """
+
+    def __init__(self, path=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.path = Path(path or Path.home() / ".pop" / "results.db")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._scanned = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(self.path), timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._data_version = self._current_data_version()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Index at POP_RESULTS_INDEX, or None when POP_RESULTS_INDEX_DISABLE is
+        set.
+        """
+        if _env_flag("POP_RESULTS_INDEX_DISABLE"):
+            return None
+        return cls(os.environ.get("POP_RESULTS_INDEX"))
+
+    def _current_data_version(self):
+        return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def _check_cache(self):
+        # data_version changes when another connection (e.g. a prover worker
+        # process) commits, which may have made cached rows stale
+        version = self._current_data_version()
+        if version != self._data_version:
+            self._cache.clear()
+            self._data_version = version
+
+    def _insert(self, kind, hotkey, timestamp, saved_at, path, summary):
+        values = (kind, hotkey, timestamp, saved_at, str(path), json.dumps(summary))
+        self._db.execute(
+            f"INSERT OR REPLACE INTO results (kind, {_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+            values,
+        )
+        self._db.execute(
+            f"""
+            INSERT INTO latest (kind, {_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (kind, hotkey) DO UPDATE SET
+                timestamp = excluded.timestamp,
+                saved_at = excluded.saved_at,
+                path = excluded.path,
+                summary = excluded.summary
+            WHERE (excluded.timestamp, excluded.saved_at) >= (timestamp, saved_at)
+            """,
+            values,
+        )
+
+    def record(self, kind, hotkey, path, results, timestamp=None, saved_at=None):
+        """Add a saved result file to the index in one transaction."""
+        path = Path(path)
+        timestamp = file_timestamp(path) if timestamp is None else timestamp
+        saved_at = path.stat().st_mtime if saved_at is None else saved_at
+        with self._lock:
+            with self._db:
+                self._db.execute("BEGIN IMMEDIATE")
+                self._insert(
+                    kind, hotkey, timestamp, saved_at, path, summarize(kind, results)
+                )
+            self._cache.pop((kind, hotkey), None)
+            self._data_version = self._current_data_version()
+
+    def _refresh_latest(self, kind, hotkey):
+        self._db.execute(
+            "DELETE FROM latest WHERE kind = ? AND hotkey = ?", (kind, hotkey)
+        )
+        self._db.execute(
+            f"""
+            INSERT INTO latest (kind, {_COLUMNS})
+            SELECT kind, {_COLUMNS} FROM results WHERE kind = ? AND hotkey = ?
+            ORDER BY timestamp DESC, saved_at DESC LIMIT 1
+            """,
+            (kind, hotkey),
+        )
+
+    def remove(self, kind, hotkey, paths):
+        """Drop rows whose files are gone, keeping the latest row correct."""
+        with self._lock:
+            with self._db:
+                self._db.execute("BEGIN IMMEDIATE")
+                self._db.executemany(
+                    "DELETE FROM results WHERE kind = ? AND path = ?",
+                    [(kind, str(path)) for path in paths],
+                )
+                self._refresh_latest(kind, hotkey)
+            self._cache.pop((kind, hotkey), None)
+            self._data_version = self._current_data_version()
+
+    def import_directory(self, kind, directory):
+        """
+        Index the `<hotkey>_<timestamp>.json` files of a results directory
+        that have no row yet.
+
+        The directory is only listed when its modification time changed
+        since the last import (by any process), so repeated lookups cost a
+        stat.
+        """
+        directory = Path(directory)
+        try:
+            mtime_ns = directory.stat().st_mtime_ns
+        except OSError:
+            return
+        key = (kind, str(directory))
+        if self._scanned.get(key) == mtime_ns:
+            return
+        settled = time.time() - mtime_ns / 1e9 > SETTLE_SECONDS
+        with self._lock:
+            imported = self._db.execute(
+                "SELECT mtime_ns FROM imports WHERE kind = ? AND directory = ?", key
+            ).fetchone()
+            if not imported or imported[0] != mtime_ns:
+                with self._db:
+                    self._db.execute("BEGIN IMMEDIATE")
+                    indexed = {
+                        path
+                        for (path,) in self._db.execute(
+                            "SELECT path FROM results WHERE kind = ?", (kind,)
+                        )
+                    }
+                    for path in directory.glob("*_*.json"):
+                        if str(path) in indexed:
+                            continue
+                        try:
+                            with open(path, "r") as f:
+                                results = json.load(f)
+                            self._insert(
+                                kind,
+                                path.stem.rsplit("_", 1)[0],
+                                file_timestamp(path),
+                                path.stat().st_mtime,
+                                path,
+                                summarize(kind, results),
+                            )
+                        except (OSError, ValueError, IndexError, AttributeError):
+                            continue
+                    if settled:
+                        self._db.execute(
+                            "INSERT OR REPLACE INTO imports VALUES (?, ?, ?)",
+                            (*key, mtime_ns),
+                        )
+                self._cache.clear()
+                self._data_version = self._current_data_version()
+            if settled:
+                self._scanned[key] = mtime_ns
+
+    def latest(self, kind, hotkey):
+        """
+        Latest indexed result of a hotkey.
+
+        Returns:
+            dict: hotkey, timestamp, saved_at, path and summary, or None
+        """
+        key = (kind, hotkey)
+        with self._lock:
+            self._check_cache()
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            values = self._db.execute(
+                f"SELECT {_COLUMNS} FROM latest WHERE kind = ? AND hotkey = ?", key
+            ).fetchone()
+            row = _row(values) if values else None
+            self._cache[key] = row
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return row
+
+    def all(self, kind, hotkey):
+        """Every indexed result of a hotkey, newest first."""
+        with self._lock:
+            rows = self._db.execute(
+                f"""
+                SELECT {_COLUMNS} FROM results WHERE kind = ? AND hotkey = ?
+                ORDER BY timestamp DESC, saved_at DESC
+                """,
+                (kind, hotkey),
+            ).fetchall()
+        return [_row(values) for values in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_index = None
+_index_key = None
+_index_lock = threading.Lock()
+
+
+def get_results_index():
+    """
+    Shared index of this process for the current environment, or None when
+    disabled or unusable.
+    """
+    global _index, _index_key
+    if _env_flag("POP_RESULTS_INDEX_DISABLE"):
+        return None
+    key = (os.getpid(), os.environ.get("POP_RESULTS_INDEX"), str(Path.home()))
+    with _index_lock:
+        if _index is None or _index_key != key:
+            try:
+                _index = ResultsIndex.from_env()
+            except (OSError, sqlite3.Error):
+                return None
+            _index_key = key
+        return _index
+
+
+def latest_row(index, kind, directory, hotkey):
+    """
+    Latest row of a hotkey whose file still exists, importing new files of
+    `directory` first. Rows of deleted files are dropped on the way.
+    """
+    index.import_directory(kind, directory)
+    row = index.latest(kind, hotkey)
+    while row is not None and not os.path.exists(row["path"]):
+        index.remove(kind, hotkey, [row["path"]])
+        row = index.latest(kind, hotkey)
+    return row
+
+
+def hotkey_rows(index, kind, directory, hotkey):
+    """Rows of a hotkey whose files still exist, newest first."""
+    index.import_directory(kind, directory)
+    rows = index.all(kind, hotkey)
+    missing = {row["path"] for row in rows if not os.path.exists(row["path"])}
+    if missing:
+        index.remove(kind, hotkey, missing)
+    return [row for row in rows if row["path"] not in missing]
@@ -0,0 +1,450 @@
+"""
+Retention of the files accumulating under ~/.pop.
+
+save_zk_results and save_instant_mdd_results write a new JSON file per run,
+and the upload spool keeps a record of every sent proof and the entry and
+proof blobs of every proof it gave up on. A RetentionPolicy bounds these
+files with any combination of:
+
+  - POP_RETAIN_LAST: files kept per hotkey and kind (results, sent and
+    failed spool entries)
+  - POP_RETAIN_MAX_AGE_HOURS: maximum age of a file
+  - POP_RETAIN_MAX_MB: total size of all of them
+
+The newest file of every hotkey and kind is always kept, so the
+get_*_for_miner lookups keep answering with the latest result; a byte budget
+the newest files alone exceed is therefore not met. Proof blobs count towards
+the size of their result or spool entry and are evicted with it.
+
+Circuit input side files (~/.pop/inputs/*.npz, see inputs_store.py) are
+shared between results, so they are not evicted by age or budget: a side file
+goes once no kept result refers to it and it has not been used for
+INPUTS_GRACE seconds, which leaves it to proofs still being generated.
+
+A ResultsCompactor applies the policy every POP_RETENTION_INTERVAL seconds
+(default 600) in a background thread of the process calling prove(),
+prove_many(), prove_sync() or prove_instant_mdd(), never in prover pool
+workers. It removes evicted results from the results index and logs how many
+entries it evicted and kept.
+"""
+
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict, namedtuple
+from pathlib import Path
+
+import bittensor as bt
+
+from .blobs import PROOF_FIELDS, is_blob_ref, result_blob_files
+from .metrics import export_event
+from .results_index import KINDS, file_timestamp, get_results_index
+
+DEFAULT_INTERVAL = 600
+# Seconds an unreferenced input side file is kept after its last use
+INPUTS_GRACE = 3600
+SPOOL_STATES = ("sent", "failed")
+_INPUTS_FILE = re.compile(r"([0-9a-f]{64})\.npz")
+
+# blobs: files evicted together with `path` (proof blobs)
+ResultFile = namedtuple(
+    "ResultFile",
+    ["kind", "hotkey", "timestamp", "mtime", "size", "path", "blobs"],
+    defaults=((),),
+)
+
+
+def _env_number(name, default=None, cast=int):
+    value = os.environ.get(name)
+    return cast(value) if value else default
+
+
+def result_dirs():
+    """Directory of each kind of saved result."""
+    pop_dir = Path.home() / ".pop"
+    return {"zk": pop_dir, "instant_mdd": pop_dir / "instant_mdd"}
+
+
+def spool_dir():
+    """Upload spool root, as UploadSpool resolves it."""
+    return Path(
+        os.environ.get("POP_UPLOAD_SPOOL_DIR") or Path.home() / ".pop" / "upload_spool"
+    )
+
+
+def inputs_dir():
+    """Input side file directory, as InputStore resolves it."""
+    return Path(os.environ.get("POP_INPUTS_DIR") or Path.home() / ".pop" / "inputs")
+
+
+def list_result_files(dirs=None):
+    """Every `<hotkey>_<timestamp>.json` result file, as ResultFile tuples."""
+    files = []
+    for kind, directory in (dirs or result_dirs()).items():
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if not (entry.name.endswith(".json") and entry.is_file()):
+                continue
+            try:
+                timestamp = file_timestamp(entry.path)
+                stat = entry.stat()
+                blobs = result_blob_files(entry.path)
+                size = stat.st_size + sum(path.stat().st_size for path in blobs)
+            except (OSError, ValueError, IndexError):
+                continue
+            files.append(
+                ResultFile(
+                    kind,
+                    entry.name.rsplit("_", 1)[0],
+                    timestamp,
+                    stat.st_mtime,
+                    size,
+                    entry.path,
+                    tuple(blobs),
+                )
+            )
+    return files
+
+
+def list_spool_files(root=None):
+    """
+    Sent and failed upload spool entries, as ResultFile tuples of kind
+    spool_sent and spool_failed dated by their last state change. Pending
+    and in-flight entries are never listed.
+    """
+    files = []
+    root = Path(root or spool_dir())
+    for state in SPOOL_STATES:
+        try:
+            entries = list(os.scandir(root / state))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.name.endswith(".json"):
+                continue
+            try:
+                stat = entry.stat()
+                with open(entry.path, "r") as f:
+                    record = json.load(f)
+                blobs = tuple(
+                    Path(record[name]["file"])
+                    for name in PROOF_FIELDS
+                    if is_blob_ref(record.get(name))
+                )
+                if blobs and _requeued(root, entry.name[: -len(".json")]):
+                    # The same proof was queued again and shares the blobs
+                    blobs = ()
+                size = stat.st_size + sum(
+                    path.stat().st_size for path in blobs if path.exists()
+                )
+                hotkey = record.get("hotkey", "")
+            except (OSError, ValueError, AttributeError):
+                continue
+            files.append(
+                ResultFile(
+                    f"spool_{state}",
+                    hotkey,
+                    int(stat.st_mtime),
+                    stat.st_mtime,
+                    size,
+                    entry.path,
+                    blobs,
+                )
+            )
+    return files
+
+
+def _requeued(root, digest):
+    return (root / "pending" / f"{digest}.json").exists() or any(
+        (root / "inflight").glob(f"{digest}.*.json")
+    )
+
+
+def unreferenced_inputs(kept, directory=None, now=None, grace=INPUTS_GRACE):
+    """
+    Input side files that no kept zk result refers to and that were not used
+    for `grace` seconds, as ResultFile tuples of kind inputs.
+    """
+    now = time.time() if now is None else now
+    referenced = set()
+    for result_file in kept:
+        if result_file.kind != "zk":
+            continue
+        try:
+            with open(result_file.path, "r") as f:
+                referenced.update(_INPUTS_FILE.findall(f.read()))
+        except FileNotFoundError:
+            continue
+        except OSError:
+            # Keep everything rather than evict inputs of an unreadable result
+            return []
+
+    files = []
+    try:
+        entries = list(os.scandir(directory or inputs_dir()))
+    except OSError:
+        return files
+    for entry in entries:
+        if not entry.name.endswith(".npz"):
+            continue
+        if entry.name[: -len(".npz")] in referenced:
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        if now - stat.st_mtime > grace:
+            files.append(
+                ResultFile(
+                    "inputs",
+                    "",
+                    int(stat.st_mtime),
+                    stat.st_mtime,
+                    stat.st_size,
+                    entry.path,
+                )
+            )
+    return files
+
+
+class RetentionPolicy:
+    """
+    Args:
+        keep_last: Files kept per hotkey and kind (None for no limit)
+        max_age: Maximum file age in seconds (None for no limit)
+        max_bytes: Total size of all result files (None for no limit)
+    """
+
+    def __init__(self, keep_last=None, max_age=None, max_bytes=None):
+        self.keep_last = max(1, keep_last) if keep_last is not None else None
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_env(cls):
+        """
+        Policy from the POP_RETAIN_* variables, or None when none is set
+        (results are kept forever).
+        """
+        keep_last = _env_number("POP_RETAIN_LAST")
+        max_age_hours = _env_number("POP_RETAIN_MAX_AGE_HOURS", cast=float)
+        max_mb = _env_number("POP_RETAIN_MAX_MB", cast=float)
+        if keep_last is None and max_age_hours is None and max_mb is None:
+            return None
+        return cls(
+            keep_last=keep_last,
+            max_age=max_age_hours * 3600 if max_age_hours is not None else None,
+            max_bytes=int(max_mb * 1024 * 1024) if max_mb is not None else None,
+        )
+
+    def select(self, files, now=None):
+        """
+        Split result files into those to keep and those to evict.
+
+        Returns:
+            tuple: (kept, evicted) lists of ResultFile
+        """
+        now = time.time() if now is None else now
+        groups = defaultdict(list)
+        for result_file in files:
+            groups[(result_file.kind, result_file.hotkey)].append(result_file)
+
+        kept, evicted, newest = [], [], set()
+        for group in groups.values():
+            group.sort(key=lambda f: (f.timestamp, f.mtime), reverse=True)
+            newest.add(group[0].path)
+            kept.append(group[0])
+            for rank, result_file in enumerate(group[1:], start=1):
+                if (self.keep_last is not None and rank >= self.keep_last) or (
+                    self.max_age is not None
+                    and now - result_file.timestamp > self.max_age
+                ):
+                    evicted.append(result_file)
+                else:
+                    kept.append(result_file)
+
+        if self.max_bytes is not None:
+            total = sum(f.size for f in kept)
+            if total > self.max_bytes:
+                # Oldest first, never the newest file of a hotkey
+                candidates = sorted(
+                    (f for f in kept if f.path not in newest),
+                    key=lambda f: (f.timestamp, f.mtime),
+                )
+                dropped = set()
+                for result_file in candidates:
+                    if total <= self.max_bytes:
+                        break
+                    dropped.add(result_file.path)
+                    evicted.append(result_file)
+                    total -= result_file.size
+                kept = [f for f in kept if f.path not in dropped]
+        return kept, evicted
+
+
+def compact(policy, dirs=None, dry_run=False, now=None, spool=None, inputs=None):
+    """
+    Apply a retention policy to the saved results, the sent and failed upload
+    spool entries and the input side files.
+
+    Evicted files are deleted and evicted results removed from the results
+    index.
+
+    Args:
+        dirs: Result directory per kind (defaults to result_dirs())
+        spool: Upload spool root (defaults to spool_dir())
+        inputs: Input side file directory (defaults to inputs_dir())
+
+    Returns:
+        dict: kept/evicted file counts and bytes, in total and per kind
+    """
+    kept, evicted = policy.select(
+        list_result_files(dirs) + list_spool_files(spool), now
+    )
+    evicted += unreferenced_inputs(kept, inputs, now)
+
+    if not dry_run:
+        removed = defaultdict(list)
+        for result_file in evicted:
+            try:
+                for path in result_file.blobs:
+                    Path(path).unlink(missing_ok=True)
+                os.remove(result_file.path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                bt.logging.warning(f"Failed to evict {result_file.path}: {e}")
+                continue
+            if result_file.kind in KINDS:
+                removed[(result_file.kind, result_file.hotkey)].append(result_file.path)
+
+        index = get_results_index()
+        if index is not None:
+            for (kind, hotkey), paths in removed.items():
+                index.remove(kind, hotkey, paths)
+
+    stats = {
+        "kept": len(kept),
+        "evicted": len(evicted),
+        "kept_bytes": sum(f.size for f in kept),
+        "evicted_bytes": sum(f.size for f in evicted),
+        "kinds": {},
+    }
+    for name, files in (("kept", kept), ("evicted", evicted)):
+        for result_file in files:
+            kind = stats["kinds"].setdefault(
+                result_file.kind, {"kept": 0, "evicted": 0}
+            )
+            kind[name] += 1
+    return stats
+
+
+class ResultsCompactor:
+    """
+    Daemon thread applying a retention policy periodically.
+
+    Args:
+        policy: RetentionPolicy to enforce
+        interval: Seconds between runs
+    """
+
+    def __init__(self, policy, interval=DEFAULT_INTERVAL):
+        self.policy = policy
+        self.interval = interval
+        self.totals = {"runs": 0, "evicted": 0, "evicted_bytes": 0}
+        self.last_stats = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls):
+        """Compactor for RetentionPolicy.from_env(), or None without a policy."""
+        policy = RetentionPolicy.from_env()
+        if policy is None:
+            return None
+        return cls(
+            policy, _env_number("POP_RETENTION_INTERVAL", DEFAULT_INTERVAL, float)
+        )
+
+    def run_once(self):
+        stats = compact(self.policy)
+        self.last_stats = stats
+        self.totals["runs"] += 1
+        self.totals["evicted"] += stats["evicted"]
+        self.totals["evicted_bytes"] += stats["evicted_bytes"]
+        bt.logging.info(
+            f"[RETENTION] Evicted {stats['evicted']} files "
+            f"({stats['evicted_bytes']} bytes), kept {stats['kept']} "
+            f"({stats['kept_bytes']} bytes)"
+        )
+        try:
+            export_event("retention", {k: v for k, v in stats.items() if k != "kinds"})
+        except OSError as e:
+            bt.logging.warning(f"Failed to export retention metrics: {e}")
+        return stats
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                bt.logging.warning(f"[RETENTION] Compaction failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="pop-retention", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, wait=True):
+        self._stop.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+
+_compactor = None
+_compactor_pid = None
+_compactor_lock = threading.Lock()
+
+
+def start_compactor():
+    """
+    Start the shared compactor of this process if a retention policy is
+    configured. Called by the prove entry points in the calling process, so
+    prover pool workers never run a compactor of their own; later calls are
+    no-ops.
+
+    Returns:
+        ResultsCompactor or None
+    """
+    global _compactor, _compactor_pid
+    with _compactor_lock:
+        if _compactor is None or _compactor_pid != os.getpid():
+            _compactor = ResultsCompactor.from_env()
+            _compactor_pid = os.getpid()
+            if _compactor is not None:
+                _compactor.start()
+        return _compactor
+
+
+def stop_compactor(wait=True):
+    """Stop the shared compactor if one was started."""
+    global _compactor
+    with _compactor_lock:
+        if _compactor is not None and _compactor_pid == os.getpid():
+            _compactor.stop(wait=wait)
+        _compactor = None
+
+
+atexit.register(stop_compactor)
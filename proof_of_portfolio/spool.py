@@ -0,0 +1,313 @@
+"""
+Crash-safe on-disk spool of proofs waiting to be uploaded.
+
+Every finished proof is written to pending/ before its upload starts and only
+moves to sent/ once the API accepted it, so proofs survive a crash or an API
+outage and are uploaded by the next drain. All state changes are atomic
+renames:
+
+    pending/<digest>.json           queued, not being uploaded
+    inflight/<digest>.<pid>.json    claimed by process <pid>
+    sent/<digest>.json              accepted by the API
+    failed/<digest>.json            gave up after max_attempts drains
+
+Entries are keyed by the SHA-256 of the public inputs, so a proof that was
+already sent, or is already queued, is never uploaded twice. The proof data
+itself is kept in binary blob files, blobs/<digest>.<name>.bin[.gz|.zst],
+written before the entry and removed once the API accepted it.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import bittensor as bt
+
+from .blobs import (
+    PROOF_FIELDS,
+    as_bytes,
+    blob_path,
+    default_codec,
+    read_blob,
+    write_blob,
+)
+
+DIRS = ("pending", "inflight", "sent", "failed")
+BLOB_DIR = "blobs"
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ["true", "1", "yes"]
+
+
+def public_inputs_digest(public_inputs):
+    return hashlib.sha256(as_bytes(public_inputs)).hexdigest()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class UploadSpool:
+    """
+    Args:
+        spool_dir: Spool root (defaults to POP_UPLOAD_SPOOL_DIR, then
+            ~/.pop/upload_spool)
+        max_attempts: Drains an entry may fail before it moves to failed/
+    """
+
+    def __init__(self, spool_dir=None, max_attempts=10):
+        self.spool_dir = Path(
+            spool_dir
+            or os.environ.get("POP_UPLOAD_SPOOL_DIR")
+            or Path.home() / ".pop" / "upload_spool"
+        )
+        self.max_attempts = max_attempts
+        for name in DIRS + (BLOB_DIR,):
+            (self.spool_dir / name).mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """Spool configured from the environment, or None if disabled."""
+        if _env_flag("POP_UPLOAD_SPOOL_DISABLE"):
+            return None
+        max_attempts = os.environ.get("POP_UPLOAD_SPOOL_MAX_ATTEMPTS")
+        return cls(max_attempts=int(max_attempts) if max_attempts else 10)
+
+    def _path(self, state, digest):
+        return self.spool_dir / state / f"{digest}.json"
+
+    def _inflight_path(self, digest, pid=None):
+        return self.spool_dir / "inflight" / f"{digest}.{pid or os.getpid()}.json"
+
+    def _write(self, path, entry):
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _read(self, path):
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _inflight_digests(self):
+        return {p.name.split(".")[0] for p in (self.spool_dir / "inflight").iterdir()}
+
+    def is_known(self, digest):
+        """Whether this proof is already queued, being uploaded or sent."""
+        return (
+            self._path("pending", digest).exists()
+            or self._path("sent", digest).exists()
+            or digest in self._inflight_digests()
+        )
+
+    def enqueue(self, proof, public_inputs, hotkey, testnet=True, tier="large"):
+        """
+        Durably queue a proof for upload.
+
+        Args:
+            proof: Proof as bytes, memoryview or hex string
+            public_inputs: Public inputs as bytes, memoryview or hex string
+            tier: Circuit tier the proof was generated with
+
+        Returns:
+            str: The entry digest, or None if the proof is already known
+        """
+        digest = public_inputs_digest(public_inputs)
+        if self.is_known(digest):
+            return None
+        entry = {
+            "digest": digest,
+            "hotkey": hotkey,
+            "testnet": testnet,
+            "tier": tier,
+            "created": time.time(),
+            "attempts": 0,
+        }
+        # Blobs first, so a pending entry always has its proof data
+        base = self.spool_dir / BLOB_DIR / digest
+        codec = default_codec()
+        for name, data in zip(PROOF_FIELDS, (proof, public_inputs)):
+            entry[name] = write_blob(blob_path(base, name, codec), data, codec)
+        self._write(self._path("pending", digest), entry)
+        return digest
+
+    def proof_data(self, entry):
+        """(proof, public_inputs) of an entry, as bytes."""
+        return tuple(
+            read_blob(entry[name])
+            if isinstance(entry[name], dict)
+            else as_bytes(entry[name])
+            for name in PROOF_FIELDS
+        )
+
+    def _remove_blobs(self, entry):
+        for name in PROOF_FIELDS:
+            if isinstance(entry.get(name), dict):
+                Path(entry[name]["file"]).unlink(missing_ok=True)
+
+    def claim(self, digest):
+        """
+        Take a pending entry for upload by this process.
+
+        Returns:
+            dict: The entry, or None if it is not pending (e.g. another
+                process claimed it first)
+        """
+        inflight = self._inflight_path(digest)
+        try:
+            os.rename(self._path("pending", digest), inflight)
+        except FileNotFoundError:
+            return None
+        return self._read(inflight)
+
+    def complete(self, digest, response=None):
+        """Mark a claimed entry as sent, dropping the proof body."""
+        inflight = self._inflight_path(digest)
+        entry = self._read(inflight)
+        record = {
+            "digest": digest,
+            "hotkey": entry["hotkey"],
+            "testnet": entry["testnet"],
+            "created": entry["created"],
+            "sent": time.time(),
+            "attempts": entry["attempts"] + 1,
+            "response": response,
+        }
+        self._write(self._path("sent", digest), record)
+        inflight.unlink()
+        self._remove_blobs(entry)
+
+    def release(self, digest):
+        """Return a claimed entry after a failed upload."""
+        inflight = self._inflight_path(digest)
+        entry = self._read(inflight)
+        entry["attempts"] += 1
+        state = "failed" if entry["attempts"] >= self.max_attempts else "pending"
+        if state == "failed":
+            bt.logging.error(
+                f"[SPOOL] Giving up on proof {digest[:12]} after {entry['attempts']} drains"
+            )
+        self._write(inflight, entry)
+        os.replace(inflight, self._path(state, digest))
+
+    def recover(self):
+        """
+        Move entries claimed by processes that no longer exist back to pending.
+
+        Returns:
+            int: Number of recovered entries
+        """
+        recovered = 0
+        for path in (self.spool_dir / "inflight").glob("*.json"):
+            digest, pid, _ = path.name.split(".")
+            if int(pid) == os.getpid() or _pid_alive(int(pid)):
+                continue
+            try:
+                os.replace(path, self._path("pending", digest))
+                recovered += 1
+            except FileNotFoundError:
+                pass
+
+        # Temporary files left behind by writers that died mid-write
+        for state in DIRS + (BLOB_DIR,):
+            for path in (self.spool_dir / state).glob(".*.tmp"):
+                pid = path.name.split(".")[-2]
+                if pid.isdigit() and not _pid_alive(int(pid)):
+                    path.unlink(missing_ok=True)
+        return recovered
+
+    def pending(self, hotkey=None):
+        """Digests of pending entries, oldest first, optionally for one hotkey."""
+        entries = []
+        for path in (self.spool_dir / "pending").glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+
+        digests = []
+        for _, path in sorted(entries):
+            if hotkey is not None:
+                try:
+                    if self._read(path)["hotkey"] != hotkey:
+                        continue
+                except (OSError, ValueError, KeyError):
+                    continue
+            digests.append(path.name[: -len(".json")])
+        return digests
+
+    def counts(self):
+        """Number of entries in each spool state."""
+        return {
+            state: sum(1 for _ in (self.spool_dir / state).glob("*.json"))
+            for state in DIRS
+        }
+
+    def upload(self, digest, uploader, wallet):
+        """
+        Upload a pending entry in the background through `uploader`.
+
+        Returns:
+            concurrent.futures.Future resolving to the API response (None on
+            failure), or None if the entry could not be claimed
+        """
+        entry = self.claim(digest)
+        if entry is None:
+            return None
+
+        try:
+            proof, public_inputs = self.proof_data(entry)
+            # Entries queued before tiers were recorded are large-tier proofs
+            future = uploader.submit(
+                proof,
+                public_inputs,
+                wallet,
+                entry["testnet"],
+                entry.get("tier", "large"),
+            )
+        except Exception:
+            self.release(digest)
+            raise
+
+        def settle(done):
+            try:
+                response = None if done.cancelled() else done.result()
+            except Exception:
+                response = None
+            try:
+                if response is not None:
+                    self.complete(digest, response)
+                else:
+                    self.release(digest)
+            except OSError as e:
+                bt.logging.warning(f"[SPOOL] Failed to update entry {digest[:12]}: {e}")
+
+        future.add_done_callback(settle)
+        return future
+
+    def drain(self, uploader, wallet):
+        """
+        Recover abandoned entries and queue every pending entry of the
+        wallet's hotkey for upload.
+
+        Returns:
+            dict: Digest to future of each queued upload
+        """
+        self.recover()
+        futures = {}
+        for digest in self.pending(wallet.hotkey.ss58_address):
+            future = self.upload(digest, uploader, wallet)
+            if future is not None:
+                futures[digest] = future
+        return futures
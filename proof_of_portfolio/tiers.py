@@ -0,0 +1,247 @@
+"""
+Size-tiered variants of the Noir programs.
+
+The main circuit and instant_mdd are sized for the largest miners, so a miner
+with a few dozen orders and days of returns pays for a full-size proof. Each
+program is therefore also built in smaller tiers: the same sources with their
+size globals rewritten, kept as separate Noir packages under ~/.pop/variants
+(or POP_VARIANT_DIR), each with its own compiled artifact and verification
+key. The large tier is the package shipped in the repository.
+
+Tiers only change array capacities. Padding never reaches the outputs, so
+every tier that fits an input produces the same outputs and public inputs.
+
+A proof only verifies against the key of its own tier, and verifiers use the
+keys shipped in the package, never locally built ones. select_tier therefore
+only picks a smaller tier once its verification key ships in
+proof_of_portfolio/vk/ (see `pop compile-circuits --ship-vk`); until then
+every proof uses the large tier unless POP_CIRCUIT_TIER pins another one.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+from .artifacts import CIRCUIT_DIRS, PACKAGE_DIR, ArtifactManager, write_vk
+from .witness_cache import circuit_digest
+
+TIERS = ("small", "medium", "large")
+
+# Size globals per program and tier. MERKLE_DEPTH and MAX_RETURNS stay fixed
+# so both Merkle roots are the same in every tier.
+TIER_SIZES = {
+    "circuits": {
+        "small": {
+            "MAX_SIGNALS": 64,
+            "MAX_DAYS": 64,
+            "MAX_CHECKPOINTS": 128,
+            "ARRAY_SIZE": 64,
+        },
+        "medium": {
+            "MAX_SIGNALS": 256,
+            "MAX_DAYS": 128,
+            "MAX_CHECKPOINTS": 256,
+            "ARRAY_SIZE": 128,
+        },
+        "large": {
+            "MAX_SIGNALS": 512,
+            "MAX_DAYS": 256,
+            "MAX_CHECKPOINTS": 512,
+            "ARRAY_SIZE": 256,
+        },
+    },
+    "instant_mdd": {
+        "small": {"ARRAY_SIZE": 128},
+        "medium": {"ARRAY_SIZE": 512},
+        "large": {"ARRAY_SIZE": 1024},
+    },
+}
+
+# File declaring each program's size globals, relative to its package
+CONSTANTS_FILES = {
+    "circuits": os.path.join("components", "src", "utils", "constants.nr"),
+    "instant_mdd": os.path.join("src", "main.nr"),
+}
+
+# Verification keys of the smaller tiers shipped with the package
+SHIPPED_VK_DIR = os.path.join(PACKAGE_DIR, "vk")
+
+_IGNORED = shutil.ignore_patterns(
+    "target", "proof", "vk", "Prover.toml", "*.py", "__pycache__"
+)
+_prepared = set()
+
+
+def variant_root():
+    return Path(os.environ.get("POP_VARIANT_DIR") or Path.home() / ".pop" / "variants")
+
+
+def variant_name(program, tier):
+    """Artifact name of a program tier; the large tier is the program itself."""
+    return program if tier == "large" else f"{program}_{tier}"
+
+
+def variant_dir(program, tier):
+    if tier == "large":
+        return CIRCUIT_DIRS[program]
+    return str(variant_root() / variant_name(program, tier))
+
+
+def shipped_vk_path(program, tier):
+    """
+    Verification key of a program tier shipped with the package, or None if
+    the tier's key does not ship. Never builds anything.
+    """
+    if tier == "large":
+        path = os.path.join(CIRCUIT_DIRS[program], "vk", "vk")
+    elif tier in TIER_SIZES[program]:
+        path = os.path.join(SHIPPED_VK_DIR, variant_name(program, tier), "vk")
+    else:
+        return None
+    return path if os.path.exists(path) else None
+
+
+def select_tier(program, **counts):
+    """
+    Smallest tier of `program` whose sizes fit every count, among the tiers
+    whose verification key ships with the package.
+
+    POP_CIRCUIT_TIER pins a tier ("small", "medium" or "large"), shipped or
+    not; a pinned tier that is too small for the inputs is ignored.
+
+    Args:
+        counts: Required capacity per size global, e.g. MAX_DAYS=60
+
+    Returns:
+        str: The tier name ("large" when nothing smaller fits)
+    """
+    tiers = TIER_SIZES[program]
+
+    def fits(tier):
+        return all(count <= tiers[tier][name] for name, count in counts.items())
+
+    pinned = os.environ.get("POP_CIRCUIT_TIER", "").lower()
+    if pinned in tiers and fits(pinned):
+        return pinned
+    for tier in TIERS:
+        if fits(tier) and (tier == "large" or shipped_vk_path(program, tier)):
+            return tier
+    return "large"
+
+
+def substitute_sizes(source, sizes):
+    """Rewrite the values of `global NAME: type = value;` declarations."""
+    for name, value in sizes.items():
+        pattern = re.compile(rf"(\bglobal\s+{name}\s*:\s*\w+\s*=\s*)[0-9_]+(\s*;)")
+        source, count = pattern.subn(rf"\g<1>{value}\g<2>", source)
+        if count != 1:
+            raise ValueError(f"Expected one declaration of global {name}")
+    return source
+
+
+def write_variant(program, tier):
+    """
+    Generate the Noir package of a program tier unless it is up to date.
+
+    The variant's verification key is kept while its sources are unchanged
+    and dropped when they change.
+
+    Returns:
+        str: The package directory
+    """
+    target = Path(variant_dir(program, tier))
+    if tier == "large":
+        return str(target)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=target.parent))
+    try:
+        package = staging / target.name
+        shutil.copytree(CIRCUIT_DIRS[program], package, ignore=_IGNORED)
+        constants = package / CONSTANTS_FILES[program]
+        constants.write_text(
+            substitute_sizes(constants.read_text(), TIER_SIZES[program][tier])
+        )
+        if target.is_dir() and circuit_digest(str(target)) == circuit_digest(
+            str(package)
+        ):
+            return str(target)
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(package, target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return str(target)
+
+
+def prepare(program, tier, manager=None, with_vk=True):
+    """
+    Make a program tier ready to execute (and, with_vk, to prove).
+
+    Generates the variant sources, registers them with `manager`, and
+    installs the tier's verification key: the one shipped in the package if
+    there is one, otherwise the key bb derives from the compiled variant.
+
+    Returns:
+        str: The tier's artifact name
+    """
+    name = variant_name(program, tier)
+    if tier == "large":
+        return name
+
+    key = (name, str(variant_root()), with_vk)
+    package = variant_dir(program, tier)
+    if key not in _prepared or not os.path.isdir(package):
+        package = write_variant(program, tier)
+    if manager is not None:
+        manager.circuit_dirs[name] = package
+
+    vk_dir = os.path.join(package, "vk")
+    if with_vk and not os.path.exists(os.path.join(vk_dir, "vk")):
+        os.makedirs(vk_dir, exist_ok=True)
+        shipped = os.path.join(SHIPPED_VK_DIR, name, "vk")
+        if os.path.exists(shipped):
+            shutil.copyfile(shipped, os.path.join(vk_dir, "vk"))
+        else:
+            builder = manager or ArtifactManager(circuit_dirs={name: package})
+            builder.circuit_dirs[name] = package
+            if write_vk(builder.artifact_path(name), vk_dir) is None:
+                raise RuntimeError(f"bb write_vk failed for {name}")
+    _prepared.add(key)
+    return name
+
+
+def prepare_all(manager, with_vk=True):
+    """Prepare every tier of every tiered program; returns their names."""
+    return [
+        prepare(program, tier, manager, with_vk)
+        for program in TIER_SIZES
+        for tier in TIERS
+    ]
+
+
+def vk_path(program, tier):
+    """
+    Verification key of a program tier for proving: the shipped key if there
+    is one, otherwise the key of the locally built variant (built on first
+    use). Verifiers use shipped_vk_path instead.
+    """
+    if tier == "large":
+        return os.path.join(CIRCUIT_DIRS[program], "vk", "vk")
+    shipped = shipped_vk_path(program, tier)
+    if shipped:
+        return shipped
+    prepare(program, tier)
+    return os.path.join(variant_dir(program, tier), "vk", "vk")
+
+
+def ship_vk(program, tier):
+    """Copy a built tier's verification key into the package for release."""
+    if tier == "large":
+        return vk_path(program, tier)
+    source = os.path.join(variant_dir(program, tier), "vk", "vk")
+    destination = os.path.join(SHIPPED_VK_DIR, variant_name(program, tier), "vk")
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    shutil.copyfile(source, destination)
+    return destination
@@ -0,0 +1,114 @@
+"""
+Persisted per-hotkey signals Merkle trees.
+
+The tree of each hotkey is kept in ~/.pop/merkle_state/<hotkey>.json (or
+POP_MERKLE_STATE_DIR) and in memory, so a proof after a few new orders only
+hashes those orders and their paths instead of rebuilding all 512 leaves.
+
+generate_proof and the Miner encode signals differently (SCALE and bid/ask
+x100), so each keeps its own state: the miner's lives in <hotkey>.miner.json.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from .merkle import (
+    MAX_SIGNALS,
+    MERKLE_DEPTH,
+    IncrementalMerkleTree,
+    build_merkle_tree,
+)
+
+STATE_VERSION = 1
+DEFAULT_KIND = "proof"
+
+_trees = {}
+_lock = threading.Lock()
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ["true", "1", "yes"]
+
+
+def state_dir():
+    return Path(
+        os.environ.get("POP_MERKLE_STATE_DIR") or Path.home() / ".pop" / "merkle_state"
+    )
+
+
+def _state_path(hotkey, kind=DEFAULT_KIND):
+    name = hotkey if kind == DEFAULT_KIND else f"{hotkey}.{kind}"
+    return state_dir() / f"{name}.json"
+
+
+def load_tree(hotkey, max_signals=MAX_SIGNALS, depth=MERKLE_DEPTH, kind=DEFAULT_KIND):
+    """Stored tree of a hotkey, or an empty tree if none (or no usable one) exists."""
+    try:
+        with open(_state_path(hotkey, kind), "r") as f:
+            state = json.load(f)
+        if (
+            state.get("version") == STATE_VERSION
+            and state["tree"]["max_signals"] == max_signals
+            and state["tree"]["depth"] == depth
+        ):
+            return IncrementalMerkleTree.from_dict(state["tree"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return IncrementalMerkleTree(max_signals, depth)
+
+
+def _write_state(path, state):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def save_tree(hotkey, tree, kind=DEFAULT_KIND):
+    _write_state(
+        _state_path(hotkey, kind), {"version": STATE_VERSION, "tree": tree.to_dict()}
+    )
+
+
+def update_signals_tree(
+    hotkey,
+    signals,
+    actual_len,
+    max_signals=MAX_SIGNALS,
+    depth=MERKLE_DEPTH,
+    kind=DEFAULT_KIND,
+):
+    """
+    Update the hotkey's stored tree to `signals` and return it.
+
+    Falls back to a full build_merkle_tree() without a hotkey or when
+    POP_MERKLE_STATE_DISABLE is set. `kind` names the state namespace, so
+    callers encoding signals differently do not overwrite each other's tree.
+
+    Returns:
+        dict: build_merkle_tree() result plus "changed", the indices of the
+            leaves that had to be rehashed
+    """
+    if not hotkey or _env_flag("POP_MERKLE_STATE_DISABLE"):
+        tree = build_merkle_tree(signals, actual_len, max_signals, depth)
+        tree["changed"] = list(range(max(0, min(int(actual_len), max_signals))))
+        return tree
+
+    with _lock:
+        tree = _trees.get((kind, hotkey))
+        if tree is None or (tree.max_signals, tree.depth) != (max_signals, depth):
+            tree = load_tree(hotkey, max_signals, depth, kind)
+        changed = tree.update(signals, actual_len)
+        _trees[(kind, hotkey)] = tree
+        if changed:
+            try:
+                save_tree(hotkey, tree, kind)
+            except OSError:
+                pass
+        result = tree.to_result()
+
+    result["changed"] = changed
+    return result
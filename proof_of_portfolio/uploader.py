@@ -0,0 +1,257 @@
+"""
+Background proof uploader.
+
+Uploads run on a small thread pool sharing one pooled HTTP session, so proving
+returns as soon as the proof is on disk instead of waiting on the network.
+Timeouts, connection errors, 429 and 5xx responses are retried with
+exponential backoff and full jitter; the request is re-signed on every attempt
+so the timestamp header stays fresh. Any other error (a client error, a
+signing failure, a response that is not JSON) fails the upload at once.
+
+Proofs are taken as bytes (or memoryview, or hex for older callers) and only
+hex-encoded once per upload, since the API's JSON payload carries hex.
+"""
+
+import atexit
+import base64
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bittensor as bt
+import requests
+from requests.adapters import HTTPAdapter
+
+from .blobs import as_bytes, to_hex
+
+UPLOAD_URL = "https://api.omron.ai/ptn/upload-proof"
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ["true", "1", "yes"]
+
+
+def _env_number(name, default, cast=int):
+    value = os.environ.get(name)
+    return cast(value) if value else default
+
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class ProofUploader:
+    """
+    Args:
+        url: Upload endpoint
+        max_workers: Concurrent uploads (also the size of the connection pool)
+        max_attempts: Attempts per proof before giving up
+        backoff_base: Backoff before the second attempt, doubled per attempt
+        backoff_max: Upper bound for a single backoff
+        timeout: Per-request timeout in seconds
+    """
+
+    def __init__(
+        self,
+        url=UPLOAD_URL,
+        max_workers=4,
+        max_attempts=5,
+        backoff_base=1.0,
+        backoff_max=60.0,
+        timeout=30,
+    ):
+        self.url = url
+        self.max_workers = max(1, max_workers)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.max_workers, max_retries=0
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="pop-upload"
+        )
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._closed = False
+
+    @classmethod
+    def from_env(cls):
+        """Uploader configured from POP_UPLOAD_* environment variables."""
+        return cls(
+            url=os.environ.get("POP_UPLOAD_URL") or UPLOAD_URL,
+            max_workers=_env_number("POP_UPLOAD_WORKERS", 4),
+            max_attempts=_env_number("POP_UPLOAD_MAX_ATTEMPTS", 5),
+            backoff_base=_env_number("POP_UPLOAD_BACKOFF", 1.0, float),
+            timeout=_env_number("POP_UPLOAD_TIMEOUT", 30, float),
+        )
+
+    @property
+    def pending(self):
+        """Number of uploads queued or in flight."""
+        return len(self._pending)
+
+    def backoff(self, attempt):
+        """Full-jitter backoff before retrying after `attempt` failed attempts."""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def _post(self, proof_hex, public_inputs_hex, wallet, testnet, tier):
+        timestamp = str(int(time.time()))
+        signature = wallet.hotkey.sign(timestamp.encode())
+        headers = {
+            "x-signature": base64.b64encode(signature).decode(),
+            "x-timestamp": timestamp,
+            "x-origin-ss58": wallet.hotkey.ss58_address,
+            "Content-Type": "application/json",
+        }
+        payload = {
+            "testnet": testnet,
+            "proof": proof_hex,
+            "public_signals": public_inputs_hex,
+            "circuit_tier": tier,
+        }
+        return self.session.post(
+            self.url, headers=headers, json=payload, timeout=self.timeout
+        )
+
+    def upload(self, proof, public_inputs, wallet, testnet=True, tier="large"):
+        """
+        Upload a proof in the calling thread, retrying transient failures.
+
+        Args:
+            proof: Proof as bytes, memoryview or hex string
+            public_inputs: Public inputs as bytes, memoryview or hex string
+            tier: Circuit tier the proof was generated with, so verifiers pick
+                the matching verification key
+
+        Returns:
+            API response dictionary or None if the upload failed
+        """
+        try:
+            hotkey = wallet.hotkey.ss58_address[:8]
+            proof_hex = to_hex(as_bytes(proof))
+            public_inputs_hex = to_hex(as_bytes(public_inputs))
+        except Exception as e:
+            bt.logging.error(
+                f"❌ [UPLOAD] Proof upload failed: {type(e).__name__}: {e}"
+            )
+            return None
+        for attempt in range(1, self.max_attempts + 1):
+            retry_after = None
+            try:
+                response = self._post(
+                    proof_hex, public_inputs_hex, wallet, testnet, tier
+                )
+                result = response.json() if response.status_code == 200 else None
+            except (
+                requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+            ) as e:
+                error = f"{type(e).__name__}: {e}"
+            except Exception as e:
+                bt.logging.error(
+                    f"❌ [UPLOAD] Proof upload for {hotkey} failed: {type(e).__name__}: {e}"
+                )
+                return None
+            else:
+                if response.status_code == 200:
+                    bt.logging.success(
+                        f"✅ [UPLOAD] Proof for {hotkey} uploaded (attempt {attempt})"
+                    )
+                    return result
+                error = f"{response.status_code} - {response.text}"
+                if response.status_code not in RETRY_STATUS_CODES:
+                    bt.logging.error(f"❌ [UPLOAD] Proof upload failed: {error}")
+                    return None
+                retry_after = _retry_after(response)
+
+            if attempt == self.max_attempts:
+                bt.logging.error(
+                    f"❌ [UPLOAD] Giving up on proof for {hotkey} after {attempt} attempts: {error}"
+                )
+                return None
+
+            delay = self.backoff(attempt)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.backoff_max))
+            bt.logging.warning(
+                f"[UPLOAD] Attempt {attempt} for {hotkey} failed ({error}), retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+    def submit(self, proof, public_inputs, wallet, testnet=True, tier="large"):
+        """
+        Queue a proof for upload in the background.
+
+        Returns:
+            concurrent.futures.Future resolving to the upload() result
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ProofUploader has been shut down")
+            future = self._executor.submit(
+                self.upload, proof, public_inputs, wallet, testnet, tier
+            )
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            e = future.exception()
+            bt.logging.error(
+                f"[UPLOAD] Unexpected error uploading proof: {type(e).__name__}: {e}"
+            )
+
+    def shutdown(self, wait=True):
+        """Stop accepting uploads; with wait=True, finish the queued ones first."""
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        self.session.close()
+
+
+_uploader = None
+_uploader_lock = threading.Lock()
+
+
+def get_uploader():
+    """Return the shared uploader, creating it on first use."""
+    global _uploader
+    with _uploader_lock:
+        if _uploader is None:
+            _uploader = ProofUploader.from_env()
+        return _uploader
+
+
+def shutdown_uploader(wait=True):
+    """Shut down the shared uploader if one was started."""
+    global _uploader
+    with _uploader_lock:
+        if _uploader is not None:
+            _uploader.shutdown(wait=wait)
+            _uploader = None
+
+
+def sync_uploads():
+    """Whether POP_UPLOAD_SYNC asks generate_proof to wait for its upload."""
+    return _env_flag("POP_UPLOAD_SYNC")
+
+
+atexit.register(shutdown_uploader)
@@ -1,32 +1,76 @@
 import os
 import subprocess
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 import bittensor as bt
 from . import BB_PATH
+from .blobs import as_bytes, load_proof
+from .tiers import shipped_vk_path
+from .workspace import workspace_root
 
 
-def verify(proof_hex, public_inputs_hex):
+def _vk_path(tier):
     """
-    Verify a zero-knowledge proof using hex string data.
+    Shipped verification key of a main circuit tier (large when None), or
+    None if the package does not ship it. Keys are never built here.
+    """
+    return shipped_vk_path("circuits", tier or "large")
+
+
+def _bb_verify(vk_path, proof_path, public_inputs_path, timeout=60):
+    return subprocess.run(
+        [
+            BB_PATH,
+            "verify",
+            "-k",
+            vk_path,
+            "-p",
+            proof_path,
+            "-i",
+            public_inputs_path,
+        ],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+
+
+def verify(
+    proof=None, public_inputs=None, tier=None, *, proof_hex=None, public_inputs_hex=None
+):
+    """
+    Verify a zero-knowledge proof.
 
     Args:
-        proof_hex (str): Hex string of proof data
-        public_inputs_hex (str): Hex string of public inputs data
+        proof (bytes | memoryview | str): Proof data, or its hex string
+        public_inputs (bytes | memoryview | str): Public inputs data, or its
+            hex string
+        tier (str): Circuit tier the proof was generated with (the
+            circuit_tier of its results and upload). Defaults to the large
+            tier.
+        proof_hex (str): Former name of `proof`, still accepted as a keyword
+        public_inputs_hex (str): Former name of `public_inputs`, still
+            accepted as a keyword
 
     Returns:
         bool: True if verification succeeds, False otherwise
     """
+    proof = proof_hex if proof is None else proof
+    public_inputs = public_inputs_hex if public_inputs is None else public_inputs
+    if proof is None or public_inputs is None:
+        raise TypeError("verify() needs both the proof and its public inputs")
 
     try:
-        proof_data = bytes.fromhex(proof_hex)
-        public_inputs_data = bytes.fromhex(public_inputs_hex)
-    except ValueError as e:
+        proof_data = as_bytes(proof)
+        public_inputs_data = as_bytes(public_inputs)
+    except (ValueError, TypeError) as e:
         bt.logging.error(f"Invalid hex data: {str(e)}")
         return False
 
-    vk_path = os.path.join(os.path.dirname(__file__), "circuits", "vk", "vk")
-    if not os.path.exists(vk_path):
-        bt.logging.error(f"Verification key file not found: {vk_path}")
+    vk_path = _vk_path(tier)
+    if vk_path is None:
+        bt.logging.error(f"Verification key file not found for tier {tier or 'large'}")
         return False
 
     try:
@@ -39,24 +83,12 @@ def verify(proof_hex, public_inputs_hex):
             with open(public_inputs_path, "wb") as f:
                 f.write(public_inputs_data)
 
-            result = subprocess.run(
-                [
-                    BB_PATH,
-                    "verify",
-                    "-k",
-                    vk_path,
-                    "-p",
-                    proof_path,
-                    "-i",
-                    public_inputs_path,
-                ],
-                capture_output=True,
-                text=True,
-                timeout=60,
-            )
+            result = _bb_verify(vk_path, proof_path, public_inputs_path)
 
             if result.returncode == 0:
-                bt.logging.info("Proof verification successful")
+                bt.logging.info(
+                    f"Proof verification successful ({tier or 'large'} tier)"
+                )
                 if result.stdout:
                     print(f"DEBUG: bb verify stdout: {result.stdout}")
                 return True
@@ -73,3 +105,121 @@ def verify(proof_hex, public_inputs_hex):
     except Exception as e:
         bt.logging.error(f"Error during proof verification: {str(e)}")
         return False
+
+
+def _item_tier(item):
+    """Tier of a verify_many item, or None if it does not say."""
+    if isinstance(item, dict):
+        return (
+            item.get("tier")
+            or item.get("circuit_tier")
+            or item.get("proof_results", {}).get("circuit_tier")
+            or item.get("data_summary", {}).get("circuit_tier")
+        )
+    return item[2] if len(item) > 2 else None
+
+
+def _batch_item(item):
+    """(proof, public_inputs) of a verify_many item."""
+    proof, public_inputs = load_proof(item) if isinstance(item, dict) else item[:2]
+    return as_bytes(proof), as_bytes(public_inputs)
+
+
+def verify_many(items, max_workers=None, tier=None, timeout=60, use_tmpfs=True):
+    """
+    Verify a batch of proofs with parallel bb invocations.
+
+    Verification keys are resolved once per tier for the whole batch before
+    any bb runs, and every proof is written to one shared scratch directory
+    (on tmpfs when available) instead of a temporary directory per proof. A
+    bb run that times out only fails its own proof.
+
+    Args:
+        items: Iterable of (proof, public_inputs) or (proof, public_inputs,
+            tier) tuples, or generate_proof results; proof data may be bytes,
+            memoryview or hex
+        max_workers: Concurrent bb processes (defaults to the core count)
+        tier: Tier of every item without its own (large when neither is
+            known)
+        timeout: Timeout of a single bb verify, in seconds
+        use_tmpfs: Put the scratch directory on /dev/shm when possible
+
+    Returns:
+        dict: "results" with valid, tier, latency and error per item (in input
+            order), plus verified/failed counts, elapsed time and proofs_per_sec
+    """
+    items = list(items)
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(items) or 1))
+    tiers = [_item_tier(item) or tier or "large" for item in items]
+    vk_paths = {name: _vk_path(name) for name in set(tiers)}
+
+    def run(index, scratch):
+        start = time.perf_counter()
+        item_tier = tiers[index]
+        result = {"index": index, "valid": False, "tier": item_tier, "error": None}
+        proof_path = os.path.join(scratch, f"{index}.proof")
+        public_inputs_path = os.path.join(scratch, f"{index}.public_inputs")
+        vk_path = vk_paths[item_tier]
+        try:
+            proof, public_inputs = _batch_item(items[index])
+            with open(proof_path, "wb") as f:
+                f.write(proof)
+            with open(public_inputs_path, "wb") as f:
+                f.write(public_inputs)
+
+            if vk_path is None:
+                result["error"] = (
+                    f"Verification key file not found for tier {item_tier}"
+                )
+            else:
+                # A timeout only fails this proof; the worker moves on
+                try:
+                    completed = _bb_verify(
+                        vk_path, proof_path, public_inputs_path, timeout
+                    )
+                except subprocess.TimeoutExpired:
+                    result["error"] = f"Proof verification timed out after {timeout}s"
+                else:
+                    if completed.returncode == 0:
+                        result["valid"] = True
+                    else:
+                        result["error"] = completed.stderr.strip() or (
+                            f"bb verify exited with {completed.returncode}"
+                        )
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            for path in (proof_path, public_inputs_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        result["latency"] = time.perf_counter() - start
+        return result
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(
+        prefix="pop-verify-", dir=workspace_root(use_tmpfs)
+    ) as scratch:
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pop-verify"
+        ) as executor:
+            results = list(
+                executor.map(lambda index: run(index, scratch), range(len(items)))
+            )
+    elapsed = time.perf_counter() - start
+
+    verified = sum(1 for result in results if result["valid"])
+    summary = {
+        "results": results,
+        "verified": verified,
+        "failed": len(results) - verified,
+        "elapsed": elapsed,
+        "proofs_per_sec": len(results) / elapsed if elapsed > 0 else 0.0,
+        "max_workers": max_workers,
+    }
+    bt.logging.info(
+        f"[VERIFY] {verified}/{len(results)} proofs valid in {elapsed:.2f}s "
+        f"({summary['proofs_per_sec']:.2f} proofs/s, {max_workers} workers)"
+    )
+    return summary
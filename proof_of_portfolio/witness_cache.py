@@ -0,0 +1,218 @@
+"""
+Content-addressed cache for main circuit witnesses.
+
+Entries are keyed by a digest of the canonicalized Prover.toml inputs, the
+circuit sources and the nargo version, and hold the gzipped witness plus the
+parsed circuit outputs. The compiled circuit is stored once per circuit digest
+and nargo version so bb can still prove from a cache hit. Entries and compiled
+circuits share one size limit, and the least recently used of either are
+evicted once the cache grows past it.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CIRCUIT_SOURCE_SUFFIXES = (".nr", ".toml")
+ENTRY_OUTPUTS = "outputs.json"
+ENTRY_WITNESS = "witness.gz"
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ["true", "1", "yes"]
+
+
+def canonical_json(value):
+    """Serialize inputs deterministically (sorted keys, no whitespace)."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+_circuit_digests = {}
+
+
+def circuit_digest(circuit_dir):
+    """
+    Digest of a Noir package's sources (Nargo.toml files and .nr sources,
+    including local dependencies below the package directory).
+
+    Memoized on the files' sizes and modification times.
+    """
+    root = os.path.realpath(circuit_dir)
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in ("target", "proof"))
+        for name in sorted(filenames):
+            if name.endswith(CIRCUIT_SOURCE_SUFFIXES) and name != "Prover.toml":
+                path = os.path.join(dirpath, name)
+                stat = os.stat(path)
+                files.append((path, stat.st_size, stat.st_mtime_ns))
+
+    stamp = tuple(files)
+    cached = _circuit_digests.get(root)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    for path, _, _ in files:
+        digest.update(os.path.relpath(path, root).encode())
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    result = digest.hexdigest()
+    _circuit_digests[root] = (stamp, result)
+    return result
+
+
+class WitnessCache:
+    """
+    On-disk witness cache with size-bounded LRU eviction.
+
+    Args:
+        cache_dir: Cache location (defaults to ~/.pop/witness_cache)
+        max_bytes: Total size limit for cached entries
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir or Path.home() / ".pop" / "witness_cache")
+        self.max_bytes = max_bytes
+        self.entries_dir = self.cache_dir / "entries"
+        self.circuits_dir = self.cache_dir / "circuits"
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.circuits_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """
+        Cache configured from POP_WITNESS_CACHE_DIR / POP_WITNESS_CACHE_MAX_MB,
+        or None when POP_WITNESS_CACHE_DISABLE is set.
+        """
+        if _env_flag("POP_WITNESS_CACHE_DISABLE"):
+            return None
+        max_mb = os.environ.get("POP_WITNESS_CACHE_MAX_MB")
+        max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES
+        return cls(os.environ.get("POP_WITNESS_CACHE_DIR"), max_bytes)
+
+    @staticmethod
+    def key(prover_input, circuit_hash):
+        """
+        Args:
+            prover_input: Main circuit inputs
+            circuit_hash: Digest of the circuit sources and the compiler
+                version, which also names the cached compiled circuit
+        """
+        digest = hashlib.sha256()
+        digest.update(circuit_hash.encode())
+        digest.update(canonical_json(prover_input).encode())
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return self.entries_dir / key
+
+    def get(self, key, witness_path, circuit_hash=None, circuit_path=None):
+        """
+        Restore a cached witness to `witness_path` (and the compiled circuit to
+        `circuit_path` when given).
+
+        Returns:
+            list: The cached circuit output fields, or None on a miss
+        """
+        entry = self._entry(key)
+        try:
+            with open(entry / ENTRY_OUTPUTS, "r") as f:
+                fields = [int(x) for x in json.load(f)["fields"]]
+            if circuit_path is not None:
+                shutil.copyfile(
+                    self.circuits_dir / f"{circuit_hash}.json", circuit_path
+                )
+            shutil.copyfile(entry / ENTRY_WITNESS, witness_path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        now = time.time()
+        touched = [entry]
+        if circuit_path is not None:
+            touched.append(self.circuits_dir / f"{circuit_hash}.json")
+        for path in touched:
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        return fields
+
+    def put(self, key, witness_path, fields, circuit_hash=None, circuit_path=None):
+        """Store a witness and its output fields, then enforce the size limit."""
+        # Stored even when the entry exists, in case the circuit was evicted
+        if circuit_path is not None and os.path.exists(circuit_path):
+            compiled = self.circuits_dir / f"{circuit_hash}.json"
+            if not compiled.exists():
+                tmp_file = compiled.with_suffix(f".{os.getpid()}.tmp")
+                shutil.copyfile(circuit_path, tmp_file)
+                os.replace(tmp_file, compiled)
+
+        entry = self._entry(key)
+        if entry.exists():
+            return
+
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.entries_dir))
+        try:
+            shutil.copyfile(witness_path, tmp_dir / ENTRY_WITNESS)
+            with open(tmp_dir / ENTRY_OUTPUTS, "w") as f:
+                json.dump({"fields": [str(x) for x in fields]}, f)
+            os.rename(tmp_dir, entry)
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def size(self):
+        return sum(size for _, size, _ in self._scan())
+
+    def _scan(self):
+        """Entry directories and compiled circuits as (path, size, last use)."""
+        entries = []
+        for entry in self.entries_dir.iterdir():
+            if entry.name.startswith(".tmp-"):
+                continue
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                entries.append((entry, size, entry.stat().st_mtime))
+            except OSError:
+                continue
+        for compiled in self.circuits_dir.glob("*.json"):
+            try:
+                stat = compiled.stat()
+            except OSError:
+                continue
+            entries.append((compiled, stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self):
+        """
+        Remove least recently used entries and compiled circuits until the
+        cache fits max_bytes. Entries whose circuit was evicted miss until a
+        put() stores the circuit again.
+        """
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            if path.parent == self.circuits_dir:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            else:
+                shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.circuits_dir.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,119 @@
+"""
+Per-job scratch directories for circuit execution.
+
+Each job gets its own directory for Prover.toml, target/ and proof/, with the
+circuit sources and verification key linked from the installed package.
+Programs already compiled into the package's own target/ are copied into the
+job's, so nargo reuses them instead of compiling again. Concurrent jobs never
+share input or output files, and the package directory itself is only ever
+read.
+"""
+
+import os
+import shutil
+import tempfile
+
+TMPFS_DIR = "/dev/shm"
+
+# Per-job outputs that must never be shared with the package directory
+JOB_ENTRIES = ("Prover.toml", "target", "proof")
+# Copied rather than linked so nargo treats the workspace as the package root
+COPIED_ENTRIES = ("Nargo.toml",)
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ["true", "1", "yes"]
+
+
+def workspace_root(use_tmpfs=None):
+    """
+    Directory new workspaces are created in.
+
+    POP_WORKSPACE_DIR takes precedence. Otherwise /dev/shm is used when tmpfs is
+    requested (argument or POP_WORKSPACE_TMPFS) and available, else the system
+    temp directory.
+    """
+    root = os.environ.get("POP_WORKSPACE_DIR")
+    if root:
+        os.makedirs(root, exist_ok=True)
+        return root
+
+    if use_tmpfs is None:
+        use_tmpfs = _env_flag("POP_WORKSPACE_TMPFS")
+    if use_tmpfs and os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK):
+        return TMPFS_DIR
+
+    return tempfile.gettempdir()
+
+
+class Workspace:
+    """
+    Isolated working copy of a Noir program directory.
+
+    Usable as a context manager; the directory is removed on exit, or when the
+    object is garbage collected if cleanup() is never called.
+    """
+
+    def __init__(self, circuit_dir, prefix="pop-job-", use_tmpfs=None):
+        self.circuit_dir = os.path.abspath(circuit_dir)
+        if not os.path.isdir(self.circuit_dir):
+            raise FileNotFoundError(f"Circuit directory not found: {self.circuit_dir}")
+
+        self._tmp = tempfile.TemporaryDirectory(
+            prefix=prefix, dir=workspace_root(use_tmpfs)
+        )
+        self.path = self._tmp.name
+        try:
+            self._populate()
+        except BaseException:
+            self._tmp.cleanup()
+            raise
+
+    def _populate(self):
+        for entry in os.listdir(self.circuit_dir):
+            if entry in JOB_ENTRIES:
+                continue
+            source = os.path.join(self.circuit_dir, entry)
+            destination = os.path.join(self.path, entry)
+            if entry in COPIED_ENTRIES:
+                shutil.copyfile(source, destination)
+            else:
+                os.symlink(source, destination)
+
+        os.makedirs(self.target_dir)
+        os.makedirs(self.proof_dir)
+
+        # Copied, not linked: nargo rewrites a stale artifact in place
+        compiled_dir = os.path.join(self.circuit_dir, "target")
+        if os.path.isdir(compiled_dir):
+            for name in os.listdir(compiled_dir):
+                if name.endswith(".json"):
+                    shutil.copyfile(
+                        os.path.join(compiled_dir, name),
+                        os.path.join(self.target_dir, name),
+                    )
+
+    @property
+    def prover_toml(self):
+        return os.path.join(self.path, "Prover.toml")
+
+    @property
+    def target_dir(self):
+        return os.path.join(self.path, "target")
+
+    @property
+    def proof_dir(self):
+        return os.path.join(self.path, "proof")
+
+    def witness_file(self, witness_name):
+        return os.path.join(self.target_dir, f"{witness_name}.gz")
+
+    def cleanup(self):
+        self._tmp.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+        return False
@@ -0,0 +1,94 @@
+import os
+import types
+
+import bittensor
+import pytest
+
+
+class RecordingLogger:
+    """Collects bt.logging calls so tests can assert on them."""
+
+    def __init__(self):
+        self.records = []
+
+    def __getattr__(self, level):
+        def log(message, *args, **kwargs):
+            self.records.append((level, str(message)))
+
+        return log
+
+    def messages(self, level=None):
+        return [m for lvl, m in self.records if level is None or lvl == level]
+
+
+@pytest.fixture(autouse=True)
+def bt_logging(monkeypatch):
+    logger = RecordingLogger()
+    monkeypatch.setattr(bittensor, "logging", logger, raising=False)
+    return logger
+
+
+@pytest.fixture
+def pop_home(tmp_path, monkeypatch):
+    """Isolated home directory, so ~/.pop points into tmp_path."""
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    for name in (
+        "POP_RESULTS_INDEX",
+        "POP_RESULTS_INDEX_DISABLE",
+        "POP_UPLOAD_SPOOL_DIR",
+        "POP_BLOB_CODEC",
+        "POP_PROOF_HEX",
+        "POP_COMPACT_RESULTS",
+        "POP_INPUTS_DIR",
+    ):
+        monkeypatch.delenv(name, raising=False)
+    for name in list(os.environ):
+        if name.startswith("POP_RETAIN") or name == "POP_RETENTION_INTERVAL":
+            monkeypatch.delenv(name)
+    return home
+
+
+@pytest.fixture
+def wallet():
+    """Wallet stand-in whose hotkey counts and numbers its signatures."""
+    signatures = []
+
+    def sign(data):
+        signatures.append(data)
+        return f"{len(signatures)}:{data.decode()}".encode()
+
+    hotkey = types.SimpleNamespace(ss58_address="5TestHotkey", sign=sign)
+    return types.SimpleNamespace(hotkey=hotkey, signatures=signatures)
+
+
+def make_miner_data(hotkey="5TestHotkey", n_orders=20, n_days=90, seed=0):
+    """Validator checkpoint data for one miner, in generate_proof's dict format."""
+    import random
+
+    rng = random.Random(seed)
+    orders = [
+        {
+            "trade_pair": ["BTCUSD", "ETHUSD", "EURUSD"][i % 3],
+            "order_type": ["LONG", "SHORT", "FLAT"][i % 3],
+            "leverage": rng.uniform(-2, 2),
+            "price": rng.uniform(1, 50_000),
+            "bid": rng.uniform(1, 50_000),
+            "ask": rng.uniform(1, 50_000),
+            "processed_ms": 1_700_000_000_000 + i * 60_000,
+            "order_uuid": f"{i:08x}-0000-0000-0000-{seed:012x}",
+        }
+        for i in range(n_orders)
+    ]
+    returns = [rng.gauss(0.0005, 0.01) for _ in range(n_days)]
+    cps = [
+        {"gain": max(r, 0.0), "loss": min(r, 0.0), "mdd": 1.0 - abs(r) / 2}
+        for r in returns
+    ]
+    data = {
+        "perf_ledgers": {hotkey: {"cps": cps}},
+        "positions": {hotkey: {"positions": [{"orders": orders}]}},
+        "daily_returns": returns,
+    }
+    return data, [r * 1000 for r in returns]
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+from proof_of_portfolio.abi import read_witness
+from proof_of_portfolio.merkle import (
+    SIGNAL_FIELDS,
+    IncrementalMerkleTree,
+    build_merkle_tree,
+    hash_signal,
+    zero_subtree_hashes,
+)
+from proof_of_portfolio.pedersen import pedersen_hash
+
+WITNESS = (
+    Path(__file__).parent.parent / "proof_of_portfolio" / "tree_generator" / "target.gz"
+)
+
+# The shipped witness was solved by a 256-signal build of tree_generator: the
+# signals take witnesses 0-2047, actual_len 2048, and the returned MerkleTree
+# (root, path_elements, path_indices, leaf_hashes) follows from 2049 on
+WITNESS_SIGNALS = 256
+
+
+# Golden vectors from the tests in circuits/components/src/core/merkle.nr
+def test_pedersen_pair_matches_noir():
+    assert pedersen_hash([1, 1]) == (
+        0x07EBFBF4DF29888C6CD6DCA13D4BB9D1A923013DDBBCBDC3378AB8845463297B
+    )
+
+
+def test_zero_subtrees_match_noir():
+    zeros = zero_subtree_hashes()
+    assert zeros[:3] == (
+        0,
+        0x27B1D0839A5B23BAF12A8D195B18AC288FCF401AFB2F70B8A4B529EDE5FA9FED,
+        0x21DBFD1D029BF447152FCF89E355C334610D1632436BA170F738107266A71550,
+    )
+
+
+def test_hash_signal_matches_noir():
+    signal = {
+        "trade_pair": 0,
+        "order_type": 1,
+        "leverage": 5000000,
+        "price": 766429000000,
+        "processed_ms": 1731112081267,
+        "order_uuid": 0x489F7687509343A8A77F76CE165D3E2F,
+        "bid": 0,
+        "ask": 0,
+    }
+    assert hash_signal(signal) == (
+        0x304223ECFD85099071F5280E8A1DC32D341599EE255C22F794A48FD94BAE6643
+    )
+
+
+@pytest.fixture(scope="module")
+def witness():
+    return read_witness(WITNESS)
+
+
+def test_tree_matches_the_shipped_witness(witness):
+    width = len(SIGNAL_FIELDS)
+    signals = [
+        dict(zip(SIGNAL_FIELDS, (witness[i * width + f] for f in range(width))))
+        for i in range(WITNESS_SIGNALS)
+    ]
+    actual_len = witness[WITNESS_SIGNALS * width]
+
+    tree = build_merkle_tree(signals, actual_len, max_signals=WITNESS_SIGNALS)
+
+    returned = [tree["root"]]
+    returned += [node for path in tree["path_elements"] for node in path]
+    returned += [index for path in tree["path_indices"] for index in path]
+    returned += tree["leaf_hashes"]
+    first = WITNESS_SIGNALS * width + 1
+    assert [witness[first + i] for i in range(len(returned))] == returned
+
+    incremental = IncrementalMerkleTree(max_signals=WITNESS_SIGNALS)
+    incremental.update(signals, actual_len)
+    assert incremental.to_result() == tree
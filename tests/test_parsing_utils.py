@@ -0,0 +1,28 @@
+import pytest
+
+from proof_of_portfolio import proof_generator
+
+TREE_OUTPUT = (
+    "MerkleTree { path_elements: [[0x01, 0x02], [0x03, 0x04]], "
+    "path_indices: [[0, 1], [1, 0]], root: 0x05 }"
+)
+
+
+def test_former_proof_generator_parsers_still_work_with_a_warning():
+    with pytest.warns(DeprecationWarning, match="parse_circuit_output"):
+        parse_circuit_output = proof_generator.parse_circuit_output
+    with pytest.warns(DeprecationWarning, match="parse_nested_arrays"):
+        parse_nested_arrays = proof_generator.parse_nested_arrays
+
+    assert parse_circuit_output("Circuit output: [0x0a, -3, 7]") == ["10", "-3", "7"]
+    assert parse_circuit_output(TREE_OUTPUT) == {
+        "path_elements": [["0x01", "0x02"], ["0x03", "0x04"]],
+        "path_indices": [["0", "1"], ["1", "0"]],
+        "root": "0x05",
+    }
+    assert parse_nested_arrays("[[1, 2], [3]]") == [["1", "2"], ["3"]]
+
+
+def test_unknown_proof_generator_attributes_still_raise():
+    with pytest.raises(AttributeError):
+        proof_generator.parse_everything
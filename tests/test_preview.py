@@ -0,0 +1,82 @@
+import os
+import random
+
+import pytest
+
+from proof_of_portfolio import NARGO_PATH
+from proof_of_portfolio.difftest import circuit_inputs, run_circuit
+from proof_of_portfolio.preview import circuit_outputs
+from proof_of_portfolio.tiers import TIER_SIZES
+
+LARGE = TIER_SIZES["circuits"]["large"]
+SHORT = [0.012, -0.004, 0.0, 0.021, -0.017, 0.003, 0.008, -0.011, 0.015, -0.002]
+_rng = random.Random(7)
+LONG = [round(_rng.gauss(0.001, 0.01), 6) for _ in range(90)]
+
+# Circuit outputs of fixed portfolios as (returns, use_weighting, fields).
+# Recorded from circuit_outputs; test_pinned_outputs_match_nargo_execute
+# checks every row against `nargo execute` wherever nargo is installed
+PINNED = [
+    (
+        SHORT,
+        False,
+        [
+            0x3D090,
+            0xFFFFFFFDABF41C00,
+            0x19B87F,
+            0x0,
+            0x0,
+            0xFFFFFFFDABF41C00,
+            0x9D51689C1B,
+            0x75CE98B9C4D4B798C393330CA20D2169FC7E031827D42749D79B38B4F9E70D8,
+        ],
+    ),
+    (
+        LONG,
+        False,
+        [
+            0xE2A7,
+            0x598F594,
+            0x7D4B64,
+            0x0,
+            0x6E7344D,
+            0x8911516,
+            0x8718672D80,
+            0xBFFA884CC425F6C3381ACA21079F1D710BF5A7A4A77B5A106E41D26A03E298A,
+        ],
+    ),
+    (
+        LONG,
+        True,
+        [
+            0x26FD1,
+            0x10F8B10E,
+            0x7D4B64,
+            0x0,
+            0x4A165AF7A092,
+            0x1A47B8AA,
+            0x152057B3EA2,
+            0xBFFA884CC425F6C3381ACA21079F1D710BF5A7A4A77B5A106E41D26A03E298A,
+        ],
+    ),
+]
+
+
+@pytest.mark.parametrize("returns, use_weighting, fields", PINNED)
+def test_preview_outputs_are_pinned(returns, use_weighting, fields):
+    assert circuit_outputs(circuit_inputs(returns, LARGE, use_weighting)) == fields
+
+
+@pytest.mark.skipif(not os.path.exists(NARGO_PATH), reason="needs nargo")
+@pytest.mark.parametrize("use_weighting", [False, True])
+def test_pinned_outputs_match_nargo_execute(pop_home, use_weighting):
+    rows = [row for row in PINNED if row[1] == use_weighting]
+    cases = [{"returns": returns} for returns, _, _ in rows]
+
+    results = run_circuit(
+        cases, backend="nargo", workers=1, use_weighting=use_weighting
+    )
+
+    assert [result.get("fields") for result in results] == [
+        fields for _, _, fields in rows
+    ]
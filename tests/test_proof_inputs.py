@@ -0,0 +1,50 @@
+import math
+
+import pytest
+
+from proof_of_portfolio.proof_generator import (
+    generate_proof,
+    scale_array,
+    scale_to_int,
+)
+
+from conftest import make_miner_data
+
+
+def test_scale_array_truncates_and_pads():
+    assert scale_array([1.5, -0.000000019], 4, fill=7) == [150000000, -1, 7, 7]
+
+
+def test_scale_to_int_matches_scale_array():
+    assert scale_to_int(-0.000000019) == int(-0.000000019 * 10**8) == -1
+    assert scale_to_int(1.5) == 150000000
+
+
+@pytest.mark.parametrize("bad", [math.nan, math.inf, 1e12])
+def test_scale_array_rejects_values_it_cannot_scale(bad):
+    with pytest.raises(ValueError):
+        scale_array([0.1, bad], 2)
+
+
+@pytest.mark.parametrize("field", ["bid", "ask", "price", "leverage"])
+@pytest.mark.parametrize("bad", [None, math.nan, "n/a"])
+def test_invalid_order_prices_only_drop_their_order(pop_home, field, bad):
+    data, daily_pnl = make_miner_data(n_orders=10)
+    orders = data["positions"]["5TestHotkey"]["positions"][0]["orders"]
+    orders[4][field] = bad
+
+    results = generate_proof(data, daily_pnl, miner_hotkey="5TestHotkey", preview=True)
+
+    assert results["data_summary"]["signals_total"] == 9
+
+
+def test_preview_leaves_merkle_state_untouched(pop_home, monkeypatch):
+    state = pop_home / "merkle_state"
+    monkeypatch.setenv("POP_MERKLE_STATE_DIR", str(state))
+    data, daily_pnl = make_miner_data(n_orders=10)
+
+    results = generate_proof(data, daily_pnl, miner_hotkey="5TestHotkey", preview=True)
+
+    assert results["merkle_roots"]["signals"] is None
+    assert "merkle_tree" not in results["proof_results"]["stages"]
+    assert not state.exists()
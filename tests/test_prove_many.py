@@ -0,0 +1,79 @@
+import asyncio
+import types
+from concurrent.futures import Future
+
+import pytest
+
+import proof_of_portfolio
+from proof_of_portfolio import prove_many
+
+from conftest import make_miner_data
+
+
+class StandInPool:
+    """ProverPool stand-in that finishes every job at once without proving."""
+
+    max_workers = 2
+
+    def __init__(self):
+        self.hotkeys = []
+
+    def submit(self, fn, miner_data, daily_pnl, hotkey, *args, **kwargs):
+        self.hotkeys.append(hotkey)
+        future = Future()
+        future.set_result({"status": "success", "proof_generated": True})
+        return future
+
+
+@pytest.fixture
+def batch(pop_home, monkeypatch):
+    """Checkpoint data for two miners, the larger one second."""
+    monkeypatch.setenv("POP_SKIP_INSTALL", "1")
+    small, _ = make_miner_data("small", n_orders=3, seed=1)
+    large, _ = make_miner_data("large", n_orders=9, seed=2)
+    for key in ("perf_ledgers", "positions"):
+        small[key].update(large[key])
+    return small
+
+
+def test_unknown_hotkeys_fail_alone(batch):
+    pool = StandInPool()
+    finished = []
+
+    outcome = asyncio.run(
+        prove_many(
+            batch,
+            hotkeys=["small", "missing", "large"],
+            pool=pool,
+            on_result=lambda hotkey, result: finished.append(hotkey),
+        )
+    )
+
+    results = outcome["results"]
+    assert pool.hotkeys == ["large", "small"]
+    assert results["missing"]["status"] == "error"
+    assert "missing" in results["missing"]["message"]
+    assert results["small"]["status"] == results["large"]["status"] == "success"
+    assert sorted(finished) == ["large", "missing", "small"]
+    assert (outcome["summary"]["succeeded"], outcome["summary"]["failed"]) == (2, 1)
+
+
+def test_batches_run_on_the_shared_pool_by_default(batch, monkeypatch):
+    pool = StandInPool()
+    monkeypatch.setattr(proof_of_portfolio, "get_prover_pool", lambda: pool)
+    monkeypatch.setattr(
+        proof_of_portfolio,
+        "ProverPool",
+        lambda **kwargs: pytest.fail("started a batch pool"),
+    )
+
+    outcome = asyncio.run(prove_many(batch))
+
+    assert sorted(pool.hotkeys) == ["large", "small"]
+    assert outcome["summary"]["max_workers"] == pool.max_workers
+
+
+def test_order_count_of_odd_positions_is_zero():
+    assert proof_of_portfolio._order_count({}, "hk") == 0
+    positions = {"hk": types.SimpleNamespace(positions=None)}
+    assert proof_of_portfolio._order_count({"positions": positions}, "hk") == 0
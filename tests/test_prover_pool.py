@@ -0,0 +1,48 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from proof_of_portfolio import prover_pool
+from proof_of_portfolio.prover_pool import ProverPool
+
+
+@pytest.fixture
+def shared_pool(monkeypatch):
+    """Fresh shared pool of one spawned worker, shut down after the test."""
+    monkeypatch.setattr(prover_pool, "_pool", None)
+    monkeypatch.setattr(
+        prover_pool,
+        "_new_pool",
+        lambda: ProverPool(max_workers=1, start_method="spawn", warm=False),
+    )
+    yield prover_pool.get_prover_pool()
+    prover_pool.shutdown_prover_pool()
+
+
+def kill_worker(pool):
+    """Exit a worker mid-job and wait for the pool to notice."""
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(os._exit, 1).result(timeout=60)
+    assert pool.broken
+
+
+def test_submit_restarts_workers_after_one_dies(shared_pool, bt_logging):
+    first = shared_pool.submit(os.getpid).result(timeout=60)
+    kill_worker(shared_pool)
+
+    second = shared_pool.submit(os.getpid).result(timeout=60)
+
+    assert second != first
+    assert not shared_pool.broken
+    assert shared_pool.pending == 0
+    assert any("worker died" in m for m in bt_logging.messages("warning"))
+
+
+def test_shared_pool_is_restarted_after_a_worker_dies(shared_pool):
+    kill_worker(shared_pool)
+
+    pool = prover_pool.get_prover_pool()
+
+    assert pool is shared_pool and not pool.broken
+    assert pool.submit(os.getpid).result(timeout=60)
@@ -0,0 +1,98 @@
+import json
+import os
+
+import pytest
+
+from proof_of_portfolio import results_index
+from proof_of_portfolio.results_index import ResultsIndex, hotkey_rows, latest_row
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ResultsIndex(tmp_path / "results.db")
+    yield index
+    index.close()
+
+
+def write_result(directory, hotkey, timestamp, roots, age=60):
+    """Save a zk result file the way save_zk_results names it, `age` seconds old."""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{hotkey}_{timestamp}.json"
+    path.write_text(json.dumps({"merkle_roots": roots, "portfolio_metrics": {}}))
+    mtime = timestamp - age
+    os.utime(path, (mtime, mtime))
+    os.utime(directory, (mtime, mtime))
+    return path
+
+
+def test_record_and_latest(index, tmp_path):
+    directory = tmp_path / "pop"
+    for timestamp in (1000, 3000, 2000):
+        path = write_result(directory, "hk", timestamp, {"signals": timestamp})
+        index.record("zk", "hk", path, json.loads(path.read_text()))
+
+    row = latest_row(index, "zk", directory, "hk")
+    assert row["timestamp"] == 3000
+    assert row["summary"]["merkle_roots"] == {"signals": 3000}
+    assert [row["timestamp"] for row in hotkey_rows(index, "zk", directory, "hk")] == [
+        3000,
+        2000,
+        1000,
+    ]
+
+
+def test_rows_of_deleted_files_are_dropped(index, tmp_path):
+    directory = tmp_path / "pop"
+    for timestamp in (1000, 2000):
+        path = write_result(directory, "hk", timestamp, {"signals": timestamp})
+        index.record("zk", "hk", path, json.loads(path.read_text()))
+
+    path.unlink()
+
+    assert latest_row(index, "zk", directory, "hk")["timestamp"] == 1000
+    assert len(index.all("zk", "hk")) == 1
+
+
+def test_files_written_after_the_first_import_are_indexed(index, tmp_path):
+    directory = tmp_path / "pop"
+    write_result(directory, "hk", 1000, {"signals": 1})
+    assert latest_row(index, "zk", directory, "hk")["timestamp"] == 1000
+
+    # Saved without the index, e.g. by a process with it disabled
+    write_result(directory, "hk", 2000, {"signals": 2})
+    write_result(directory, "other", 2000, {"signals": 3})
+
+    assert latest_row(index, "zk", directory, "hk")["timestamp"] == 2000
+    assert latest_row(index, "zk", directory, "other")["summary"]["merkle_roots"] == {
+        "signals": 3
+    }
+
+
+def test_unchanged_directory_is_not_listed_again(index, tmp_path, monkeypatch):
+    directory = tmp_path / "pop"
+    write_result(directory, "hk", 1000, {"signals": 1})
+    index.import_directory("zk", directory)
+
+    monkeypatch.setattr(results_index.Path, "glob", None)
+    assert latest_row(index, "zk", directory, "hk")["timestamp"] == 1000
+
+    # Another connection sees the recorded import too
+    other = ResultsIndex(index.path)
+    try:
+        other.import_directory("zk", directory)
+    finally:
+        other.close()
+
+
+def test_recently_modified_directory_is_scanned_again(index, tmp_path):
+    directory = tmp_path / "pop"
+    write_result(directory, "hk", 1000, {"signals": 1})
+    os.utime(directory, None)
+    index.import_directory("zk", directory)
+
+    # Written in the same mtime tick as the previous scan
+    mtime = directory.stat().st_mtime_ns
+    write_result(directory, "hk", 2000, {"signals": 2})
+    os.utime(directory, ns=(mtime, mtime))
+
+    assert latest_row(index, "zk", directory, "hk")["timestamp"] == 2000
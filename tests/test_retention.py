@@ -0,0 +1,123 @@
+import json
+import os
+import time
+
+import pytest
+
+from proof_of_portfolio import retention
+from proof_of_portfolio.blobs import blob_path
+from proof_of_portfolio.retention import RetentionPolicy, compact
+from proof_of_portfolio.spool import UploadSpool
+
+NOW = 1_700_000_000
+DAY = 86400
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    return {"zk": tmp_path / "pop", "instant_mdd": tmp_path / "pop" / "instant_mdd"}
+
+
+def write_result(directory, hotkey, timestamp, inputs_digest=None):
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{hotkey}_{timestamp}.json"
+    circuit_inputs = {}
+    if inputs_digest:
+        circuit_inputs["inputs_file"] = f"/somewhere/{inputs_digest}.npz"
+    path.write_text(json.dumps({"circuit_inputs": circuit_inputs}))
+    blob = blob_path(path.with_suffix(""), "proof", "none")
+    blob.write_bytes(b"proof")
+    return path, blob
+
+
+def age(path, seconds):
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+
+def test_results_beyond_keep_last_are_evicted_with_their_blobs(pop_home, dirs):
+    files = [write_result(dirs["zk"], "hk", NOW - n * DAY) for n in range(3)]
+
+    stats = compact(
+        RetentionPolicy(keep_last=2), dirs, now=NOW, spool=pop_home / "spool"
+    )
+
+    assert stats["kinds"]["zk"] == {"kept": 2, "evicted": 1}
+    oldest, oldest_blob = files[2]
+    assert not oldest.exists() and not oldest_blob.exists()
+    assert all(path.exists() and blob.exists() for path, blob in files[:2])
+
+
+def test_sent_and_failed_spool_entries_are_evicted(pop_home, dirs):
+    spool = UploadSpool(pop_home / "spool", max_attempts=1)
+    sent = spool.enqueue(b"proof-1", b"inputs-1", "hk")
+    spool.claim(sent)
+    spool.complete(sent, {"ok": True})
+    failed = spool.enqueue(b"proof-2", b"inputs-2", "hk")
+    spool.claim(failed)
+    spool.release(failed)
+    pending = spool.enqueue(b"proof-3", b"inputs-3", "hk")
+    for state, digest in (("sent", sent), ("failed", failed)):
+        age(spool._path(state, digest), 2 * DAY)
+    failed_blobs = list((spool.spool_dir / "blobs").glob(f"{failed}.*"))
+    assert len(failed_blobs) == 2
+
+    # The newest entry of a hotkey is always kept
+    for state in ("sent", "failed"):
+        spool._path(state, "f" * 64).write_text(json.dumps({"hotkey": "hk"}))
+
+    stats = compact(RetentionPolicy(max_age=DAY), dirs, spool=spool.spool_dir)
+
+    assert stats["kinds"]["spool_sent"] == {"kept": 1, "evicted": 1}
+    assert stats["kinds"]["spool_failed"] == {"kept": 1, "evicted": 1}
+    assert not spool._path("sent", sent).exists()
+    assert not spool._path("failed", failed).exists()
+    assert not any(path.exists() for path in failed_blobs)
+    assert spool.pending() == [pending]
+    assert spool.proof_data(spool.claim(pending)) == (b"proof-3", b"inputs-3")
+
+
+def test_failed_entry_keeps_blobs_shared_with_a_requeued_proof(pop_home, dirs):
+    spool = UploadSpool(pop_home / "spool", max_attempts=1)
+    digest = spool.enqueue(b"proof", b"inputs", "hk")
+    spool.claim(digest)
+    spool.release(digest)
+    assert spool.enqueue(b"proof", b"inputs", "hk") == digest
+    age(spool._path("failed", digest), 2 * DAY)
+    spool._path("failed", "f" * 64).write_text(json.dumps({"hotkey": "hk"}))
+
+    stats = compact(RetentionPolicy(max_age=DAY), dirs, spool=spool.spool_dir)
+
+    assert stats["kinds"]["spool_failed"]["evicted"] == 1
+    assert spool.proof_data(spool.claim(digest)) == (b"proof", b"inputs")
+
+
+def test_only_unreferenced_idle_inputs_are_evicted(pop_home, dirs, tmp_path):
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    used, unused, recent = (inputs / f"{c * 64}.npz" for c in "abc")
+    for path in (used, unused, recent):
+        path.write_bytes(b"npz")
+    for path in (used, unused):
+        age(path, retention.INPUTS_GRACE + 60)
+    write_result(dirs["zk"], "hk", NOW, inputs_digest="a" * 64)
+
+    stats = compact(
+        RetentionPolicy(keep_last=1), dirs, spool=tmp_path / "spool", inputs=inputs
+    )
+
+    assert stats["kinds"]["inputs"] == {"kept": 0, "evicted": 1}
+    assert used.exists() and recent.exists() and not unused.exists()
+
+
+def test_saving_results_does_not_start_a_compactor(pop_home, monkeypatch):
+    from proof_of_portfolio import save_instant_mdd_results
+    from proof_of_portfolio.proof_generator import save_zk_results
+
+    monkeypatch.setenv("POP_RETAIN_LAST", "1")
+    monkeypatch.setattr(retention, "_compactor", None)
+
+    assert save_zk_results({"merkle_roots": {}}, "hk")
+    assert save_instant_mdd_results({"status": "success"}, "hk")
+
+    assert retention._compactor is None
@@ -0,0 +1,117 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import Future
+
+import pytest
+
+from proof_of_portfolio.spool import UploadSpool, public_inputs_digest
+
+PROOF = b"proof" * 100
+PUBLIC_INPUTS = b"public-inputs"
+
+
+class FakeUploader:
+    """Uploader stand-in resolving every submit() with a fixed response."""
+
+    def __init__(self, response=None):
+        self.response = response
+        self.submitted = []
+
+    def submit(self, proof, public_inputs, wallet, testnet=True, tier="large"):
+        self.submitted.append((proof, public_inputs, testnet, tier))
+        future = Future()
+        future.set_result(self.response)
+        return future
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return UploadSpool(tmp_path / "spool", max_attempts=2)
+
+
+def blob_files(spool):
+    return sorted(os.listdir(spool.spool_dir / "blobs"))
+
+
+def test_enqueue_is_idempotent(spool):
+    digest = spool.enqueue(PROOF, PUBLIC_INPUTS, "hk")
+    assert digest == public_inputs_digest(PUBLIC_INPUTS)
+    assert spool.enqueue(PROOF, PUBLIC_INPUTS.hex(), "hk") is None
+    assert spool.counts()["pending"] == 1
+    assert spool.pending("hk") == [digest]
+    assert spool.pending("other") == []
+    assert len(blob_files(spool)) == 2
+
+
+def test_claim_is_exclusive(spool):
+    digest = spool.enqueue(PROOF, PUBLIC_INPUTS, "hk")
+    entry = spool.claim(digest)
+    assert spool.proof_data(entry) == (PROOF, PUBLIC_INPUTS)
+    assert spool.claim(digest) is None
+    assert spool.counts()["inflight"] == 1
+    assert spool.is_known(digest)
+
+
+def test_drain_completes_accepted_uploads(spool, wallet):
+    wallet.hotkey.ss58_address = "hk"
+    digest = spool.enqueue(PROOF, PUBLIC_INPUTS, "hk", testnet=False, tier="small")
+    uploader = FakeUploader({"ok": True})
+
+    futures = spool.drain(uploader, wallet)
+
+    assert futures[digest].result() == {"ok": True}
+    assert uploader.submitted == [(PROOF, PUBLIC_INPUTS, False, "small")]
+    assert spool.counts() == {"pending": 0, "inflight": 0, "sent": 1, "failed": 0}
+    # The proof body is dropped once sent, and it is never uploaded again
+    assert blob_files(spool) == []
+    assert spool.enqueue(PROOF, PUBLIC_INPUTS, "hk") is None
+
+
+def test_failed_uploads_move_to_failed_after_max_attempts(spool, wallet):
+    wallet.hotkey.ss58_address = "hk"
+    digest = spool.enqueue(PROOF, PUBLIC_INPUTS, "hk")
+    uploader = FakeUploader(None)
+
+    spool.drain(uploader, wallet)
+    assert spool.pending() == [digest]
+    spool.drain(uploader, wallet)
+
+    assert spool.counts()["failed"] == 1
+    assert spool.pending() == []
+    assert len(uploader.submitted) == 2
+
+
+def test_recover_returns_entries_of_dead_processes(spool):
+    digest = spool.enqueue(PROOF, PUBLIC_INPUTS, "hk")
+    # The pid of a process that has already exited
+    dead_pid = int(
+        subprocess.check_output([sys.executable, "-c", "import os; print(os.getpid())"])
+    )
+    os.rename(spool._path("pending", digest), spool._inflight_path(digest, dead_pid))
+
+    assert spool.recover() == 1
+    assert spool.pending() == [digest]
+
+
+def test_legacy_hex_entries_are_uploaded(spool, wallet):
+    wallet.hotkey.ss58_address = "hk"
+    digest = public_inputs_digest(PUBLIC_INPUTS)
+    spool._write(
+        spool._path("pending", digest),
+        {
+            "digest": digest,
+            "hotkey": "hk",
+            "testnet": True,
+            "proof": PROOF.hex(),
+            "public_inputs": PUBLIC_INPUTS.hex(),
+            "created": 0,
+            "attempts": 0,
+        },
+    )
+    uploader = FakeUploader({"ok": True})
+
+    spool.drain(uploader, wallet)
+
+    assert uploader.submitted == [(PROOF, PUBLIC_INPUTS, True, "large")]
+    assert spool.counts()["sent"] == 1
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from proof_of_portfolio import tiers
+from proof_of_portfolio.proof_generator import generate_proof
+
+from conftest import make_miner_data
+
+
+@pytest.fixture
+def shipped_vks(tmp_path, monkeypatch):
+    """Empty stand-in for proof_of_portfolio/vk; returns a function shipping a tier."""
+    monkeypatch.setattr(tiers, "SHIPPED_VK_DIR", str(tmp_path / "vk"))
+
+    def ship(program, tier):
+        path = tmp_path / "vk" / tiers.variant_name(program, tier) / "vk"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"vk")
+        return str(path)
+
+    return ship
+
+
+def test_large_is_selected_until_smaller_keys_ship(pop_home, shipped_vks):
+    assert tiers.select_tier("circuits", MAX_SIGNALS=10, MAX_DAYS=10) == "large"
+
+    shipped_vks("circuits", "medium")
+    assert tiers.select_tier("circuits", MAX_SIGNALS=10, MAX_DAYS=10) == "medium"
+
+    shipped_vks("circuits", "small")
+    assert tiers.select_tier("circuits", MAX_SIGNALS=10, MAX_DAYS=10) == "small"
+    assert tiers.select_tier("circuits", MAX_SIGNALS=100, MAX_DAYS=10) == "medium"
+    assert tiers.select_tier("circuits", MAX_SIGNALS=1000, MAX_DAYS=10) == "large"
+
+
+def test_pinned_tier_is_honoured_when_it_fits(pop_home, shipped_vks, monkeypatch):
+    monkeypatch.setenv("POP_CIRCUIT_TIER", "small")
+    assert tiers.select_tier("circuits", MAX_SIGNALS=10) == "small"
+    assert tiers.select_tier("circuits", MAX_SIGNALS=100) == "large"
+
+
+def test_shipped_vk_path_never_builds(pop_home, shipped_vks):
+    assert tiers.shipped_vk_path("circuits", "small") is None
+    assert tiers.shipped_vk_path("circuits", "huge") is None
+    assert not os.path.exists(tiers.variant_root())
+
+    path = shipped_vks("circuits", "small")
+    assert tiers.shipped_vk_path("circuits", "small") == path
+
+
+def test_orders_dropped_as_invalid_do_not_count_toward_the_tier(pop_home, shipped_vks):
+    shipped_vks("circuits", "small")
+    data, daily_pnl = make_miner_data(n_orders=70, n_days=60)
+    orders = data["positions"]["5TestHotkey"]["positions"][0]["orders"]
+    for order in orders[:10]:
+        order["price"] = None
+
+    results = generate_proof(data, daily_pnl, miner_hotkey="5TestHotkey", preview=True)
+
+    assert results["data_summary"]["signals_total"] == 60
+    assert results["data_summary"]["circuit_tier"] == "small"
@@ -0,0 +1,51 @@
+import pytest
+
+from proof_of_portfolio import tree_state
+from proof_of_portfolio.merkle import build_merkle_tree
+
+
+def signal(i, scale=1):
+    return {
+        "trade_pair": str(i % 3),
+        "order_type": str(i % 2 + 1),
+        "leverage": str(100 * scale),
+        "price": str((1000 + i) * scale),
+        "processed_ms": str(1_700_000_000_000 + i),
+        "order_uuid": f"0x{i:032x}",
+        "bid": str((999 + i) * scale),
+        "ask": str((1001 + i) * scale),
+    }
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(pop_home, monkeypatch):
+    monkeypatch.setattr(tree_state, "_trees", {})
+    return tree_state.state_dir()
+
+
+def test_tree_matches_full_build_and_only_rehashes_new_signals(fresh_state):
+    signals = [signal(i) for i in range(10)]
+    first = tree_state.update_signals_tree("hk", signals, 10, max_signals=16, depth=4)
+    assert first["changed"] == list(range(10))
+
+    signals.append(signal(10))
+    second = tree_state.update_signals_tree("hk", signals, 11, max_signals=16, depth=4)
+    assert second["changed"] == [10]
+    assert second["root"] == build_merkle_tree(signals, 11, 16, 4)["root"]
+
+
+def test_kinds_keep_separate_state(fresh_state):
+    proof_signals = [signal(i) for i in range(8)]
+    miner_signals = [signal(i, scale=100) for i in range(8)]
+    tree_state.update_signals_tree("hk", proof_signals, 8, max_signals=16, depth=4)
+    tree_state.update_signals_tree(
+        "hk", miner_signals, 8, max_signals=16, depth=4, kind="miner"
+    )
+
+    # Reloaded from disk, the proof tree is still the proof tree
+    tree_state._trees.clear()
+    again = tree_state.update_signals_tree(
+        "hk", proof_signals, 8, max_signals=16, depth=4
+    )
+    assert again["changed"] == []
+    assert sorted(p.name for p in fresh_state.iterdir()) == ["hk.json", "hk.miner.json"]
@@ -0,0 +1,238 @@
+import base64
+import json
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from proof_of_portfolio import uploader as uploader_module
+from proof_of_portfolio.uploader import ProofUploader
+
+PROOF = bytes(range(256)) * 4
+PUBLIC_INPUTS = b"\x00\x01public"
+
+
+class StandIn:
+    """
+    Local upload API answering from a script of (status, headers, delay) or
+    (status, headers, delay, body) entries.
+    """
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = []
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with stand_in.lock:
+                    stand_in.requests.append((dict(self.headers), json.loads(body)))
+                    status, headers, delay, *body = (
+                        stand_in.script.pop(0) if stand_in.script else (200, {}, 0)
+                    )
+                time.sleep(delay)
+                payload = body[0] if body else json.dumps({"status": status}).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/upload-proof"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    servers = []
+
+    def start(*script):
+        server = StandIn(script)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays the uploader asked for, without actually sleeping."""
+    delays = []
+    monkeypatch.setattr(
+        uploader_module,
+        "time",
+        types.SimpleNamespace(time=time.time, sleep=delays.append),
+    )
+    return delays
+
+
+def make_uploader(url, **kwargs):
+    kwargs.setdefault("max_attempts", 5)
+    kwargs.setdefault("backoff_base", 1.0)
+    kwargs.setdefault("backoff_max", 4.0)
+    kwargs.setdefault("timeout", 5)
+    return ProofUploader(url=url, **kwargs)
+
+
+def test_upload_sends_signed_hex_payload(stand_in, sleeps, wallet):
+    server = stand_in((200, {}, 0))
+    uploader = make_uploader(server.url)
+    try:
+        assert uploader.upload(
+            PROOF, memoryview(PUBLIC_INPUTS), wallet, False, "medium"
+        ) == {"status": 200}
+    finally:
+        uploader.shutdown()
+
+    assert len(server.requests) == 1
+    headers, payload = server.requests[0]
+    assert payload == {
+        "testnet": False,
+        "proof": PROOF.hex(),
+        "public_signals": PUBLIC_INPUTS.hex(),
+        "circuit_tier": "medium",
+    }
+    assert headers["x-origin-ss58"] == wallet.hotkey.ss58_address
+    assert base64.b64decode(headers["x-signature"]) == (
+        f"1:{headers['x-timestamp']}".encode()
+    )
+    assert sleeps == []
+
+
+def test_transient_failures_are_retried_and_resigned(stand_in, sleeps, wallet):
+    server = stand_in(
+        (429, {"Retry-After": "30"}, 0),
+        (503, {}, 0),
+        (200, {}, 0),
+    )
+    uploader = make_uploader(server.url)
+    try:
+        assert uploader.upload(PROOF, PUBLIC_INPUTS, wallet) == {"status": 200}
+    finally:
+        uploader.shutdown()
+
+    assert len(server.requests) == 3
+    # Every attempt is signed again
+    assert len(wallet.signatures) == 3
+    signatures = [headers["x-signature"] for headers, _ in server.requests]
+    assert len(set(signatures)) == 3
+    # Retry-After beyond the cap is clamped to backoff_max
+    assert sleeps[0] == uploader.backoff_max
+    assert 0 <= sleeps[1] <= min(uploader.backoff_max, uploader.backoff_base * 2)
+    assert len(sleeps) == 2
+
+
+def test_gives_up_after_max_attempts(stand_in, sleeps, wallet, bt_logging):
+    server = stand_in(*[(503, {}, 0)] * 10)
+    uploader = make_uploader(server.url, max_attempts=3)
+    try:
+        assert uploader.upload(PROOF, PUBLIC_INPUTS, wallet) is None
+    finally:
+        uploader.shutdown()
+
+    assert len(server.requests) == 3
+    assert len(sleeps) == 2
+    assert any("Giving up" in m for m in bt_logging.messages("error"))
+
+
+def test_client_errors_are_not_retried(stand_in, sleeps, wallet):
+    server = stand_in((400, {}, 0), (200, {}, 0))
+    uploader = make_uploader(server.url)
+    try:
+        assert uploader.upload(PROOF, PUBLIC_INPUTS, wallet) is None
+    finally:
+        uploader.shutdown()
+
+    assert len(server.requests) == 1
+    assert sleeps == []
+
+
+def test_non_json_success_fails_the_upload(stand_in, sleeps, wallet, bt_logging):
+    server = stand_in((200, {}, 0, b"<html>ok</html>"))
+    uploader = make_uploader(server.url)
+    try:
+        assert uploader.submit(PROOF, PUBLIC_INPUTS, wallet).result() is None
+    finally:
+        uploader.shutdown()
+
+    assert len(server.requests) == 1
+    assert sleeps == []
+    assert any("JSONDecodeError" in m for m in bt_logging.messages("error"))
+
+
+def test_signing_failure_fails_the_upload(stand_in, sleeps, wallet):
+    server = stand_in()
+    uploader = make_uploader(server.url)
+
+    def sign(data):
+        raise RuntimeError("keyfile locked")
+
+    wallet.hotkey.sign = sign
+    try:
+        assert uploader.upload(PROOF, PUBLIC_INPUTS, wallet) is None
+    finally:
+        uploader.shutdown()
+
+    assert server.requests == []
+
+
+def test_backoff_is_capped():
+    uploader = ProofUploader(backoff_base=1.0, backoff_max=8.0)
+    try:
+        for attempt in range(1, 20):
+            assert 0 <= uploader.backoff(attempt) <= 8.0
+        assert all(uploader.backoff(1) <= 1.0 for _ in range(100))
+    finally:
+        uploader.shutdown()
+
+
+def test_shutdown_waits_for_queued_uploads(stand_in, sleeps, wallet):
+    server = stand_in(*[(200, {}, 0.05)] * 6)
+    uploader = make_uploader(server.url, max_workers=2)
+    futures = [uploader.submit(PROOF, PUBLIC_INPUTS, wallet) for _ in range(6)]
+    uploader.shutdown(wait=True)
+
+    assert all(future.done() for future in futures)
+    assert [future.result() for future in futures] == [{"status": 200}] * 6
+    assert len(server.requests) == 6
+    assert uploader.pending == 0
+    with pytest.raises(RuntimeError):
+        uploader.submit(PROOF, PUBLIC_INPUTS, wallet)
+
+
+def test_upload_proof_accepts_the_former_hex_keywords(monkeypatch, wallet):
+    from proof_of_portfolio import proof_generator
+
+    calls = []
+    monkeypatch.setattr(
+        proof_generator,
+        "get_uploader",
+        lambda: types.SimpleNamespace(upload=lambda *args: calls.append(args)),
+    )
+
+    proof_generator.upload_proof(
+        proof_hex=PROOF.hex(), public_inputs_hex=PUBLIC_INPUTS.hex(), wallet=wallet
+    )
+    proof_generator.upload_proof(PROOF, PUBLIC_INPUTS, wallet, False, "small")
+
+    assert calls == [
+        (PROOF.hex(), PUBLIC_INPUTS.hex(), wallet, True, "large"),
+        (PROOF, PUBLIC_INPUTS, wallet, False, "small"),
+    ]
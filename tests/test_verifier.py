@@ -0,0 +1,84 @@
+import pytest
+
+from proof_of_portfolio import verifier
+
+FAKE_BB = """#!/bin/sh
+# bb verify -k <vk> -p <proof> -i <public inputs>: accepts proofs reading "good"
+proof=$(cat "$5")
+[ "$proof" = "slow" ] && exec sleep 5
+[ "$proof" = "good" ]
+"""
+
+
+@pytest.fixture
+def fake_bb(tmp_path, monkeypatch):
+    """bb stand-in and a verification key for every tier; returns the vk lookups."""
+    bb = tmp_path / "bb"
+    bb.write_text(FAKE_BB)
+    bb.chmod(0o755)
+    vk = tmp_path / "vk"
+    vk.write_bytes(b"vk")
+    lookups = []
+
+    def vk_path(tier):
+        lookups.append(tier)
+        return str(vk)
+
+    monkeypatch.setattr(verifier, "BB_PATH", str(bb))
+    monkeypatch.setattr(verifier, "_vk_path", vk_path)
+    return lookups
+
+
+def test_verify_takes_bytes_or_hex(fake_bb):
+    assert verifier.verify(b"good", b"inputs")
+    assert verifier.verify(memoryview(b"good"), b"inputs".hex(), "large")
+    assert not verifier.verify(b"bad", b"inputs")
+
+
+def test_verify_accepts_the_former_hex_keywords(fake_bb):
+    assert verifier.verify(proof_hex=b"good".hex(), public_inputs_hex=b"in".hex())
+    assert not verifier.verify(proof_hex=b"bad".hex(), public_inputs_hex="00")
+
+    with pytest.raises(TypeError):
+        verifier.verify(proof_hex=b"good".hex())
+
+
+def test_verify_many_resolves_each_tier_key_once_up_front(fake_bb):
+    items = [
+        (b"good", b"inputs"),
+        (b"bad", b"inputs", "small"),
+        {"proof_results": {"proof": b"good".hex(), "public_inputs": "00"}},
+        {"proof_results": {"proof": b"good", "public_inputs": b"in"}, "tier": "small"},
+    ]
+
+    summary = verifier.verify_many(items, max_workers=4, tier="medium")
+
+    assert sorted(fake_bb) == ["medium", "small"]
+    assert [r["valid"] for r in summary["results"]] == [True, False, True, True]
+    assert [r["tier"] for r in summary["results"]] == [
+        "medium",
+        "small",
+        "medium",
+        "small",
+    ]
+    assert (summary["verified"], summary["failed"]) == (3, 1)
+
+
+def test_verify_many_times_out_per_proof(fake_bb):
+    items = [(b"slow", b"inputs"), (b"good", b"inputs"), (b"good", b"inputs")]
+
+    summary = verifier.verify_many(items, max_workers=1, timeout=0.5)
+
+    first, *rest = summary["results"]
+    assert not first["valid"] and "timed out" in first["error"]
+    assert all(result["valid"] for result in rest)
+
+
+def test_verify_many_reports_missing_keys(fake_bb, monkeypatch):
+    monkeypatch.setattr(verifier, "_vk_path", lambda tier: None)
+
+    summary = verifier.verify_many([(b"good", b"inputs", "small")])
+
+    assert summary["results"][0]["error"] == (
+        "Verification key file not found for tier small"
+    )
@@ -0,0 +1,41 @@
+import os
+
+from proof_of_portfolio.witness_cache import WitnessCache
+
+
+def store(cache, tmp_path, key, circuit_hash, size, age):
+    """put() a witness and compiled circuit of `size` bytes each, `age` seconds old."""
+    witness = tmp_path / f"{key}.gz"
+    witness.write_bytes(b"w" * size)
+    circuit = tmp_path / f"{circuit_hash}.json"
+    circuit.write_bytes(b"c" * size)
+    cache.put(key, witness, [1, 2], circuit_hash, circuit)
+    for path in (cache._entry(key), cache.circuits_dir / f"{circuit_hash}.json"):
+        os.utime(path, (path.stat().st_mtime - age,) * 2)
+
+
+def test_compiled_circuits_share_the_size_limit(tmp_path):
+    cache = WitnessCache(tmp_path / "cache")
+    store(cache, tmp_path, "old", "circuit-a", 2000, age=300)
+    store(cache, tmp_path, "mid", "circuit-b", 2000, age=200)
+    store(cache, tmp_path, "new", "circuit-c", 2000, age=100)
+    # Within the limit once the oldest entry and circuit are gone
+    cache.max_bytes = 8_500
+    cache.evict()
+
+    assert cache.size() <= cache.max_bytes
+    assert not cache._entry("old").exists()
+    assert not (cache.circuits_dir / "circuit-a.json").exists()
+    assert cache.get("new", tmp_path / "out.gz", "circuit-c", tmp_path / "c.json")
+
+
+def test_entry_whose_circuit_was_evicted_is_restored_by_put(tmp_path):
+    cache = WitnessCache(tmp_path / "cache")
+    store(cache, tmp_path, "key", "circuit", 10, age=0)
+    (cache.circuits_dir / "circuit.json").unlink()
+    restore = ("key", tmp_path / "out.gz", "circuit", tmp_path / "c.json")
+    assert cache.get(*restore) is None
+
+    store(cache, tmp_path, "key", "circuit", 10, age=0)
+
+    assert cache.get(*restore) == [1, 2]
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from proof_of_portfolio import proof_generator
+from proof_of_portfolio.workspace import Workspace
+
+from conftest import make_miner_data
+
+
+@pytest.fixture
+def workspaces(tmp_path, monkeypatch):
+    """Directory new workspaces are created in."""
+    root = tmp_path / "workspaces"
+    monkeypatch.setenv("POP_WORKSPACE_DIR", str(root))
+    return root
+
+
+def test_programs_compiled_in_the_package_are_copied(tmp_path, workspaces):
+    package = tmp_path / "circuit"
+    (package / "src").mkdir(parents=True)
+    (package / "Nargo.toml").write_text('[package]\nname = "circuit"\n')
+    (package / "target").mkdir()
+    (package / "target" / "circuit.json").write_text("{}")
+    (package / "target" / "witness.gz").write_bytes(b"stale")
+
+    with Workspace(package) as workspace:
+        assert os.listdir(workspace.target_dir) == ["circuit.json"]
+        assert not os.path.islink(os.path.join(workspace.target_dir, "circuit.json"))
+        assert os.path.islink(os.path.join(workspace.path, "src"))
+
+    assert os.listdir(workspaces) == []
+
+
+def test_failed_witness_generation_removes_its_workspace(
+    pop_home, workspaces, monkeypatch
+):
+    monkeypatch.setenv("POP_ARTIFACTS_DISABLE", "1")
+    monkeypatch.setenv("POP_WITNESS_CACHE_DISABLE", "1")
+    created = []
+
+    def workspace(*args, **kwargs):
+        created.append(Workspace(*args, **kwargs))
+        return created[-1]
+
+    monkeypatch.setattr(proof_generator, "Workspace", workspace)
+
+    def fail(command, cwd):
+        assert os.path.isdir(cwd)
+        raise RuntimeError("nargo execute failed")
+
+    monkeypatch.setattr(proof_generator, "run_command", fail)
+    data, daily_pnl = make_miner_data(n_orders=5)
+
+    with pytest.raises(RuntimeError, match="nargo execute failed"):
+        proof_generator.generate_witness(
+            data, daily_pnl, miner_hotkey="5TestHotkey", witness_only=True
+        )
+
+    assert len(created) == 1
+    assert not os.path.exists(created[0].path)